@@ -12,6 +12,21 @@ class Polygonize(Enum):
 
     BY_ANGLE = auto()
     UNIFORM = auto()
+    BY_TOLERANCE = auto()
+
+
+class Output(Enum):
+    """Enum to define the representation of glyphs in the SVG output"""
+
+    POLYGONIZED = auto()  # flattened outline, see POLYGONIZE_TYPE
+    CURVES = auto()  # native quadratic/cubic segments of the font, no flattening
+
+
+class Coverage(Enum):
+    """Enum to define the calculation of the area coverage of glyphs"""
+
+    EXACT = auto()  # intersection of the polygonized glyph and the em box by shapely
+    RASTER = auto()  # estimated by a scanline fill with COVERAGE_RASTER_ROWS scanlines, see av.coverage
 
 
 class Align(Enum):
@@ -25,7 +40,13 @@ class Align(Enum):
 POLYGONIZE_UNIFORM_NUM_POINTS = 10  # minimum 2 = (start, end)
 POLYGONIZE_ANGLE_MAX_DEG = 5  # 2 # difference of two derivatives less than
 POLYGONIZE_ANGLE_MAX_STEPS = 9  # 9
+POLYGONIZE_TOLERANCE = 0.01 / 150  # max. chord deviation in real units, e.g. 0.01mm on a viewbox of 150mm scaled to 1
 POLYGONIZE_TYPE = Polygonize.UNIFORM
+POLYGONIZE_SIMPLIFY_TOLERANCE = 0.0  # max. deviation in real units when removing nearly collinear points, 0: off
+POLYGONIZE_LOD_CACHE_SIZE = 4  # max. number of levels of detail polygonized per glyph, least recently used dropped
+OUTPUT_TYPE = Output.POLYGONIZED  # polygons are still used where needed, e.g. area_coverage()
+COVERAGE_TYPE = Coverage.EXACT
+COVERAGE_RASTER_ROWS = 256  # scanlines per em box for Coverage.RASTER, max. coverage error about 0.25% (Lato)
 
 
 def main():
@@ -38,6 +59,13 @@ def main():
 
     print(Polygonize.BY_ANGLE, Polygonize.BY_ANGLE.value)
     print(Polygonize.UNIFORM, Polygonize.UNIFORM.value)
+    print(Polygonize.BY_TOLERANCE, Polygonize.BY_TOLERANCE.value)
+
+    print(Output.POLYGONIZED, Output.POLYGONIZED.value)
+    print(Output.CURVES, Output.CURVES.value)
+
+    print(Coverage.EXACT, Coverage.EXACT.value)
+    print(Coverage.RASTER, Coverage.RASTER.value)
 
     print(Align.LEFT, Align.LEFT.value)
     print(Align.RIGHT, Align.RIGHT.value)
@@ -46,7 +74,13 @@ def main():
     print("POLYGONIZE_UNIFORM_NUM_POINTS", POLYGONIZE_UNIFORM_NUM_POINTS)
     print("POLYGONIZE_ANGLE_MAX_DEG", POLYGONIZE_ANGLE_MAX_DEG)
     print("POLYGONIZE_ANGLE_MAX_STEPS", POLYGONIZE_ANGLE_MAX_STEPS)
+    print("POLYGONIZE_TOLERANCE", POLYGONIZE_TOLERANCE)
     print("POLYGONIZE_TYPE", POLYGONIZE_TYPE)
+    print("POLYGONIZE_SIMPLIFY_TOLERANCE", POLYGONIZE_SIMPLIFY_TOLERANCE)
+    print("POLYGONIZE_LOD_CACHE_SIZE", POLYGONIZE_LOD_CACHE_SIZE)
+    print("OUTPUT_TYPE", OUTPUT_TYPE)
+    print("COVERAGE_TYPE", COVERAGE_TYPE)
+    print("COVERAGE_RASTER_ROWS", COVERAGE_RASTER_ROWS)
 
 
 if __name__ == "__main__":
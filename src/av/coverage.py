@@ -0,0 +1,86 @@
+"""Estimation of the area coverage of glyphs by a scanline fill"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy
+
+import av.consts
+
+
+class HelperCoverage:
+    """Helper-class to estimate the area coverage of many glyphs at once without any polygon intersections,
+    an alternative to the exact intersection by shapely (see av.consts.Coverage)"""
+
+    @staticmethod
+    def contour_edges(contours: List[List[numpy.ndarray]]) -> numpy.ndarray:
+        """Returns the edges of the given closed contours of several glyphs.
+
+        Args:
+            contours (List[List[numpy.ndarray]]): closed contours of each glyph,
+                each of shape (number of points, 2), e.g. of ave.fonttools.AvContourPen.contours()
+
+        Returns:
+            numpy.ndarray: edges of shape (number of edges, 5): (index of glyph, x0, y0, x1, y1)
+        """
+        glyph_contours = [(glyph, contour) for glyph, contours in enumerate(contours) for contour in contours]
+        if not glyph_contours:
+            return numpy.empty((0, 5))
+        starts = numpy.concatenate([contour for _, contour in glyph_contours])
+        ends = numpy.concatenate([numpy.roll(contour, -1, axis=0) for _, contour in glyph_contours])
+        glyphs = numpy.repeat([glyph for glyph, _ in glyph_contours], [len(contour) for _, contour in glyph_contours])
+        return numpy.column_stack((glyphs, starts, ends))
+
+    @staticmethod
+    def scanline_coverages(
+        contours: List[List[numpy.ndarray]], boxes: numpy.ndarray, rows: int = av.consts.COVERAGE_RASTER_ROWS
+    ) -> numpy.ndarray:
+        """Estimate the ratio of each box covered by the given contours of its glyph (nonzero winding rule)
+        by filling _rows_ horizontal scanlines through the centers of equally high rows of the box.
+        The spans of the scanlines inside the glyphs are calculated exactly (like an infinite supersampling
+        in x direction), so the error only depends on the curvature of the contours between the scanlines,
+        i.e. it decreases with 1/rows^2 for smooth contours and with 1/rows for horizontal edges.
+        All edges of all glyphs are handled at once by vectorized numpy functions.
+
+        Args:
+            contours (List[List[numpy.ndarray]]): closed contours of each glyph, see contour_edges()
+            boxes (numpy.ndarray): box of each glyph of shape (number of glyphs, 4): (x_min, y_min, x_max, y_max)
+            rows (int, optional): number of scanlines per box. Defaults to av.consts.COVERAGE_RASTER_ROWS.
+
+        Returns:
+            numpy.ndarray: covered area / area of the box for each glyph (0 for empty boxes)
+        """
+        boxes = numpy.asarray(boxes, dtype=float).reshape(-1, 4)
+        heights = (boxes[:, 3] - boxes[:, 1]) / rows
+        edges = HelperCoverage.contour_edges(contours)
+        glyphs = edges[:, 0].astype(int)
+        (y_low, y_high) = (numpy.minimum(edges[:, 2], edges[:, 4]), numpy.maximum(edges[:, 2], edges[:, 4]))
+
+        # rows whose scanline y is crossed by an edge, i.e. y_low <= y < y_high (horizontal edges: none):
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            first_rows = numpy.ceil((y_low - boxes[glyphs, 1]) / heights[glyphs] - 0.5)
+            end_rows = numpy.ceil((y_high - boxes[glyphs, 1]) / heights[glyphs] - 0.5)
+        first_rows = numpy.nan_to_num(numpy.clip(first_rows, 0, rows)).astype(int)
+        num_rows = numpy.maximum(numpy.nan_to_num(numpy.clip(end_rows, 0, rows)).astype(int) - first_rows, 0)
+
+        # crossing of each scanline with each edge:
+        crossings = numpy.repeat(numpy.arange(len(edges)), num_rows)
+        row_indices = first_rows[crossings] + numpy.arange(len(crossings))
+        row_indices -= numpy.repeat(numpy.cumsum(num_rows) - num_rows, num_rows)
+        (glyphs, (x0, y0, x1, y1)) = (glyphs[crossings], edges[crossings, 1:].T)
+        y = boxes[glyphs, 1] + (row_indices + 0.5) * heights[glyphs]
+        x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        windings = numpy.where(y1 > y0, 1, -1)
+
+        # spans between consecutive crossings of a scanline with a nonzero winding number:
+        scanlines = glyphs * (rows + 1) + row_indices
+        order = numpy.lexsort((x, scanlines))
+        (scanlines, x, windings, glyphs) = (scanlines[order], x[order], windings[order], glyphs[order])
+        inside = (numpy.cumsum(windings)[:-1] != 0) & (scanlines[1:] == scanlines[:-1])
+        (glyphs, x_min, x_max) = (glyphs[1:][inside], boxes[glyphs[1:][inside], 0], boxes[glyphs[1:][inside], 2])
+        lengths = numpy.clip(x[1:][inside], x_min, x_max) - numpy.clip(x[:-1][inside], x_min, x_max)
+
+        areas = numpy.bincount(glyphs, weights=lengths, minlength=len(boxes)) * heights
+        box_areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        return numpy.divide(areas, box_areas, out=numpy.zeros_like(areas), where=box_areas > 0)
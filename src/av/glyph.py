@@ -2,20 +2,25 @@
 
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
 
+import numpy
+import shapely
 import svgwrite
 import svgwrite.base
 import svgwrite.container
 import svgwrite.elementfactory
 from fontTools.pens.boundsPen import BoundsPen
-from fontTools.pens.svgPathPen import SVGPathPen
 from fontTools.ttLib import TTFont
 
 import av.consts
-import av.helper
+import av.coverage
 import av.path
+from ave.fonttools import AvContourPen, AvPathDataPen
+from ave.svgpath import AvPathData
 
 
 class AvGlyphABC(ABC):
@@ -78,11 +83,30 @@ class AvGlyph:
         self._glyph_set.draw(bounds_pen)
         self.bounding_box = bounds_pen.bounds  # (0:x_min, 1:y_min, 2:x_max, 3:y_max)
         self.width = self._glyph_set.width
-        # create and store a polygonized_path_string:
-        svg_pen = SVGPathPen(self._avfont.ttfont.getGlyphSet())
-        self._glyph_set.draw(svg_pen)
-        self.path_string = svg_pen.getCommands()
-        self.polygonized_path_string = av.path.AvSvgPath.polygonize_svg_path_string(self.path_string)
+        # store the outline (numeric, no intermediate path strings), it is polygonized on first use:
+        path_data_pen = AvPathDataPen(self._avfont.ttfont.getGlyphSet())
+        self._glyph_set.draw(path_data_pen)
+        self.outline: AvPathData = path_data_pen.path_data()
+        self._polygonized_path: Optional[AvPathData] = None
+        self._polygonized_paths_by_lod: OrderedDict[int, AvPathData] = OrderedDict()  # LOD->polygonized path
+        self._area_coverages: Dict[Tuple[float, float, av.consts.Coverage], float] = {}  # see area_coverage()
+
+    @property
+    def polygonized_path(self) -> AvPathData:
+        """Polygonized outline in unitsPerEm as defined by POLYGONIZE_TYPE, created on first use"""
+        if self._polygonized_path is None:
+            self._avfont.polygonize_glyphs(self.character)
+        return self._polygonized_path
+
+    @property
+    def path_string(self) -> str:
+        """SVG path string of the glyph's outline in unitsPerEm"""
+        return self.outline.to_string()
+
+    @property
+    def polygonized_path_string(self) -> str:
+        """SVG path string of the polygonized outline in unitsPerEm"""
+        return self.polygonized_path.to_string()
 
     def font_ascender(self) -> float:
         """Returns the ascender of the font in unitsPerEm
@@ -180,12 +204,63 @@ class AvGlyph:
             return sidebearing_right * font_size / self._avfont.units_per_em
         return 0.0
 
+    def polygonized_path_at(self, font_size: float) -> AvPathData:
+        """Returns the polygonized outline in unitsPerEm to be used at the given _font_size_.
+        For POLYGONIZE_TYPE BY_TOLERANCE the curves are flattened so that the chords deviate
+        at most POLYGONIZE_TOLERANCE (real units) from them at this _font_size_,
+        i.e. small letters get less points.
+        If POLYGONIZE_SIMPLIFY_TOLERANCE is set, nearly collinear points deviating at most this value
+        (real units) at this _font_size_ are removed before the contours are combined.
+        Otherwise it is the size independent _polygonized_path_.
+        The outlines are shared between similar font sizes of the same level of detail
+        (see AvFont.level_of_detail()), the outlines of the last POLYGONIZE_LOD_CACHE_SIZE used levels are kept.
+
+        Args:
+            font_size (float): font_size
+
+        Returns:
+            AvPathData: polygonized outline in unitsPerEm
+        """
+        if not AvFont.polygonize_per_size():
+            return self.polygonized_path
+        lod = self._avfont.level_of_detail(font_size)
+        if lod not in self._polygonized_paths_by_lod:
+            self._avfont.polygonize_glyphs(self.character, font_size)
+        self._polygonized_paths_by_lod.move_to_end(lod)
+        return self._polygonized_paths_by_lod[lod]
+
     def real_path_string(self, x_pos: float, y_pos: float, font_size: float) -> str:
+        """Returns the SVG path string of the glyph at the given position and _font_size_ for the output:
+        depending on OUTPUT_TYPE either polygonized (see real_polygonized_path_string())
+        or with the native curves of the font, i.e. without any flattening.
+
+        Args:
+            x_pos (float): x position of the origin
+            y_pos (float): y position of the baseline
+            font_size (float): font_size
+
+        Returns:
+            str: SVG path string in real units
+        """
+        if av.consts.OUTPUT_TYPE == av.consts.Output.CURVES:
+            scale = font_size / self._avfont.units_per_em
+            return self.outline.transform([scale, 0, 0, -scale, x_pos, y_pos]).to_string()
+        return self.real_polygonized_path_string(x_pos, y_pos, font_size)
+
+    def real_polygonized_path_string(self, x_pos: float, y_pos: float, font_size: float) -> str:
+        """Returns the SVG path string of the polygonized glyph at the given position and _font_size_,
+        e.g. for boolean operations, area_coverage() or plotter export.
+
+        Args:
+            x_pos (float): x position of the origin
+            y_pos (float): y position of the baseline
+            font_size (float): font_size
+
+        Returns:
+            str: SVG path string in real units
+        """
         scale = font_size / self._avfont.units_per_em
-        path_string = av.path.AvSvgPath.transform_path_string(
-            self.polygonized_path_string, [scale, 0, 0, -scale, x_pos, y_pos]
-        )
-        return path_string
+        return self.polygonized_path_at(font_size).transform([scale, 0, 0, -scale, x_pos, y_pos]).to_string()
 
     def svg_path(
         self,
@@ -286,20 +361,28 @@ class AvGlyph:
             )
         return rect
 
-    def area_coverage(self, ascent: float, descent: float, font_size: float) -> float:
-        glyph_string = self.real_path_string(0, 0, font_size)
-        glyph_polygon = av.path.AvPathPolygon()
-        glyph_polygon.add_path_string(glyph_string)
-
-        rect = self.rect_em_width(0, 0, ascent, descent, font_size)
-        rect_string = av.helper.HelperSvg.rect_to_path(rect)
-        rect_polygon = av.path.AvPathPolygon()
-        rect_polygon.add_path_string(rect_string)
+    def area_coverage(
+        self, ascent: float, descent: float, font_size: float, coverage_type: Optional[av.consts.Coverage] = None
+    ) -> float:
+        """Returns the ratio of the em box (see rect_em_width()) covered by the glyph.
+        The ratio does not depend on _font_size_, it is calculated once in unitsPerEm
+        for the given _ascent_ and _descent_ and cached (see AvFont.area_coverages_of()).
 
-        inter = rect_polygon.multipolygon.intersection(glyph_polygon.multipolygon)
-        rect_area = rect_polygon.multipolygon.area
+        Args:
+            ascent (float): ascent in unitsPerEm, e.g. AvFont.ascender
+            descent (float): descent in unitsPerEm, e.g. AvFont.descender
+            font_size (float): font_size (without any influence on the result)
+            coverage_type (Optional[av.consts.Coverage], optional): EXACT or RASTER (estimated).
+                Defaults to None, i.e. COVERAGE_TYPE.
 
-        return inter.area / rect_area
+        Returns:
+            float: covered area / area of the em box
+        """
+        coverage_type = coverage_type or av.consts.COVERAGE_TYPE
+        area_coverage = self._area_coverages.get((ascent, descent, coverage_type), None)
+        if area_coverage is None:
+            area_coverage = float(self._avfont.area_coverages(self.character, ascent, descent, coverage_type)[0])
+        return area_coverage
 
 
 # pyright: reportAttributeAccessIssue=false
@@ -339,6 +422,181 @@ class AvFont:
             self._glyph_cache[character] = glyph
         return glyph
 
+    @staticmethod
+    def polygonize_per_size() -> bool:
+        """Returns True if the polygonized outlines depend on the font size,
+        i.e. for POLYGONIZE_TYPE BY_TOLERANCE or if POLYGONIZE_SIMPLIFY_TOLERANCE is set
+        (see AvGlyph.polygonized_path_at())"""
+        by_tolerance = av.consts.POLYGONIZE_TYPE == av.consts.Polygonize.BY_TOLERANCE
+        return by_tolerance or bool(av.consts.POLYGONIZE_SIMPLIFY_TOLERANCE)
+
+    def level_of_detail(self, font_size: float) -> int:
+        """Returns the level of detail (LOD) of the polygonized outlines at the given _font_size_
+        (see AvGlyph.polygonized_path_at()): the curves of level _lod_ are flattened with the tolerance 2^lod
+        (unitsPerEm), i.e. the biggest power of two which is not bigger than POLYGONIZE_TOLERANCE at this size.
+        So the outlines are shared between similar font sizes like ave.glyph.AvGlyph.level_of_detail().
+
+        Args:
+            font_size (float): font_size
+
+        Returns:
+            int: the level of detail, the bigger the coarser
+        """
+        return math.floor(math.log2(av.consts.POLYGONIZE_TOLERANCE * self.units_per_em / font_size))
+
+    def polygonize_glyphs(self, characters: str, font_size: Optional[float] = None):
+        """Polygonize the outlines of all glyphs of the given _characters_ (e.g. of a line or a page),
+        which are not polygonized yet, in one batch (see av.path.AvSvgPath.polygonize_contour_pens()).
+        The results are cached by the glyphs, see AvGlyph.polygonized_path and AvGlyph.polygonized_path_at().
+
+        Args:
+            characters (str): the characters
+            font_size (Optional[float], optional): font_size to polygonize for,
+                if the polygonized outlines depend on it (see polygonize_per_size()). Defaults to None.
+        """
+        # pylint: disable=protected-access
+        per_size = font_size is not None and AvFont.polygonize_per_size()
+        glyphs = [self.glyph(character) for character in dict.fromkeys(characters)]
+        if per_size:
+            lod = self.level_of_detail(font_size)
+            glyphs = [glyph for glyph in glyphs if lod not in glyph._polygonized_paths_by_lod]
+            real_to_units = 2.0**lod / av.consts.POLYGONIZE_TOLERANCE  # not bigger than units_per_em / font_size
+            by_tolerance = av.consts.POLYGONIZE_TYPE == av.consts.Polygonize.BY_TOLERANCE
+            tolerance = 2.0**lod if by_tolerance else None
+            simplify_tolerance = av.consts.POLYGONIZE_SIMPLIFY_TOLERANCE * real_to_units
+        else:
+            glyphs = [glyph for glyph in glyphs if glyph._polygonized_path is None]
+            (tolerance, simplify_tolerance) = (None, None)
+        if not glyphs:
+            return
+
+        pens = [av.path.AvSvgPath.contour_pen(tolerance=tolerance) for _ in glyphs]
+        for glyph, pen in zip(glyphs, pens):
+            glyph.outline.draw(pen)
+        polygonized_paths = av.path.AvSvgPath.polygonize_contour_pens(pens, simplify_tolerance)
+        for glyph, polygonized_path in zip(glyphs, polygonized_paths):
+            if not len(polygonized_path.commands):  # e.g. space
+                polygonized_path = AvPathData.from_string("M 0 0")
+            if per_size:
+                glyph._polygonized_paths_by_lod[lod] = polygonized_path
+                if len(glyph._polygonized_paths_by_lod) > av.consts.POLYGONIZE_LOD_CACHE_SIZE:
+                    glyph._polygonized_paths_by_lod.popitem(last=False)
+            else:
+                glyph._polygonized_path = polygonized_path
+
+    def area_coverages(
+        self, characters: str, ascent: float, descent: float, coverage_type: Optional[av.consts.Coverage] = None
+    ) -> numpy.ndarray:
+        """Returns the area coverage (see AvGlyph.area_coverage()) of each of the given _characters_,
+        e.g. of a whole alphabet, see area_coverages_of().
+
+        Args:
+            characters (str): the characters
+            ascent (float): ascent in unitsPerEm, e.g. AvFont.ascender
+            descent (float): descent in unitsPerEm, e.g. AvFont.descender
+            coverage_type (Optional[av.consts.Coverage], optional): EXACT or RASTER.
+                Defaults to None, i.e. COVERAGE_TYPE.
+
+        Returns:
+            numpy.ndarray: area coverage of each character
+        """
+        return AvFont.area_coverages_of([self], characters, [(ascent, descent)], coverage_type)[0]
+
+    @staticmethod
+    def area_coverages_of(
+        avfonts: Sequence[AvFont],
+        characters: str,
+        ascents_descents: Optional[Sequence[Tuple[float, float]]] = None,
+        coverage_type: Optional[av.consts.Coverage] = None,
+    ) -> numpy.ndarray:
+        """Returns the area coverage (see AvGlyph.area_coverage()) of the given _characters_ for each of the
+        given _avfonts_, e.g. of a whole alphabet for several instances (axis values) of a variable font.
+        The coverages not calculated yet are calculated in unitsPerEm for the glyphs of all fonts in one batch
+        and cached by the glyphs:
+        EXACT intersects the polygonized glyphs (see av.path.AvPathPolygon.add_polygon_arrays_batch())
+        with their em boxes by shapely,
+        RASTER estimates them by a scanline fill of the flattened outlines (see av.coverage.HelperCoverage),
+        see area_coverage_errors() for the deviations.
+
+        Args:
+            avfonts (Sequence[AvFont]): the fonts
+            characters (str): the characters
+            ascents_descents (Optional[Sequence[Tuple[float, float]]], optional): (ascent, descent) in unitsPerEm
+                for each font. Defaults to None, i.e. (ascender, descender) of each font.
+            coverage_type (Optional[av.consts.Coverage], optional): EXACT or RASTER.
+                Defaults to None, i.e. COVERAGE_TYPE.
+
+        Returns:
+            numpy.ndarray: area coverages of shape (number of fonts, number of characters)
+        """
+        # pylint: disable=protected-access
+        if ascents_descents is None:
+            ascents_descents = [(avfont.ascender, avfont.descender) for avfont in avfonts]
+        coverage_type = coverage_type or av.consts.COVERAGE_TYPE
+        keys = [(ascent, descent, coverage_type) for (ascent, descent) in ascents_descents]
+        glyphs = [[avfont.glyph(character) for character in characters] for avfont in avfonts]
+        pending = [
+            (avfont, glyph, key)
+            for avfont, font_glyphs, key in zip(avfonts, glyphs, keys)
+            for glyph in dict.fromkeys(font_glyphs)
+            if key not in glyph._area_coverages
+        ]
+        if pending:
+            # em box of each glyph, i.e. rect_em_width() in unitsPerEm:
+            widths = numpy.array([glyph.width for _, glyph, _ in pending], dtype=float)
+            middles = numpy.array([0.5 * (ascent + descent) for _, _, (ascent, descent, _) in pending])
+            halves = numpy.array([0.5 * avfont.units_per_em for avfont, _, _ in pending])
+            em_boxes = numpy.column_stack((numpy.zeros_like(widths), middles - halves, widths, middles + halves))
+            if coverage_type == av.consts.Coverage.RASTER:
+                pens = [av.path.AvSvgPath.contour_pen() for _ in pending]
+                for (_, glyph, _), pen in zip(pending, pens):
+                    glyph.outline.draw(pen)
+                area_coverages = av.coverage.HelperCoverage.scanline_coverages(
+                    [pen.contours() for pen in pens], em_boxes
+                )
+            else:
+                for avfont in dict.fromkeys(avfont for avfont, _, _ in pending):
+                    avfont.polygonize_glyphs("".join(glyph.character for font, glyph, _ in pending if font is avfont))
+                pens = [AvContourPen(None, 1) for _ in pending]  # polygonized paths consist of lines only
+                for (_, glyph, _), pen in zip(pending, pens):
+                    glyph.polygonized_path.draw(pen)
+                polygons = [av.path.AvPathPolygon() for _ in pending]
+                av.path.AvPathPolygon.add_polygon_arrays_batch(
+                    polygons, [pen.contours() for pen in pens], [pen.signed_areas() for pen in pens]
+                )
+                areas = shapely.area(
+                    shapely.intersection([polygon.multipolygon for polygon in polygons], shapely.box(*em_boxes.T))
+                )
+                em_areas = (em_boxes[:, 2] - em_boxes[:, 0]) * (em_boxes[:, 3] - em_boxes[:, 1])
+                area_coverages = numpy.divide(areas, em_areas, out=numpy.zeros_like(areas), where=em_areas > 0)
+            for (_, glyph, key), area_coverage in zip(pending, area_coverages.tolist()):
+                glyph._area_coverages[key] = area_coverage
+        return numpy.array(
+            [[glyph._area_coverages[key] for glyph in font_glyphs] for font_glyphs, key in zip(glyphs, keys)],
+            dtype=float,
+        ).reshape(len(avfonts), len(characters))
+
+    @staticmethod
+    def area_coverage_errors(
+        avfonts: Sequence[AvFont],
+        characters: str,
+        ascents_descents: Optional[Sequence[Tuple[float, float]]] = None,
+    ) -> numpy.ndarray:
+        """Returns the error of the estimated (RASTER) area coverages against the EXACT ones,
+        see area_coverages_of().
+
+        Args:
+            avfonts (Sequence[AvFont]): the fonts
+            characters (str): the characters
+            ascents_descents (Optional[Sequence[Tuple[float, float]]], optional): (ascent, descent) in unitsPerEm
+                for each font. Defaults to None, i.e. (ascender, descender) of each font.
+
+        Returns:
+            numpy.ndarray: RASTER - EXACT area coverage of shape (number of fonts, number of characters)
+        """
+        raster = AvFont.area_coverages_of(avfonts, characters, ascents_descents, av.consts.Coverage.RASTER)
+        return raster - AvFont.area_coverages_of(avfonts, characters, ascents_descents, av.consts.Coverage.EXACT)
+
     def glyph_ascent_descent_of(self, characters: str) -> Tuple[float, float]:
         """Retrieve the real ascent and descent values for the given *characters*
            based on values (i.e. min(y_min), max(y_max)) of the bounding boxes
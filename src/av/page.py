@@ -2,9 +2,6 @@
 
 from __future__ import annotations
 
-import copy
-import gzip
-import io
 from dataclasses import dataclass
 from typing import Dict, Optional, Union
 
@@ -19,6 +16,8 @@ from svgwrite.extensions import Inkscape
 import av.consts
 from av.glyph import AvFont, AvGlyph
 from av.helper import HelperSvg
+from ave.consts import Compression
+from ave.svgwriter import AvSvgWriter
 
 
 @dataclass
@@ -168,7 +167,7 @@ class AvPageSvg:
         include_debug_layer: bool = False,
         pretty: bool = False,
         indent: int = 2,
-        compressed: bool = False,
+        compressed: Union[bool, Compression] = False,
     ):
         """Save as SVG file
 
@@ -178,22 +177,17 @@ class AvPageSvg:
                 Defaults to False.
             pretty (bool, optional): True for easy readable output. Defaults to False.
             indent (int, optional): Indention if pretty is enabled. Defaults to 2 spaces.
-            compressed (bool, optional): Save as compressed svgz-file. Defaults to False.
+            compressed (Union[bool, Compression], optional): Save as compressed svgz-file using the given
+                compression strategy (e.g. FAST for previews, ZOPFLI for releases), True means BEST.
+                Defaults to False.
         """
-        # copy drawing and include layer-copies:
-        drawing = copy.deepcopy(self.drawing)
-        if include_debug_layer:
-            drawing.add(copy.deepcopy(self.layer_debug))
-        drawing.add(copy.deepcopy(self.layer_main))
-
-        # setup IO:
-        svg_buffer = io.StringIO()
-        drawing.write(svg_buffer, pretty=pretty, indent=indent)
-        output_data = svg_buffer.getvalue().encode("utf-8")
-        if compressed:
-            output_data = gzip.compress(output_data)
-        with open(filename, "wb") as svg_file:
-            svg_file.write(output_data)
+        # stream the tree into the file, the page itself is neither copied nor modified:
+        with AvSvgWriter.open(filename, compressed, pretty, indent) as writer:
+            writer.start_element(self.drawing)
+            if include_debug_layer:
+                writer.write_element(self.layer_debug)
+            writer.write_element(self.layer_main)
+            writer.end_element(self.drawing)
 
     def add_glyph(
         self,
@@ -293,6 +287,7 @@ def main():
 
     ttfont = TTFont(font_filename)
     avfont = AvFont(ttfont)  # instantiate_font(ttfont, {"wght": 800})
+    avfont.polygonize_glyphs(text, font_size)  # all glyphs of the page in one batch
     x_pos = 0
     y_pos = 0.1
     for character in text:
@@ -3,25 +3,27 @@
 from __future__ import annotations
 
 import math
-import re
-from typing import Callable, ClassVar, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence
 
-import matplotlib.path
 import numpy
 import shapely
 import shapely.geometry
 import shapely.geometry.base
 import shapely.wkt
-import svgpath2mpl
 import svgpathtools
 import svgpathtools.path
 import svgpathtools.paths2svg
 
 import av.consts
-import av.helper
+import ave.svgpath
+from ave.fonttools import AvContourPen
+from ave.svgpath import AvPathData, AvPathDataBatch, AvPathSerializer
 
 
-class AvSvgPath:
+_DRAWABLE_COMMANDS: numpy.ndarray = numpy.frombuffer(b"MmLlHhVvCcQqZz", dtype=numpy.uint8)  # see AvPathData.draw()
+
+
+class AvSvgPath(ave.svgpath.AvSvgPath):
     """This class provides a collection of functions for manipulation of SVG-paths.
     A SVG-path is characterized by a string describing a sequence of points.
     The points' connection types are according to their commands.
@@ -32,214 +34,195 @@ class AvSvgPath:
         QuadraticBezier:  4: Qq   2: Tt
         ArcCurve:         7: Aa
         ClosePath:        0: Zz
+    Parsing, beautifying, relative-to-absolute conversion and transformation
+    are inherited from ave.svgpath.AvSvgPath (single-pass numeric parser).
     """
 
-    # Command letters:
-    SVG_CMDS: ClassVar[str] = "MmLlHhVvCcSsQqTtAaZz"
-    # Definition of a number:
-    SVG_ARGS: ClassVar[str] = r"[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?"
+    @staticmethod
+    def polygonize_svg_path_string(svg_path_string: str) -> str:
+        if not svg_path_string:
+            return "M 0 0"
+        path = AvPathData.from_string(svg_path_string)
+        if not numpy.all(numpy.isin(path.commands, _DRAWABLE_COMMANDS)):
+            # smooth curves and arcs: polygonize each segment by svgpathtools
+            return AvSvgPath.polygonize_svg_path_string_by_segments(svg_path_string)
+        return AvSvgPath.polygonize_path_data(path).to_string()
+
+    @staticmethod
+    def polygonize_svg_path_string_by_segments(svg_path_string: str) -> str:
+        poly_func = None
+        match av.consts.POLYGONIZE_TYPE:
+            case av.consts.Polygonize.UNIFORM | av.consts.Polygonize.BY_TOLERANCE:
+                # path strings have no real units to derive a tolerance from, see contour_pen()
+                poly_func = AvPathPolygon.polygonize_uniform
+            case av.consts.Polygonize.BY_ANGLE:
+                poly_func = AvPathPolygon.polygonize_by_angle
+        svg_path_string = AvPathPolygon.polygonize_path(svg_path_string, poly_func)
+
+        polygon = AvPathPolygon()
+        polygon.add_path_string(svg_path_string)
+        path_strings = polygon.path_strings()
+        return " ".join(path_strings)
 
     @staticmethod
-    def beautify_commands(path_string: str, round_func: Optional[Callable] = None) -> str:
-        """Takes the given _path_string_ and rounds (mathematical) each point of the path
-            by using the given _round_func_.
-            If _round_func_ is None just a cast by "float()" is done.
+    def contour_pen(
+        glyph_set=None, affine_trafo: Optional[List[float]] = None, tolerance: Optional[float] = None
+    ) -> AvContourPen:
+        """Returns a pen which polygonizes outlines (e.g. of glyphs) into closed contours
+        as defined by POLYGONIZE_TYPE.
+        If a _tolerance_ is given, the curves are flattened so that the chords deviate at most
+        _tolerance_ from them (independent of POLYGONIZE_TYPE).
 
         Args:
-            path_string (str): _description_
-            round_func (Optional[Callable], optional): _description_. Defaults to None.
+            glyph_set (GlyphSet, optional): the glyph set to use. Defaults to None.
+            affine_trafo (Optional[List[float]], optional): [a00, a01, a10, a11, b0, b1]. Defaults to None.
+            tolerance (Optional[float], optional): max. chord deviation in units after _affine_trafo_.
+                Defaults to None.
 
         Returns:
-            str: the beautified path_string
+            AvContourPen: the pen
         """
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        ret_commands = []
-        for command in org_commands:
-            command_letter = command[0]
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-            batch_size = len(args)
-            if command_letter in "MmLlTt":
-                batch_size = 2
-            elif command_letter in "SsQq":
-                batch_size = 4
-            elif command_letter in "Cc":
-                batch_size = 6
-            elif command_letter in "HhVv":
-                batch_size = 1
-            elif command_letter in "Aa":
-                batch_size = 7
-
-            if batch_size == 0:  # e.g. for command "Z"
-                ret_commands.append(command_letter)
-            else:
-                for i, arg in enumerate(args):
-                    if not i % batch_size:
-                        ret_commands.append(command_letter)
-                    if round_func:
-                        ret_commands.append(f"{(round_func(float(arg))):g}")
-                    else:
-                        ret_commands.append(f"{(float(arg)):g}")
-
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+        match av.consts.POLYGONIZE_TYPE:
+            case _ if tolerance is not None:
+                return AvContourPen(glyph_set, affine_trafo=affine_trafo, tolerance=tolerance)
+            case av.consts.Polygonize.BY_ANGLE:
+                return AvContourPen(
+                    glyph_set,
+                    affine_trafo=affine_trafo,
+                    max_angle_degree=av.consts.POLYGONIZE_ANGLE_MAX_DEG,
+                    max_steps=av.consts.POLYGONIZE_ANGLE_MAX_STEPS,
+                )
+            case _:  # UNIFORM, and BY_TOLERANCE without a given tolerance
+                return AvContourPen(glyph_set, av.consts.POLYGONIZE_UNIFORM_NUM_POINTS - 1, affine_trafo)
 
     @staticmethod
-    def convert_relative_to_absolute(path_string: str) -> str:
-        """Take the give SVG _path_string_ and check the commands and coordinates.
-        Relative coordinates will be converted into absolute ones,
-        i.e. lower case letter commands will be replaced by upper case letter commands.
-        The representation (i.e. geometry) of the path is still the same.
-        Use this function before doing a transform.
+    def polygonize_contour_pen(pen: AvContourPen, simplify_tolerance: Optional[float] = None) -> AvPathData:
+        """Combine the closed contours of the given _pen_ (e.g. created by contour_pen()) to polygons.
 
         Args:
-            path_string (str): SVG path string input
+            pen (AvContourPen): pen holding a drawn outline
+            simplify_tolerance (Optional[float], optional): remove points of the contours before combining them,
+                see AvPathPolygon.add_polygon_arrays(). Defaults to None.
 
         Returns:
-            str: path_string using absolute coordinates
+            AvPathData: the polygonized path, i.e. the rings of the resulting polygons
         """
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        ret_commands = []
-        # Store the first point of each path (absolute):
-        first_point: list[float] = []  # acts like None
-        # Keep track of the last (iterating) point (absolute):
-        last_point: list[float] = [0.0, 0.0]
-
-        for command in org_commands:
-            command_letter = command[0]
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-
-            if command_letter.isupper():
-                if command_letter in "MLCSQTA":
-                    last_point = [float(args[-2]), float(args[-1])]
-                elif command_letter in "H":
-                    last_point[0] = float(args[-1])
-                elif command_letter in "V":
-                    last_point[1] = float(args[-1])
-            else:
-                if command_letter in "mlt":
-                    for i in range(0, len(args), 2):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        last_point = [float(args[i + 0]), float(args[i + 1])]
-                elif command_letter in "sq":
-                    for i in range(0, len(args), 4):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        args[i + 2] = f"{(float(args[i+2]) + last_point[0]):g}"
-                        args[i + 3] = f"{(float(args[i+3]) + last_point[1]):g}"
-                        last_point = [float(args[i + 2]), float(args[i + 3])]
-                elif command_letter in "c":
-                    for i in range(0, len(args), 6):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        args[i + 2] = f"{(float(args[i+2]) + last_point[0]):g}"
-                        args[i + 3] = f"{(float(args[i+3]) + last_point[1]):g}"
-                        args[i + 4] = f"{(float(args[i+4]) + last_point[0]):g}"
-                        args[i + 5] = f"{(float(args[i+5]) + last_point[1]):g}"
-                        last_point = [float(args[i + 4]), float(args[i + 5])]
-                elif command_letter in "h":
-                    for i, arg in enumerate(args):
-                        args[i] = f"{(float(arg) + last_point[0]):g}"
-                        last_point[0] = float(args[i])
-                elif command_letter in "v":
-                    for i, arg in enumerate(args):
-                        args[i] = f"{(float(arg) + last_point[1]):g}"
-                        last_point[1] = float(args[i])
-                elif command_letter in "a":
-                    for i in range(0, len(args), 7):
-                        args[i + 5] = f"{(float(args[i+5]) + last_point[0]):g}"
-                        args[i + 6] = f"{(float(args[i+6]) + last_point[1]):g}"
-                        last_point = [float(args[i + 5]), float(args[i + 6])]
-
-            ret_commands.append(command_letter.upper() + " ".join(args))
-
-            if command_letter in "Mm" and not first_point:
-                first_point = [float(args[0]), float(args[1])]
-            if command_letter in "Zz":
-                last_point = first_point
-                first_point = []  # acts like None
-
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+        polygon = AvPathPolygon()
+        polygon.add_polygon_arrays(pen.contours(), pen.signed_areas(), simplify_tolerance)
+        return polygon.path_data()
 
     @staticmethod
-    def transform_path_string(path_string: str, affine_trafo: List[float]) -> str:
-        """Transform the given SVG-_path_string_ by using the given _affine_trafo_.
-        Make sure the _path_string_ uses absolute coordinates.
-
-        Affine transform (see also shapely - Affine Transformations)
-            affine_trafo = [a00, a01, a10, a11, b0, b1]
-                | x' | = | a00 a01 b0 |   | x |
-                | y' | = | a10 a11 b1 | * | y |
-                | 1  | = |  0   0  1  |   | 1 |
+    def polygonize_contour_pens(
+        pens: List[AvContourPen], simplify_tolerance: Optional[float] = None
+    ) -> List[AvPathData]:
+        """Combine the closed contours of each of the given _pens_ (e.g. the glyphs of a line or a page)
+        to polygons like polygonize_contour_pen(), but the shapely objects of all contours
+        are handled at once (see AvPathPolygon.add_polygon_arrays_batch()).
 
         Args:
-            path_string (str): SVG-path-string input
-            affine_trafo (List[float]): Affine transformation
+            pens (List[AvContourPen]): pens each holding a drawn outline
+            simplify_tolerance (Optional[float], optional): remove points of the contours before combining them,
+                see AvPathPolygon.add_polygon_arrays(). Defaults to None.
 
         Returns:
-            str: the transformed _path_string_
+            List[AvPathData]: the polygonized path of each pen
         """
-
-        def transform(x_str: str, y_str: str) -> Tuple[str, str]:
-            x_new = affine_trafo[0] * float(x_str) + affine_trafo[1] * float(y_str) + affine_trafo[4]
-            y_new = affine_trafo[2] * float(x_str) + affine_trafo[3] * float(y_str) + affine_trafo[5]
-            return f"{x_new:g}", f"{y_new:g}"
-
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        ret_commands = []
-
-        for command in org_commands:
-            command_letter = command[0]
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-
-            if command_letter in "MLCSQT":  # (x,y) once or several times
-                for i in range(0, len(args), 2):
-                    (args[i + 0], args[i + 1]) = transform(args[i + 0], args[i + 1])
-            elif command_letter in "H":  # (x) once or several times
-                for i, _ in enumerate(args):
-                    (args[i], _) = transform(args[i], "1")
-            elif command_letter in "V":  # (y) once or several times
-                for i, _ in enumerate(args):
-                    (_, args[i]) = transform("1", args[i])
-            elif command_letter in "A":  # (rx ry angle flag flag x y)+
-                for i in range(0, len(args), 7):
-                    args[i + 0] = f"{float(args[i+0])*affine_trafo[0]:g}"
-                    args[i + 1] = f"{float(args[i+1])*affine_trafo[3]:g}"
-                    (args[i + 5], args[i + 6]) = transform(args[i + 5], args[i + 6])
-            ret_commands.append(command_letter.upper() + " ".join(args))
-
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+        polygons = [AvPathPolygon() for _ in pens]
+        AvPathPolygon.add_polygon_arrays_batch(
+            polygons, [pen.contours() for pen in pens], [pen.signed_areas() for pen in pens], simplify_tolerance
+        )
+        return AvPathPolygon.path_data_batch(polygons)
 
     @staticmethod
-    def polygonize_svg_path_string(svg_path_string: str) -> str:
-        if not svg_path_string:
-            svg_path_string = "M 0 0"
-        else:
-            poly_func = None
-            match av.consts.POLYGONIZE_TYPE:
-                case av.consts.Polygonize.UNIFORM:
-                    poly_func = AvPathPolygon.polygonize_uniform
-                case av.consts.Polygonize.BY_ANGLE:
-                    poly_func = AvPathPolygon.polygonize_by_angle
-            svg_path_string = AvPathPolygon.polygonize_path(svg_path_string, poly_func)
+    def polygonize_path_data(
+        path: AvPathData,
+        affine_trafo: Optional[List[float]] = None,
+        tolerance: Optional[float] = None,
+        simplify_tolerance: Optional[float] = None,
+    ) -> AvPathData:
+        """Polygonize the given _path_ in one stage:
+        the curves are flattened into coordinate arrays (optionally transformed by _affine_trafo_),
+        which are combined to a shapely.MultiPolygon without any intermediate path strings.
+        See contour_pen() regarding POLYGONIZE_TYPE and _tolerance_.
+
+        Args:
+            path (AvPathData): path consisting of the commands M, L, H, V, C, Q and Z
+            affine_trafo (Optional[List[float]], optional): [a00, a01, a10, a11, b0, b1]. Defaults to None.
+            tolerance (Optional[float], optional): max. chord deviation in units after _affine_trafo_.
+                Defaults to None.
+            simplify_tolerance (Optional[float], optional): max. deviation (in units after _affine_trafo_)
+                when removing nearly collinear points of the flattened contours. Defaults to None.
 
-            polygon = AvPathPolygon()
-            polygon.add_path_string(svg_path_string)
-            path_strings = polygon.path_strings()
-            svg_path_string = " ".join(path_strings)
-        return svg_path_string
+        Returns:
+            AvPathData: the polygonized path, i.e. the rings of the resulting polygons
+        """
+        pen = AvSvgPath.contour_pen(None, affine_trafo, tolerance)
+        path.draw(pen)
+        return AvSvgPath.polygonize_contour_pen(pen, simplify_tolerance)
 
 
 class AvPathPolygon:
     @staticmethod
     def multipolygon_to_path_string(
-        multipolygon: shapely.geometry.MultiPolygon,
+        multipolygon: shapely.geometry.base.BaseGeometry, serializer: Optional[AvPathSerializer] = None
     ) -> List[str]:
-        svg_string = multipolygon.svg()
-        path_strings = re.findall(r'd="([^"]+)"', svg_string)
-        return path_strings
+        """Returns one path string per polygon of the given _multipolygon_, see multipolygons_to_path_strings().
+
+        Args:
+            multipolygon (shapely.geometry.base.BaseGeometry): a MultiPolygon, Polygon or GeometryCollection
+            serializer (Optional[AvPathSerializer], optional): serializer for compact path strings.
+                Defaults to None, i.e. absolute path strings like AvPathData.to_string().
+
+        Returns:
+            List[str]: the path strings "M L ... Z" of the exterior and the interiors of each polygon
+        """
+        return AvPathPolygon.multipolygons_to_path_strings([multipolygon], serializer)[0]
+
+    @staticmethod
+    def multipolygons_to_path_strings(
+        multipolygons: Sequence[shapely.geometry.base.BaseGeometry],
+        serializer: Optional[AvPathSerializer] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Returns one path string per polygon of each of the given _multipolygons_ (e.g. of all letters of a page).
+        The coordinates of all rings are fetched by single calls of the vectorized shapely functions
+        and serialized as one AvPathDataBatch (one item per polygon), i.e. without any SVG fragment
+        and with the precision rules of AvPathData.to_string() or of the given _serializer_.
+
+        Args:
+            multipolygons (Sequence[shapely.geometry.base.BaseGeometry]): MultiPolygons, Polygons
+                or GeometryCollections, other parts than polygons are ignored
+            serializer (Optional[AvPathSerializer], optional): serializer for compact path strings.
+                Defaults to None, i.e. absolute path strings like AvPathData.to_string().
+            max_workers (Optional[int], optional): number of worker processes for large batches,
+                see AvPathDataBatch.to_strings(). Defaults to None, i.e. the number of cores.
+
+        Returns:
+            List[List[str]]: the path strings of the polygons of each multipolygon
+        """
+        geometries = numpy.empty(len(multipolygons), dtype=object)
+        geometries[:] = list(multipolygons)
+        (polygons, owners) = shapely.get_parts(geometries, return_index=True)
+        is_polygon = (shapely.get_type_id(polygons) == shapely.GeometryType.POLYGON) & ~shapely.is_empty(polygons)
+        (polygons, owners) = (polygons[is_polygon], owners[is_polygon])
+        (rings, ring_polygons) = shapely.get_rings(polygons, return_index=True)
+        (coords, ring_indices) = shapely.get_coordinates(rings, return_index=True)
+
+        # each ring "M L ... L Z": the closing point of a ring (equal to its first point) becomes the closepath
+        ring_lengths = numpy.bincount(ring_indices, minlength=len(rings))
+        ring_ends = numpy.cumsum(ring_lengths)
+        ring_starts = ring_ends - ring_lengths
+        commands = numpy.full(len(coords), ord("L"), dtype=numpy.uint8)
+        commands[ring_starts] = ord("M")
+        commands[ring_ends - 1] = ord("Z")
+        path = AvPathData(commands, coords[commands != ord("Z")].ravel())
+        item_offsets = numpy.append(ring_starts, len(coords))[
+            numpy.searchsorted(ring_polygons, numpy.arange(len(polygons) + 1))
+        ]
+        path_strings = AvPathDataBatch(path, item_offsets).to_strings(serializer, max_workers)
+
+        ends = numpy.searchsorted(owners, numpy.arange(len(geometries)), side="right").tolist()
+        return [path_strings[start:end] for start, end in zip([0] + ends[:-1], ends)]
 
     @staticmethod
     def deepcopy(
@@ -320,8 +303,11 @@ class AvPathPolygon:
                     ret_path_string += polygonize_segment_func(segment)
                 elif isinstance(segment, svgpathtools.Line):
                     ret_path_string += lineto(segment.end)
+                elif isinstance(segment, svgpathtools.Arc):
+                    for curve in segment.as_cubic_curves(max(1, math.ceil(abs(segment.delta) / 45))):
+                        ret_path_string += polygonize_segment_func(curve)
                 else:
-                    print("ERROR during polygonizing: " + "not supported segment: " + segment)
+                    print("ERROR during polygonizing: " + "not supported segment: " + str(segment))
                     ret_path_string += lineto(segment.end)
             if sub_path.isclosed():
                 ret_path_string += "Z "
@@ -332,27 +318,116 @@ class AvPathPolygon:
         if multipolygon:
             self.multipolygon = multipolygon
 
-    def add_polygon_arrays(self, polygon_arrays: list[numpy.ndarray]):
-        # Convert numpy arrays to shapely.Polygons
-        polygons = [shapely.Polygon(polygon) for polygon in polygon_arrays]
+    def add_polygon_arrays(
+        self,
+        polygon_arrays: list[numpy.ndarray],
+        signed_areas: Optional[numpy.ndarray] = None,
+        simplify_tolerance: Optional[float] = None,
+    ):
+        """Add the given closed contours (e.g. of ave.fonttools.AvContourPen) to the multipolygon.
+        The biggest contour is additive, the others are additive if they have the same orientation.
+        See add_polygon_arrays_batch() to handle the contours of several outlines at once.
+
+        Args:
+            polygon_arrays (list[numpy.ndarray]): contours, each of shape (number of points, 2)
+            signed_areas (Optional[numpy.ndarray], optional): signed area of each contour
+                (positive if counterclockwise), calculated by shapely if not given. Defaults to None.
+            simplify_tolerance (Optional[float], optional): if given, nearly collinear points are removed
+                from all contours at once (Douglas-Peucker, see shapely.simplify()) before they are combined,
+                so that each contour deviates at most _simplify_tolerance_ from the flattened one.
+                Contours collapsing by the simplification (smaller than the tolerance) are dropped.
+                Self-intersections caused by the simplification are removed like the ones of the font
+                (buffer(0) below), so that counters (e.g. of "o", "e", "8") stay valid holes. Defaults to None.
+        """
+        AvPathPolygon.add_polygon_arrays_batch(
+            [self], [polygon_arrays], None if signed_areas is None else [signed_areas], simplify_tolerance
+        )
+
+    @staticmethod
+    def add_polygon_arrays_batch(
+        path_polygons: List[AvPathPolygon],
+        polygon_arrays: List[List[numpy.ndarray]],
+        signed_areas: Optional[List[numpy.ndarray]] = None,
+        simplify_tolerance: Optional[float] = None,
+    ):
+        """Add the closed contours of several outlines (e.g. the glyphs of a line or a page)
+        each to its AvPathPolygon like add_polygon_arrays().
+        The contours of all outlines are created, simplified, checked and (if only nested into each other)
+        assembled by single calls of the vectorized shapely functions,
+        which avoid the overhead per object and release the GIL.
+
+        Args:
+            path_polygons (List[AvPathPolygon]): the AvPathPolygon of each outline
+            polygon_arrays (List[List[numpy.ndarray]]): the contours of each outline
+            signed_areas (Optional[List[numpy.ndarray]], optional): the signed areas of the contours
+                of each outline, calculated by shapely if not given. Defaults to None.
+            simplify_tolerance (Optional[float], optional): see add_polygon_arrays(). Defaults to None.
+        """
+        contours = [contour for contours in polygon_arrays for contour in contours]
+        if not contours:
+            return
+        counts = numpy.array([len(contours) for contours in polygon_arrays])
+        outlines = numpy.repeat(numpy.arange(len(polygon_arrays)), counts)
+        polygons = shapely.polygons(
+            shapely.linearrings(
+                numpy.concatenate(contours),
+                indices=numpy.repeat(numpy.arange(len(contours)), [len(contour) for contour in contours]),
+            )
+        )
+        if simplify_tolerance:
+            polygons = shapely.simplify(polygons, simplify_tolerance, preserve_topology=False)
+        if signed_areas is None:
+            (areas, is_ccw) = (shapely.area(polygons), shapely.is_ccw(shapely.get_exterior_ring(polygons)))
+        else:
+            areas = numpy.concatenate([numpy.asarray(areas, dtype=float) for areas in signed_areas])
+            (areas, is_ccw) = (numpy.abs(areas), areas > 0)
+        if simplify_tolerance:
+            # drop contours collapsed by the simplification (e.g. small dots), so that no EMPTY parts remain:
+            kept = ~shapely.is_empty(polygons)
+            (polygons, areas, is_ccw, outlines) = (polygons[kept], areas[kept], is_ccw[kept], outlines[kept])
+            counts = numpy.bincount(outlines, minlength=len(path_polygons))
+
+        # Sort polygons of each outline by area in descending order so that the first one is the biggest one
+        order = numpy.lexsort((-areas, outlines))
+        (polygons, is_ccw) = (polygons[order], is_ccw[order])
+        is_valid = shapely.is_valid(polygons)
+
+        # Outlines with several valid contours are assembled in one pass (if the contours are nested only),
+        # the others are combined one after the other (a single contour is only repaired by buffer(0)):
+        is_empty = numpy.array([path_polygon.multipolygon.is_empty for path_polygon in path_polygons])
+        is_invalid = numpy.bincount(outlines, weights=~is_valid, minlength=len(path_polygons)) > 0
+        selected = (is_empty & ~is_invalid & (counts > 1))[outlines]
+        multipolygons: Dict[int, shapely.geometry.MultiPolygon] = {}
+        if numpy.any(selected):
+            multipolygons = AvPathPolygon.assemble_nested_polygons(
+                polygons[selected], is_ccw[selected], outlines[selected]
+            )
+        selected = numpy.ones(len(path_polygons), dtype=bool)
+        selected[list(multipolygons)] = False
+        selected = selected[outlines]
+        if numpy.any(selected):
+            polygons[selected] = shapely.buffer(polygons[selected], 0)  # get rid of self-intersections (4,9)
+        ends = numpy.cumsum(counts)
+        for outline, (path_polygon, start, end) in enumerate(zip(path_polygons, (ends - counts).tolist(), ends)):
+            if outline in multipolygons:
+                path_polygon.multipolygon = multipolygons[outline]
+            else:
+                path_polygon.add_polygons(polygons[start:end], is_ccw[start:end])
 
-        # Sort polygons by area in descending order so that the first one is the biggest one
-        sorted_polygons = sorted(polygons, key=lambda p: abs(p.area), reverse=True)
+    def add_polygons(self, sorted_polygons: numpy.ndarray, is_ccw: numpy.ndarray):
+        """Combine the given contours (see add_polygon_arrays()) with the multipolygon
+        one after the other by union and difference.
 
+        Args:
+            sorted_polygons (numpy.ndarray): shapely.Polygon of each contour (without self-intersections),
+                sorted by descending area
+            is_ccw (numpy.ndarray): orientation of each contour
+        """
         # First polygon of sorted_polygons should always be "positive" == "additive".
         # All other arrays are additive, if same orientation like first polygon.
         first_is_ccw = True
 
-        for polygon in sorted_polygons:
-            polygon_is_ccw = polygon.exterior.is_ccw
-            polygon = polygon.buffer(0)  # get rid of self-intersections (4,9)
-
-            # print(polygon_is_ccw, polygon.exterior.is_ccw)
-            # exterior_points = list(polygon.exterior.coords)
-            # for point in exterior_points:
-            #     print(point)
-            # print()
-
+        for polygon_is_ccw, polygon in zip(is_ccw.tolist(), sorted_polygons):
             if self.multipolygon.is_empty:  # just add first polygon and store its orientation
                 first_is_ccw = polygon_is_ccw
                 self.multipolygon = shapely.geometry.MultiPolygon([polygon])
@@ -366,15 +441,127 @@ class AvPathPolygon:
                 else:  # different orient --> substract from existing...
                     self.multipolygon = self.multipolygon.difference(polygon)
 
+    @staticmethod
+    def assemble_nested_polygons(
+        polygons: numpy.ndarray, is_ccw: numpy.ndarray, outlines: numpy.ndarray
+    ) -> Dict[int, shapely.geometry.MultiPolygon]:
+        """Assemble the valid contours of each outline in one pass if they are only nested into each other
+        (like the contours of most glyphs), i.e. no contour intersects another one of the same outline.
+        Same result as combining them one after the other by union and difference (see add_polygons()),
+        but the nesting of the contours of all outlines is classified by bounding box prefilters
+        and vectorized containment tests and all polygons are created with their holes by one vectorized constructor.
+        A contour inside a shell (smallest containing contour) is a hole. Otherwise it is a shell,
+        if it has the orientation of the first contour of its outline, or else it is dropped.
+
+        Args:
+            polygons (numpy.ndarray): shapely.Polygon of each contour,
+                sorted by outline and by descending area within each outline
+            is_ccw (numpy.ndarray): orientation of each contour
+            outlines (numpy.ndarray): index of the outline of each contour
+
+        Returns:
+            Dict[int, shapely.geometry.MultiPolygon]: multipolygon of each outline,
+                except for outlines whose contours intersect each other
+        """
+        if not len(polygons):
+            return {}
+        # pairs (bigger, smaller) of contours of the same outline whose bounding boxes overlap:
+        ends = numpy.searchsorted(outlines, outlines, side="right")
+        num_pairs = ends - numpy.arange(len(polygons)) - 1
+        bigger = numpy.repeat(numpy.arange(len(polygons)), num_pairs)
+        smaller = bigger + 1 + numpy.arange(len(bigger)) - numpy.repeat(numpy.cumsum(num_pairs) - num_pairs, num_pairs)
+        bounds = shapely.bounds(polygons)
+        overlap = numpy.all(bounds[bigger, :2] <= bounds[smaller, 2:], axis=1)
+        overlap &= numpy.all(bounds[smaller, :2] <= bounds[bigger, 2:], axis=1)
+        (bigger, smaller) = (bigger[overlap], smaller[overlap])
+        shapely.prepare(polygons)
+        nested = shapely.contains_properly(polygons[bigger], polygons[smaller])
+        assembled = numpy.ones(len(polygons), dtype=bool)
+        if not numpy.all(nested):
+            crossing = shapely.intersects(polygons[bigger[~nested]], polygons[smaller[~nested]])
+            assembled = ~numpy.isin(outlines, outlines[bigger[~nested][crossing]])
+        (bigger, smaller) = (bigger[nested], smaller[nested])
+
+        # the parent of a contour is its smallest container, i.e. the one sorted last:
+        parents = numpy.full(len(polygons), -1)
+        numpy.maximum.at(parents, smaller, bigger)
+        # the owner of a hole is its parent shell, the owner of a shell is the shell itself:
+        (shell, hole, dropped) = (0, 1, 2)
+        kinds = numpy.empty(len(polygons), dtype=int)
+        owners = numpy.arange(len(polygons))
+        first_is_ccw = is_ccw[numpy.searchsorted(outlines, outlines)]
+        for index, parent in enumerate(parents.tolist()):
+            if parent >= 0 and kinds[parent] == shell:
+                (kinds[index], owners[index]) = (hole, parent)
+            else:
+                kinds[index] = shell if is_ccw[index] == first_is_ccw[index] else dropped
+
+        # exteriors clockwise and holes counterclockwise (like polygon.orient(sign=-1.0)):
+        rings = shapely.get_exterior_ring(polygons)
+        reverse = numpy.where(kinds == shell, is_ccw, ~is_ccw)
+        if numpy.any(reverse):
+            rings[reverse] = shapely.reverse(rings[reverse])
+
+        # each shell followed by its holes (a hole is sorted after its shell, as it is smaller):
+        kept = numpy.flatnonzero((kinds != dropped) & assembled)
+        if not len(kept):
+            return {}
+        kept = kept[numpy.argsort(owners[kept], kind="stable")]
+        is_shell = numpy.diff(owners[kept], prepend=-1) != 0
+        shell_outlines = outlines[kept[is_shell]]
+        is_first_shell = numpy.diff(shell_outlines, prepend=-1) != 0
+        multipolygons = shapely.multipolygons(
+            shapely.polygons(rings[kept], indices=numpy.cumsum(is_shell) - 1),
+            indices=numpy.cumsum(is_first_shell) - 1,
+        )
+        assembled_outlines = shell_outlines[is_first_shell]
+        return dict(zip(assembled_outlines.tolist(), multipolygons))
+
     def add_path_string(self, path_string: str):
-        mpl_path: matplotlib.path.Path = svgpath2mpl.parse_path(path_string)
-        # polygon_arrays = cast(list[numpy.ndarray], mpl_path.to_polygons())
-        polygon_arrays = av.helper.HelperTypeHinting.ensure_list_of_ndarrays(mpl_path.to_polygons())
-        self.add_polygon_arrays(polygon_arrays)
+        """Add the contours of the given _path_string_ (curves are flattened uniformly) to the multipolygon.
+        Smooth curves (S, T) and arcs (A) are flattened segment by segment by svgpathtools first."""
+        pen = AvContourPen(None, av.consts.POLYGONIZE_UNIFORM_NUM_POINTS - 1)
+        path = AvPathData.from_string(path_string)
+        if not numpy.all(numpy.isin(path.commands, _DRAWABLE_COMMANDS)):
+            path = AvPathData.from_string(AvPathPolygon.polygonize_path(path_string, AvPathPolygon.polygonize_uniform))
+        path.draw(pen)
+        self.add_polygon_arrays(pen.contours(), pen.signed_areas())
 
     def path_strings(self) -> List[str]:
         return AvPathPolygon.multipolygon_to_path_string(self.multipolygon)
 
+    def path_data(self) -> AvPathData:
+        """Returns the rings (exterior and interiors) of all polygons as closed polylines"""
+        rings = []
+        for polygon in shapely.get_parts(self.multipolygon):
+            if not isinstance(polygon, shapely.Polygon):
+                continue
+            rings.append(numpy.asarray(polygon.exterior.coords))
+            rings.extend(numpy.asarray(interior.coords) for interior in polygon.interiors)
+        return AvPathData.from_polylines(rings)
+
+    @staticmethod
+    def path_data_batch(path_polygons: List[AvPathPolygon]) -> List[AvPathData]:
+        """Returns the rings of each of the given _path_polygons_ like path_data(),
+        the coordinates of all rings are fetched by single calls of the vectorized shapely functions.
+
+        Args:
+            path_polygons (List[AvPathPolygon]): e.g. the polygonized glyphs of a line or a page
+
+        Returns:
+            List[AvPathData]: the rings of each AvPathPolygon as closed polylines
+        """
+        multipolygons = numpy.empty(len(path_polygons), dtype=object)
+        multipolygons[:] = [path_polygon.multipolygon for path_polygon in path_polygons]
+        (polygons, outlines) = shapely.get_parts(multipolygons, return_index=True)
+        is_polygon = shapely.get_type_id(polygons) == shapely.GeometryType.POLYGON
+        (rings, ring_polygons) = shapely.get_rings(polygons[is_polygon], return_index=True)
+        (coords, ring_indices) = shapely.get_coordinates(rings, return_index=True)
+        polylines = numpy.split(coords, numpy.flatnonzero(numpy.diff(ring_indices)) + 1) if len(coords) else []
+        ring_outlines = outlines[is_polygon][ring_polygons]
+        ends = numpy.searchsorted(ring_outlines, numpy.arange(len(path_polygons)), side="right").tolist()
+        return [AvPathData.from_polylines(polylines[start:end]) for start, end in zip([0] + ends[:-1], ends)]
+
     # def svg_paths(self, dwg: svgwrite.Drawing, **svg_properties) -> List[svgwrite.elementfactory.ElementBuilder]:
     #     svg_paths = []
     #     path_strings = self.path_strings()
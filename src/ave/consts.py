@@ -17,6 +17,23 @@ class Align(Enum):
     BOTH = auto()
 
 
+class Compression(Enum):
+    """
+    Enum to define compression strategies for svgz-files.
+    All strategies create standard gzip streams.
+    """
+
+    FAST = auto()  # zlib level 1, e.g. for iterative previews
+    BEST = auto()  # zlib level 9, e.g. for final print files
+    ZOPFLI = auto()  # zopfli, some percent smaller than BEST but much slower, e.g. for release artifacts
+    PARALLEL = auto()  # zlib level 9 in independent blocks compressed by all cores, e.g. for big posters
+
+
+# Level of detail (LOD) of flattened glyph outlines, see AvGlyph.flattened_outline() and AvLetter.level_of_detail:
+LOD_TOLERANCE = 0.01 / 150  # max. chord deviation in real units, e.g. 0.01mm on a viewbox of 150mm scaled to 1
+LOD_CACHE_SIZE = 4  # max. number of levels of detail (flattened outlines) kept per glyph, least recently used dropped
+
+
 def main():
     """Main"""
     print("sys.path:  ", sys.path)
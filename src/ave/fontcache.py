@@ -0,0 +1,332 @@
+"""Precompiled fonts: polygonized glyphs persisted in a memory-mappable binary file"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy
+import shapely
+from fontTools.ttLib import TTFont
+
+from ave.fonttools import FontHelper
+from ave.geom import AvBox
+from ave.glyph import AvGlyphFactoryABC, AvPolygonizedGlyph
+
+
+class AvFontCache:
+    """
+    Polygonized glyphs (contour rings and metrics) of all characters of a font instance,
+    precompiled once by precompile() and loaded by memory mapping (see load()) instead of recomputing.
+
+    File layout (all values little-endian):
+        - magic b"AVFC", version (uint32), length of the header (uint32)
+        - header (JSON): font information, parameters, characters and the layout of the arrays
+        - arrays, each aligned to ALIGNMENT bytes:
+            - points (float64, shape (number of points, 2)): the points of all rings in unitsPerEm
+            - ring_offsets (int64): index of the first point of each ring plus the number of points
+            - ring_is_exterior (uint8): 1 for an exterior ring (shell), 0 for an interior ring (hole) of the
+                preceding exterior ring
+            - glyph_ring_offsets (int64): index of the first ring of each glyph plus the number of rings
+            - metrics (float64, shape (number of glyphs, 5)): advance width and bounding box
+                (xmin, ymin, xmax, ymax) of each glyph
+    """
+
+    MAGIC = b"AVFC"
+    VERSION = 1
+    ALIGNMENT = 64
+    ARRAYS = ("points", "ring_offsets", "ring_is_exterior", "glyph_ring_offsets", "metrics")
+
+    def __init__(self, header: Dict[str, Any], arrays: Dict[str, numpy.ndarray]) -> None:
+        """
+        Initializes a new font cache, use precompile() or load() to create one.
+
+        Args:
+            header (Dict[str, Any]): font information, parameters and characters
+            arrays (Dict[str, numpy.ndarray]): the arrays of ARRAYS
+        """
+        self.header = header
+        self.arrays = arrays
+        self._glyph_index: Dict[str, int] = {character: index for index, character in enumerate(header["characters"])}
+
+    @property
+    def characters(self) -> List[str]:
+        """The precompiled characters."""
+        return self.header["characters"]
+
+    @property
+    def steps(self) -> int:
+        """Number of line segments per curve used for polygonization."""
+        return self.header["steps"]
+
+    @property
+    def tolerance(self) -> Optional[float]:
+        """Maximum deviation (in unitsPerEm) used for polygonization, replaces _steps_ if set."""
+        return self.header["tolerance"]
+
+    def __contains__(self, character: str) -> bool:
+        return character in self._glyph_index
+
+    def rings(self, character: str) -> List[numpy.ndarray]:
+        """
+        Returns the rings of the polygonized glyph, each exterior ring followed by its interior rings.
+
+        Args:
+            character (str): the character
+
+        Returns:
+            List[numpy.ndarray]: one array (view of the memory-mapped file) of shape (number of points, 2) per ring
+        """
+        (first, last) = self._ring_range(character)
+        (points, ring_offsets) = (self.arrays["points"], self.arrays["ring_offsets"].tolist())
+        return [points[ring_offsets[ring] : ring_offsets[ring + 1]] for ring in range(first, last)]
+
+    def polygonized_path(self, character: str) -> shapely.MultiPolygon:
+        """
+        Returns the polygonized glyph like AvPolygonizedGlyph.polygonized_path().
+
+        Args:
+            character (str): the character
+
+        Returns:
+            shapely.MultiPolygon: the polygonized glyph, empty e.g. for a space
+        """
+        (first, _) = self._ring_range(character)
+        polygons: List[shapely.Polygon] = []
+        is_exterior = self.arrays["ring_is_exterior"]
+        for index, ring in enumerate(self.rings(character)):
+            if is_exterior[first + index]:
+                polygons.append(shapely.Polygon(ring))
+            else:
+                polygons[-1] = shapely.Polygon(polygons[-1].exterior, [*polygons[-1].interiors, ring])
+        return shapely.MultiPolygon(polygons)
+
+    def advance_width(self, character: str) -> float:
+        """The official width (including LSB and RSB) of the glyph in unitsPerEm."""
+        return float(self.arrays["metrics"][self._glyph_index[character], 0])
+
+    def bounding_box(self, character: str) -> AvBox:
+        """The bounding box of the polygonized glyph in unitsPerEm."""
+        return AvBox(*self.arrays["metrics"][self._glyph_index[character], 1:].tolist())
+
+    def _ring_range(self, character: str) -> Tuple[int, int]:
+        index = self._glyph_index[character]
+        glyph_ring_offsets = self.arrays["glyph_ring_offsets"]
+        return (int(glyph_ring_offsets[index]), int(glyph_ring_offsets[index + 1]))
+
+    @classmethod
+    def precompile(
+        cls,
+        font_filename: str,
+        output_filename: str,
+        axes_values: Optional[Dict[str, float]] = None,
+        steps: int = 10,
+        tolerance: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> AvFontCache:
+        """
+        Polygonize all characters of getBestCmap() of the font instance (see AvPolygonizedGlyph)
+        by a pool of worker processes and write the rings and metrics to _output_filename_.
+
+        Args:
+            font_filename (str): the font file
+            output_filename (str): the file to write, e.g. "fonts/Petrona-wght700.avfc"
+            axes_values (Optional[Dict[str, float]], optional): axes values of a variable font,
+                e.g. {"wght": 700}. Defaults to None, i.e. the font as it is.
+            steps (int, optional): number of line segments per curve. Defaults to 10.
+            tolerance (Optional[float], optional): maximum deviation (in unitsPerEm) of the line segments
+                from the curves, replaces _steps_. Defaults to None.
+            max_workers (Optional[int], optional): number of worker processes, 1 to polygonize in this process.
+                Defaults to None, i.e. the number of cores.
+
+        Returns:
+            AvFontCache: the written font cache, memory-mapped from _output_filename_
+        """
+        ttfont = _load_font(font_filename, axes_values)
+        characters = [chr(code) for code in sorted(ttfont.getBestCmap())]
+        max_workers = min(max_workers or os.cpu_count() or 1, max(len(characters), 1))
+        chunk_limits = numpy.linspace(0, len(characters), max_workers + 1).astype(numpy.intp).tolist()
+        chunks = [characters[first:last] for first, last in zip(chunk_limits[:-1], chunk_limits[1:])]
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers) as executor:
+                num_chunks = len(chunks)
+                results = list(
+                    executor.map(
+                        _polygonize_characters,
+                        [font_filename] * num_chunks,
+                        [axes_values] * num_chunks,
+                        chunks,
+                        [steps] * num_chunks,
+                        [tolerance] * num_chunks,
+                    )
+                )
+        else:
+            results = [_polygonize_characters(ttfont, None, characters, steps, tolerance)]
+
+        # concatenate the chunks, offsets continue from the previous chunk:
+        (points, ring_lengths, ring_is_exterior, glyph_num_rings, metrics) = [
+            numpy.concatenate(arrays) for arrays in zip(*results)
+        ]
+        arrays = {
+            "points": points.reshape(-1, 2),
+            "ring_offsets": numpy.append(0, numpy.cumsum(ring_lengths)).astype(numpy.int64),
+            "ring_is_exterior": ring_is_exterior.astype(numpy.uint8),
+            "glyph_ring_offsets": numpy.append(0, numpy.cumsum(glyph_num_rings)).astype(numpy.int64),
+            "metrics": metrics.reshape(-1, 5),
+        }
+        header = {
+            "family_name": ttfont["name"].getDebugName(1),  # type: ignore
+            "subfamily_name": ttfont["name"].getDebugName(2),  # type: ignore
+            "units_per_em": ttfont["head"].unitsPerEm,  # type: ignore
+            "ascender": ttfont["hhea"].ascender,  # type: ignore
+            "descender": ttfont["hhea"].descender,  # type: ignore
+            "line_gap": ttfont["hhea"].lineGap,  # type: ignore
+            "axes_values": axes_values or {},
+            "steps": steps,
+            "tolerance": tolerance,
+            "characters": characters,
+        }
+        cls.write(output_filename, header, arrays)
+        return cls.load(output_filename)
+
+    @classmethod
+    def write(cls, filename: str, header: Dict[str, Any], arrays: Dict[str, numpy.ndarray]):
+        """
+        Write _header_ and _arrays_ (see ARRAYS) to _filename_, see class description for the layout.
+
+        Args:
+            filename (str): the file to write
+            header (Dict[str, Any]): font information, parameters and characters
+            arrays (Dict[str, numpy.ndarray]): the arrays of ARRAYS
+        """
+        (layout, offset) = ({}, 0)
+        for name in cls.ARRAYS:
+            array = numpy.ascontiguousarray(arrays[name])
+            layout[name] = {"dtype": array.dtype.newbyteorder("<").str, "shape": array.shape, "offset": offset}
+            offset += -(-array.nbytes // cls.ALIGNMENT) * cls.ALIGNMENT
+        header_bytes = json.dumps({**header, "arrays": layout}).encode("utf-8")
+        data_start = -(-(12 + len(header_bytes)) // cls.ALIGNMENT) * cls.ALIGNMENT
+        with open(filename, "wb") as cache_file:
+            cache_file.write(cls.MAGIC + struct.pack("<II", cls.VERSION, len(header_bytes)) + header_bytes)
+            for name in cls.ARRAYS:
+                cache_file.seek(data_start + layout[name]["offset"])
+                cache_file.write(numpy.ascontiguousarray(arrays[name], dtype=layout[name]["dtype"]).tobytes())
+            cache_file.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, filename: str) -> AvFontCache:
+        """
+        Load a font cache written by precompile(). The arrays are memory-mapped (read-only),
+        i.e. only the pages of the used glyphs are read from the file.
+
+        Args:
+            filename (str): the file written by precompile()
+
+        Returns:
+            AvFontCache: the font cache
+        """
+        with open(filename, "rb") as cache_file:
+            (magic, version, header_length) = struct.unpack("<4sII", cache_file.read(12))
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f"{filename} is no font cache of version {cls.VERSION}")
+            header = json.loads(cache_file.read(header_length).decode("utf-8"))
+        data_start = -(-(12 + header_length) // cls.ALIGNMENT) * cls.ALIGNMENT
+        buffer = numpy.memmap(filename, dtype=numpy.uint8, mode="r")
+        arrays = {}
+        for name, layout in header.pop("arrays").items():
+            dtype = numpy.dtype(layout["dtype"])
+            start = data_start + layout["offset"]
+            num_bytes = int(numpy.prod(layout["shape"])) * dtype.itemsize
+            arrays[name] = buffer[start : start + num_bytes].view(dtype).reshape(layout["shape"])
+        return cls(header, arrays)
+
+
+class AvFontCacheGlyphFactory(AvGlyphFactoryABC):
+    """Factory for polygonized glyphs taken from a precompiled font cache.
+    Characters which are not part of the cache are polygonized on first access."""
+
+    def __init__(self, font_cache: AvFontCache) -> None:
+        """
+        Initializes the factory.
+
+        Args:
+            font_cache (AvFontCache): the precompiled font, see AvFontCache.precompile()
+        """
+        self.font_cache = font_cache
+
+    def create_glyph(self, font: TTFont, character: str) -> AvPolygonizedGlyph:
+        font_cache = self.font_cache
+        if character not in font_cache:
+            return AvPolygonizedGlyph(font, character, font_cache.steps, font_cache.tolerance)
+        polygonized_path = font_cache.polygonized_path(character)
+        return AvPolygonizedGlyph(font, character, font_cache.steps, font_cache.tolerance, polygonized_path)
+
+
+def _load_font(font_filename: str, axes_values: Optional[Dict[str, float]]) -> TTFont:
+    """Load the font instance of _font_filename_ at the given _axes_values_ (if any)."""
+    ttfont = TTFont(font_filename)
+    if axes_values:
+        ttfont = FontHelper.instantiate_ttfont(ttfont, axes_values)
+    return ttfont
+
+
+def _polygonize_characters(
+    font: Any,
+    axes_values: Optional[Dict[str, float]],
+    characters: Sequence[str],
+    steps: int,
+    tolerance: Optional[float],
+) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Polygonize the given _characters_ (module level to be usable by worker processes).
+    _font_ is a TTFont or the filename of the font (loaded at _axes_values_).
+    Returns the points, the number of points and the exterior flag of each ring,
+    the number of rings of each glyph and the metrics of each glyph.
+    """
+    ttfont = font if isinstance(font, TTFont) else _load_font(font, axes_values)
+    (rings, ring_is_exterior, glyph_num_rings, metrics) = ([], [], [], [])
+    for character in characters:
+        glyph = AvPolygonizedGlyph(ttfont, character, steps, tolerance)
+        num_rings = len(rings)
+        for polygon in glyph.polygonized_path().geoms:
+            rings.append(shapely.get_coordinates(polygon.exterior)[:-1])
+            rings.extend(shapely.get_coordinates(interior)[:-1] for interior in polygon.interiors)
+            ring_is_exterior.extend([True] + [False] * len(polygon.interiors))
+        glyph_num_rings.append(len(rings) - num_rings)
+        box = glyph.bounding_box()
+        metrics.append((glyph.width(), box.xmin, box.ymin, box.xmax, box.ymax))
+    return (
+        numpy.concatenate(rings).ravel() if rings else numpy.empty(0),
+        numpy.array([len(ring) for ring in rings], dtype=numpy.int64),
+        numpy.array(ring_is_exterior, dtype=bool),
+        numpy.array(glyph_num_rings, dtype=numpy.int64),
+        numpy.array(metrics, dtype=numpy.float64).ravel(),
+    )
+
+
+def main():
+    """Precompile a font from the command line, e.g.
+    python -m ave.fontcache fonts/Petrona-VariableFont_wght.ttf fonts/Petrona-wght700.avfc --axis wght=700
+    """
+    parser = argparse.ArgumentParser(description="Polygonize all glyphs of a font into a font cache file.")
+    parser.add_argument("font_filename", help="the font file")
+    parser.add_argument("output_filename", help="the font cache file to write")
+    parser.add_argument("--axis", action="append", default=[], help="axis value of a variable font, e.g. wght=700")
+    parser.add_argument("--steps", type=int, default=10, help="number of line segments per curve")
+    parser.add_argument("--tolerance", type=float, default=None, help="max. deviation in unitsPerEm")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    axes_values = {tag: float(value) for tag, value in (axis.split("=") for axis in args.axis)}
+    font_cache = AvFontCache.precompile(
+        args.font_filename, args.output_filename, axes_values, args.steps, args.tolerance, args.workers
+    )
+    print(f"{len(font_cache.characters)} glyphs written to {args.output_filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,69 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy
 from fontTools.pens.basePen import BasePen
 from fontTools.pens.recordingPen import RecordingPen
 from fontTools.ttLib import TTFont
 from fontTools.varLib import instancer
 
+from ave.svgpath import AvPathData, AvPathDataBatch
+
+_FLAG_ON_CURVE = 0x01  # flags of the glyf table, see fontTools.ttLib.tables._g_l_y_f
+_FLAG_CUBIC = 0x80
+_NUM_COORDS = numpy.zeros(256, dtype=numpy.intp)  # number of coordinates by command of glyf_path_data()
+_NUM_COORDS[[ord("M"), ord("L"), ord("Q")]] = (2, 2, 4)
+
+
+def _quadratic_contours(
+    points: numpy.ndarray, on_curve: numpy.ndarray, ends: numpy.ndarray
+) -> Optional[Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]:
+    # Convert closed TrueType contours (points with on-curve flags, end index (exclusive) of each contour)
+    # into the commands and coords of M, L, Q and Z like fontTools' Glyph.draw() into AvPathDataPen,
+    # additionally the number of commands of each contour. None if a contour has no on-curve point.
+    if not len(ends):
+        return (numpy.empty(0, dtype=numpy.uint8), numpy.empty(0), numpy.empty(0, dtype=numpy.intp))
+    starts = numpy.append(0, ends[:-1])
+    lengths = ends - starts
+    contour = numpy.repeat(numpy.arange(len(starts)), lengths)
+    local = numpy.arange(len(points)) - starts[contour]
+    first_on = numpy.minimum.reduceat(numpy.where(on_curve, local, lengths[contour]), starts)
+    if numpy.any(first_on == lengths):
+        return None
+
+    # contours rotated so that each one starts behind and ends with its first on-curve point:
+    order = starts[contour] + (local + first_on[contour] + 1) % lengths[contour]
+    (points, on_curve) = (points[order], on_curve[order])
+    previous = numpy.arange(len(points)) - 1
+    previous[starts] = ends - 1
+    (previous_points, previous_on) = (points[previous], on_curve[previous])
+
+    # one slot per point between the moveto and the closepath of its contour:
+    slot_commands = numpy.zeros(len(points) + 2 * len(starts), dtype=numpy.uint8)
+    slot_coords = numpy.zeros((len(slot_commands), 4))
+    point_slots = numpy.arange(len(points)) + 2 * contour + 1
+    move_slots = starts + 2 * numpy.arange(len(starts))
+    slot_commands[move_slots] = ord("M")
+    slot_coords[move_slots, :2] = points[ends - 1]
+    slot_commands[move_slots + lengths + 1] = ord("Z")
+
+    is_line = on_curve & previous_on
+    is_line[ends - 1] = False  # closing line, implied by the closepath
+    slot_commands[point_slots[is_line]] = ord("L")
+    slot_coords[point_slots[is_line], :2] = points[is_line]
+    is_curve = ~previous_on  # curve ending at an on-curve point or at an implied one
+    slot_commands[point_slots[is_curve]] = ord("Q")
+    curve_ends = numpy.where(on_curve[:, None], points, 0.5 * (previous_points + points))
+    slot_coords[point_slots[is_curve], :2] = previous_points[is_curve]
+    slot_coords[point_slots[is_curve], 2:] = curve_ends[is_curve]
+
+    is_command = slot_commands != 0
+    coords = slot_coords[numpy.arange(4) < _NUM_COORDS[slot_commands][:, None]]
+    contour_num_commands = numpy.bincount(contour, weights=is_line | is_curve, minlength=len(starts)) + 2
+    return (slot_commands[is_command], coords, contour_num_commands.astype(numpy.intp))
+
 
 class FontHelper:
     """
@@ -47,59 +103,241 @@ class FontHelper:
         instantiate_axes_values.update(axes_values)
         return instancer.instantiateVariableFont(variable_font, instantiate_axes_values)
 
+    @staticmethod
+    def glyf_path_data(glyph_set, glyph_name: str) -> Optional[AvPathData]:
+        """
+        Read the outline of a TrueType glyph directly from the coordinate and flag arrays of the glyf table
+        (components are resolved by fontTools), see glyf_path_data_batch().
+
+        Args:
+            glyph_set (GlyphSet): the glyph set, e.g. TTFont.getGlyphSet()
+            glyph_name (str): the name of the glyph
+
+        Returns:
+            Optional[AvPathData]: the outline with the commands M, L, Q and Z, or None if the glyph
+                cannot be read this way. Use a pen then.
+        """
+        batch = FontHelper.glyf_path_data_batch(glyph_set, [glyph_name])
+        return None if batch is None else batch.path
+
+    @staticmethod
+    def glyf_path_data_batch(glyph_set, glyph_names: Sequence[str]) -> Optional[AvPathDataBatch]:
+        """
+        Read the outlines of TrueType glyphs directly from the coordinate and flag arrays of the glyf table
+        (components are resolved by fontTools) and convert all contours of all glyphs at once into
+        quadratic curves, i.e. without a pen call per segment. Implied on-curve points (the midpoints
+        between two consecutive off-curve points) are calculated in vectorized form.
+        The outline of each glyph is identical to the one recorded by AvPathDataPen.
+
+        Args:
+            glyph_set (GlyphSet): the glyph set, e.g. TTFont.getGlyphSet()
+            glyph_names (Sequence[str]): the names of the glyphs
+
+        Returns:
+            Optional[AvPathDataBatch]: one outline with the commands M, L, Q and Z per glyph, or None
+                if the glyphs cannot be read this way, i.e. no glyf table, glyph set at a variable font location,
+                cubic curves or contours without on-curve points. Use a pen then.
+        """
+        glyf_table = getattr(glyph_set, "glyfTable", None)
+        if glyf_table is None or (glyph_set.location and glyph_set.gvarTable is not None):
+            return None
+        (coordinates, end_points, flags, num_contours) = ([], [], [], [])
+        num_points = 0
+        for glyph_name in glyph_names:
+            glyph = glyf_table[glyph_name]
+            (glyph_coordinates, glyph_end_points, glyph_flags) = glyph.getCoordinates(glyf_table)
+            glyph_points = numpy.frombuffer(glyph_coordinates.array, dtype=numpy.float64).reshape(-1, 2)
+            offset = glyph_set[glyph_name].lsb - glyph.xMin if hasattr(glyph, "xMin") else 0
+            coordinates.append(glyph_points + (offset, 0) if offset else glyph_points)
+            end_points.extend(end_point + num_points for end_point in glyph_end_points)
+            flags.append(bytes(glyph_flags))
+            num_contours.append(len(glyph_end_points))
+            num_points += len(glyph_points)
+        flags = numpy.frombuffer(b"".join(flags), dtype=numpy.uint8)
+        if numpy.any(flags & _FLAG_CUBIC):
+            return None
+        points = numpy.concatenate(coordinates) if coordinates else numpy.empty((0, 2))
+        result = _quadratic_contours(points, (flags & _FLAG_ON_CURVE).astype(bool), numpy.array(end_points) + 1)
+        if result is None:
+            return None
+        (commands, coords, contour_num_commands) = result
+        contour_offsets = numpy.append(0, numpy.cumsum(contour_num_commands))
+        item_offsets = contour_offsets[numpy.append(0, numpy.cumsum(num_contours))]
+        return AvPathDataBatch(AvPathData(commands, coords), item_offsets)
+
 
 # =============================================================================
 # Pens
 # =============================================================================
-class AvPolylinePen(BasePen):
+class AvPathDataPen(BasePen):
     """
-    This pen is used to convert curves to line segments.
-    It records the curve as a sequence of line segments.
+    This pen records the outline of a glyph directly into the numeric path representation AvPathData,
+    i.e. without creating an intermediate SVG path string.
+    The recorded path uses absolute coordinates and the commands M, L, C, Q and Z.
+    TrueType implied on-curve points are resolved by BasePen.
     """
 
-    def __init__(self, glyphSet, steps=10):
+    def __init__(self, glyphSet):
         """
         Initializes a new instance of the class.
 
         Args:
             glyphSet (GlyphSet): The glyph set to use.
-            steps (int, optional): The number of steps to use for polygonization. Defaults to 10.
         """
         super().__init__(glyphSet)
-        self.steps = steps
-        self.recording_pen = RecordingPen()
+        self.commands: List[int] = []
+        self.coords: List[float] = []
 
     def _moveTo(self, pt):
-        self.recording_pen.moveTo(pt)
+        self.commands.append(ord("M"))
+        self.coords.extend(pt)
 
     def _lineTo(self, pt):
-        self.recording_pen.lineTo(pt)
+        self.commands.append(ord("L"))
+        self.coords.extend(pt)
 
     def _curveToOne(self, pt1, pt2, pt3):
-        self._polygonize_cubic_bezier([self._getCurrentPoint(), pt1, pt2, pt3])
+        self.commands.append(ord("C"))
+        self.coords.extend((*pt1, *pt2, *pt3))
 
     def _qCurveToOne(self, pt1, pt2):
-        self._polygonize_quadratic_bezier([self._getCurrentPoint(), pt1, pt2])
+        self.commands.append(ord("Q"))
+        self.coords.extend((*pt1, *pt2))
 
     def _closePath(self):
-        self.recording_pen.closePath()
+        self.commands.append(ord("Z"))
 
     def _endPath(self):
-        self.recording_pen.endPath()
-
-    def _polygonize_quadratic_bezier(self, points):
-        pt0, pt1, pt2 = points
-        for t in [i / self.steps for i in range(1, self.steps + 1)]:
-            x = (1 - t) ** 2 * pt0[0] + 2 * (1 - t) * t * pt1[0] + t**2 * pt2[0]
-            y = (1 - t) ** 2 * pt0[1] + 2 * (1 - t) * t * pt1[1] + t**2 * pt2[1]
-            self._lineTo((x, y))
-
-    def _polygonize_cubic_bezier(self, points):
-        pt0, pt1, pt2, pt3 = points
-        for t in [i / self.steps for i in range(1, self.steps + 1)]:
-            x = (1 - t) ** 3 * pt0[0] + 3 * (1 - t) ** 2 * t * pt1[0] + 3 * (1 - t) * t**2 * pt2[0] + t**3 * pt3[0]
-            y = (1 - t) ** 3 * pt0[1] + 3 * (1 - t) ** 2 * t * pt1[1] + 3 * (1 - t) * t**2 * pt2[1] + t**3 * pt3[1]
-            self._lineTo((x, y))
+        pass
+
+    def path_data(self) -> AvPathData:
+        """
+        Returns the recorded outline.
+        An empty outline (e.g. of a space) is returned as "M 0 0".
+
+        Returns:
+            AvPathData: the recorded outline
+        """
+        if not self.commands:
+            return AvPathData(numpy.array([ord("M")]), numpy.zeros(2))
+        return AvPathData(numpy.array(self.commands), numpy.array(self.coords))
+
+
+class AvPolylinePen(AvPathDataPen):
+    """
+    This pen is used to convert curves to line segments.
+    It records the outline like AvPathDataPen and flattens all curves of the glyph at once
+    (see AvPathData.flatten()) into one contiguous coordinate array.
+    Each curve is replaced by _steps_ line segments.
+    """
+
+    def __init__(self, glyphSet, steps=10):
+        """
+        Initializes a new instance of the class.
+
+        Args:
+            glyphSet (GlyphSet): The glyph set to use.
+            steps (int, optional): The number of steps to use for polygonization. Defaults to 10.
+        """
+        super().__init__(glyphSet)
+        self.steps = steps
+        self._flattened: Optional[Tuple[numpy.ndarray, numpy.ndarray]] = None
+        self._num_commands = -1
+
+    def _flatten(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        # flatten again only if something has been drawn since the last call
+        if self._flattened is None or self._num_commands != len(self.commands):
+            if self.commands:
+                self._flattened = self._flatten_path(self.path_data())
+            else:
+                self._flattened = (numpy.empty((0, 2)), numpy.empty(0, dtype=numpy.intp))
+            self._num_commands = len(self.commands)
+        return self._flattened
+
+    def _flatten_path(self, path: AvPathData) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        return path.flatten(self.steps + 1)
+
+    @property
+    def points(self) -> numpy.ndarray:
+        """
+        All points of the flattened outline as one contiguous array of shape (number of points, 2).
+        """
+        return self._flatten()[0]
+
+    @property
+    def contour_starts(self) -> numpy.ndarray:
+        """
+        Index of the first point of each contour in _points_.
+        """
+        return self._flatten()[1]
+
+    def polylines(self) -> List[numpy.ndarray]:
+        """
+        Returns the flattened outline as one polyline per contour.
+        The polylines are views of _points_.
+
+        Returns:
+            List[numpy.ndarray]: one array of shape (number of points, 2) per contour
+        """
+        (points, contour_starts) = self._flatten()
+        return numpy.split(points, contour_starts[1:]) if len(points) else []
+
+    @staticmethod
+    def flatten_glyphs(
+        glyph_set, glyph_names: Optional[Sequence[str]] = None, steps: int = 10
+    ) -> Dict[str, List[numpy.ndarray]]:
+        """
+        Flatten many glyphs (e.g. a full font) at once:
+        the outlines are read together from the glyf table (see FontHelper.glyf_path_data_batch())
+        or else recorded one after the other, and all curves of all glyphs
+        are evaluated together by AvPathDataBatch.flatten().
+
+        Args:
+            glyph_set (GlyphSet): the glyph set, e.g. TTFont.getGlyphSet()
+            glyph_names (Optional[Sequence[str]], optional): the glyphs to flatten. Defaults to None (all glyphs).
+            steps (int, optional): The number of steps to use for polygonization. Defaults to 10.
+
+        Returns:
+            Dict[str, List[numpy.ndarray]]: the polylines (views of one contiguous array) of each glyph
+        """
+        if glyph_names is None:
+            glyph_names = list(glyph_set.keys())
+        batch = FontHelper.glyf_path_data_batch(glyph_set, glyph_names)
+        if batch is None:
+            pen = AvPathDataPen(glyph_set)
+            command_offsets = [0]
+            for glyph_name in glyph_names:
+                glyph_set[glyph_name].draw(pen)
+                command_offsets.append(len(pen.commands))
+            batch = AvPathDataBatch(AvPathData(numpy.array(pen.commands), numpy.array(pen.coords)), command_offsets)
+        (points, contour_starts, item_contours) = batch.flatten(steps + 1)
+        contours = numpy.split(points, contour_starts[1:]) if len(points) else []
+        item_contours = item_contours.tolist()
+        return {
+            glyph_name: contours[first:last]
+            for glyph_name, first, last in zip(glyph_names, item_contours[:-1], item_contours[1:])
+        }
+
+    @property
+    def recording_pen(self) -> RecordingPen:
+        """
+        The flattened outline replayed into a RecordingPen (moveTo, lineTo, closePath / endPath).
+        Provided for compatibility, use _points_ and _contour_starts_ for further numeric processing.
+        """
+        recording_pen = RecordingPen()
+        commands = numpy.array(self.commands, dtype=numpy.int64)
+        contour_indices = numpy.cumsum(commands == ord("M")) - 1
+        closed = set(contour_indices[commands == ord("Z")].tolist())
+        for index, polyline in enumerate(self.polylines()):
+            points = [tuple(point) for point in polyline.tolist()]
+            recording_pen.moveTo(points[0])
+            for point in points[1:]:
+                recording_pen.lineTo(point)
+            if index in closed:
+                recording_pen.closePath()
+            else:
+                recording_pen.endPath()
+        return recording_pen
 
     # def draw(self, pen):
     #     for command in self.recordingPen.value:
@@ -125,3 +363,85 @@ class AvPolylinePen(BasePen):
     #             svg_path.append("Z")
 
     #     return " ".join(svg_path)
+
+
+class AvContourPen(AvPolylinePen):
+    """
+    This pen converts the outline of a glyph directly into closed contours,
+    i.e. into a list of (N, 2) float arrays ready to be combined to polygons,
+    without intermediate SVG path strings.
+    The curves are flattened like by AvPolylinePen, optionally transformed and
+    flattened by a tolerance or by the angle between tangents (see AvPathData.flatten()).
+    Each contour is implicitly closed, contours with less than 3 points are skipped.
+    """
+
+    def __init__(
+        self,
+        glyphSet,
+        steps: int = 10,
+        affine_trafo: Optional[Sequence[float]] = None,
+        tolerance: Optional[float] = None,
+        max_angle_degree: Optional[float] = None,
+        max_steps: int = 9,
+    ):
+        """
+        Initializes a new instance of the class.
+
+        Args:
+            glyphSet (GlyphSet): The glyph set to use.
+            steps (int, optional): The number of steps to use for polygonization. Defaults to 10.
+            affine_trafo (Optional[Sequence[float]], optional): affine transformation [a00, a01, a10, a11, b0, b1]
+                applied to the contours. Defaults to None.
+            tolerance (Optional[float], optional): maximum deviation of the chords from the curves
+                (in units after _affine_trafo_). Defaults to None (use _steps_).
+            max_angle_degree (Optional[float], optional): maximum angle between the tangents of neighboring points.
+                Defaults to None (use _tolerance_ or _steps_).
+            max_steps (int, optional): maximum number of refinement passes for _max_angle_degree_. Defaults to 9.
+        """
+        super().__init__(glyphSet, steps)
+        self.affine_trafo = affine_trafo
+        self.tolerance = tolerance
+        self.max_angle_degree = max_angle_degree
+        self.max_steps = max_steps
+
+    def _flatten_path(self, path: AvPathData) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        return path.flatten(self.steps + 1, self.affine_trafo, self.tolerance, self.max_angle_degree, self.max_steps)
+
+    def _closed_contours(self) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        # points, first and last (exclusive) point index of the contours having at least 3 points
+        (points, contour_starts) = self._flatten()
+        contour_ends = numpy.append(contour_starts[1:], len(points))
+        keep = contour_ends - contour_starts >= 3
+        return (points, contour_starts[keep], contour_ends[keep])
+
+    def contours(self) -> List[numpy.ndarray]:
+        """
+        Returns the closed contours (views of _points_), e.g. for av.path.AvPathPolygon.add_polygon_arrays().
+
+        Returns:
+            List[numpy.ndarray]: one array of shape (number of points, 2) per contour
+        """
+        (points, starts, ends) = self._closed_contours()
+        return [points[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+    def signed_areas(self) -> numpy.ndarray:
+        """
+        Returns the signed area of each closed contour (same order as contours()),
+        i.e. the orientation: positive for counterclockwise contours (in a y-up coordinate system).
+
+        Returns:
+            numpy.ndarray: signed area of each contour
+        """
+        (points, starts, ends) = self._closed_contours()
+        if not len(starts):
+            return numpy.empty(0)
+        # shoelace formula, the last point of each contour is connected to its first point:
+        lengths = ends - starts
+        contour_of_point = numpy.repeat(numpy.arange(len(starts)), lengths)
+        firsts = numpy.cumsum(lengths) - lengths  # position of each contour's first point in _indices_
+        indices = starts[contour_of_point] + numpy.arange(len(contour_of_point)) - firsts[contour_of_point]
+        following = indices + 1
+        following[firsts + lengths - 1] = starts
+        (x, y) = (points[indices, 0], points[indices, 1])
+        cross = x * points[following, 1] - points[following, 0] * y
+        return 0.5 * numpy.bincount(contour_of_point, weights=cross, minlength=len(starts))
@@ -2,21 +2,26 @@
 
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy
+import shapely
+import shapely.geometry.polygon
 
 # from fontTools.pens.basePen import BasePen
 from fontTools.pens.boundsPen import BoundsPen
 
 # from fontTools.pens.recordingPen import RecordingPen
-from fontTools.pens.svgPathPen import SVGPathPen
 from fontTools.ttLib import TTFont
 
 import ave.consts
-from ave.fonttools import AvPolylinePen
+from ave.fonttools import AvContourPen, AvPathDataPen, AvPolylinePen, FontHelper
 from ave.geom import AvBox
-from ave.svgpath import AvSvgPath
+from ave.svgpath import AvPathData, AvPathDataBatch, AvPathSerializer
 
 # from fontTools.varLib import instancer
 
@@ -31,17 +36,31 @@ class AvGlyph:
     Uses dimensions in unitsPerEm, i.e. independent from font_size.
     Provides
     - geometric dimensions of the Glyph (bounding_box, ascender, descender, sidebearings, ...)
-    - svg_path_string (str): a SVG path representation of the Glyph
+    - outline (AvPathData): the parsed, immutable outline of the Glyph (absolute coordinates)
+    - svg_path_string (str): a SVG path representation of the Glyph, derived lazily from outline
     """
 
     _font: TTFont
     _character: str
     _bounding_box: Optional[AvBox] = None
+    _outline: Optional[AvPathData] = None
     _svg_path_string: str = ""
+    _flattened_outlines: OrderedDict[int, AvPathData] = field(default_factory=OrderedDict)  # LOD->outline
+
+    def __init__(self, font: TTFont, character: str, outline: Optional[AvPathData] = None) -> None:
+        """
+        Initializes a new AvGlyph instance.
 
-    def __init__(self, font: TTFont, character: str) -> None:
+        Args:
+            font (TTFont): the font of the glyph
+            character (str): the character of the glyph
+            outline (Optional[AvPathData], optional): the outline of the glyph, if it is already read from
+                the font (see AvGlyphFactory.create_glyphs()). Defaults to None, i.e. recorded on first use.
+        """
         self._font = font
         self._character = character
+        self._outline = outline
+        self._flattened_outlines = OrderedDict()
 
     @property
     def font(self) -> TTFont:
@@ -134,6 +153,78 @@ class AvGlyph:
                 self._bounding_box = AvBox(0, 0, glyph_width, 0)
         return self._bounding_box
 
+    def outline(self) -> AvPathData:
+        """
+        Returns the outline of the glyph in its numeric form, i.e. commands (segment types),
+        contour start indices and a float coordinate array (absolute coordinates).
+        The outline is recorded once from the font and kept as cache, so that
+        consumers (transformations, polygonization, ...) do not have to parse a path string.
+
+        Returns:
+            AvPathData: The immutable outline of the glyph.
+        """
+        if self._outline is None:
+            glyph_name = self._font.getBestCmap()[ord(self._character)]
+            glyph_set = self._font.getGlyphSet()
+            path_data_pen = AvPathDataPen(glyph_set)
+            glyph_set[glyph_name].draw(path_data_pen)
+            self._outline = path_data_pen.path_data()
+        return self._outline
+
+    def polylines(self, num_points: int = 10, affine_trafo: Optional[Sequence[float]] = None) -> List[numpy.ndarray]:
+        """
+        Returns the flattened contours of the glyph, calculated directly from the outline,
+        i.e. without intermediate path strings (see AvPathData.polygonize()).
+
+        Args:
+            num_points (int, optional): number of points per curve including its start point. Defaults to 10.
+            affine_trafo (Optional[Sequence[float]], optional): [a00, a01, a10, a11, b0, b1]
+                applied to the points. Defaults to None, i.e. unitsPerEm.
+
+        Returns:
+            List[numpy.ndarray]: one array of shape (number of points, 2) per contour
+        """
+        return self.outline().polygonize(num_points, affine_trafo)
+
+    @staticmethod
+    def level_of_detail(tolerance: float) -> int:
+        """
+        Returns the level of detail (LOD) for flattening with a maximum deviation of _tolerance_ (in unitsPerEm).
+        The outline of level _lod_ is flattened with the tolerance 2^lod, i.e. the biggest power of two
+        which is not bigger than _tolerance_. So outlines can be shared between similar sizes.
+
+        Args:
+            tolerance (float): maximum deviation of the line segments from the curves in unitsPerEm
+
+        Returns:
+            int: the level of detail, the bigger the coarser
+        """
+        return math.floor(math.log2(tolerance))
+
+    def flattened_outline(self, lod: int) -> AvPathData:
+        """
+        Returns the outline flattened to closed polylines with a maximum deviation of 2^lod (in unitsPerEm)
+        from the curves, see level_of_detail().
+        The outlines of the last ave.consts.LOD_CACHE_SIZE used levels are kept as cache,
+        so that e.g. small letters use a coarse outline and big letters a fine one
+        without keeping the outlines of all sizes ever used.
+
+        Args:
+            lod (int): the level of detail
+
+        Returns:
+            AvPathData: The immutable flattened outline of the glyph.
+        """
+        flattened_outline = self._flattened_outlines.get(lod)
+        if flattened_outline is None:
+            flattened_outline = AvPathData.from_polylines(self.outline().polygonize(tolerance=2.0**lod))
+            self._flattened_outlines[lod] = flattened_outline
+            if len(self._flattened_outlines) > ave.consts.LOD_CACHE_SIZE:
+                self._flattened_outlines.popitem(last=False)
+        else:
+            self._flattened_outlines.move_to_end(lod)
+        return flattened_outline
+
     def svg_path_string(self) -> str:
         """
         Returns the SVG path representation (absolute coordinates) of the glyph.
@@ -146,17 +237,36 @@ class AvGlyph:
                 The path is absolute, so that it can be easily transformed.
         """
         if not self._svg_path_string:
-            glyph_name = self._font.getBestCmap()[ord(self._character)]
-            glyph_set = self._font.getGlyphSet()
-            svg_path_pen = SVGPathPen(glyph_set)
-            glyph_set[glyph_name].draw(svg_path_pen)
-            svg_path_string = svg_path_pen.getCommands()
-            # print(f'svg_path_string:"{svg_path_string}"')
-            if not svg_path_string:
-                svg_path_string = "M 0 0"
-            self._svg_path_string = AvSvgPath.convert_relative_to_absolute(svg_path_string)
+            self._svg_path_string = self.outline().to_string()
         return self._svg_path_string
 
+    def svg_path_strings(
+        self,
+        affine_trafos: Sequence[Sequence[float]],
+        serializer: Optional[AvPathSerializer] = None,
+        lod: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Returns the SVG path representation of the glyph transformed by each of the given N affine_trafos,
+        e.g. for all occurrences of this glyph on a page.
+        The glyph's path is transformed by one vectorized operation instead of one per trafo.
+
+        Args:
+            affine_trafos (Sequence[List[float]]): N affine transformations [a00, a01, a10, a11, b0, b1]
+            serializer (AvPathSerializer, optional): serializer to create compact path strings
+                of limited precision. Defaults to None, i.e. full precision absolute path strings.
+            lod (Optional[int], optional): level of detail to use the flattened outline
+                (see flattened_outline()) instead of the curves. Defaults to None.
+
+        Returns:
+            List[str]: The N transformed SVG path strings.
+        """
+        outline = self.outline() if lod is None else self.flattened_outline(lod)
+        paths = outline.transform_many(affine_trafos)
+        if serializer:
+            return [serializer.serialize(path) for path in paths]
+        return [path.to_string() for path in paths]
+
 
 @dataclass
 class AvPolygonizedGlyph(AvGlyph):
@@ -165,49 +275,114 @@ class AvPolygonizedGlyph(AvGlyph):
     Uses dimensions in unitsPerEm, i.e. independent from font_size.
     Provides
     - geometric dimensions of the Glyph (bounding_box, ascender, descender, sidebearings, ...)
+        derived from the polygonized_path
     - polygonized_path (shapely.MultiPolygon): a polygonized representation of the Glyph
         with several shapely.Polygons (contained by shapely.MultiPolygon) representing the Glyph's contours:
         - first Polygon is always the outer contour.
         - exterior rings (shells) are always counter-clockwise, positive.
         - interior rings (holes) are always clockwise, negative.
-    - svg_path_string (str): a SVG path representation of the Glyph
+    - outline (AvPathData): the rings of the polygonized_path as closed polylines
+    - svg_path_string (str): a SVG path representation of the Glyph, derived from outline
+    All of them are created on first access and kept as cache.
     """
 
-    def __init__(self, font: TTFont, character: str) -> None:
-        # pylint: disable=useless-super-delegation
+    _steps: int = 10
+    _tolerance: Optional[float] = None
+    _polygonized_path: Optional[shapely.MultiPolygon] = None
+
+    def __init__(
+        self,
+        font: TTFont,
+        character: str,
+        steps: int = 10,
+        tolerance: Optional[float] = None,
+        polygonized_path: Optional[shapely.MultiPolygon] = None,
+    ) -> None:
+        """
+        Initializes a new polygonized glyph. The polygonization is done on first access.
+
+        Args:
+            font (TTFont): the font
+            character (str): the character
+            steps (int, optional): number of line segments per curve. Defaults to 10.
+            tolerance (Optional[float], optional): maximum deviation (in unitsPerEm) of the line segments
+                from the curves, replaces _steps_. Defaults to None.
+            polygonized_path (Optional[shapely.MultiPolygon], optional): the already polygonized glyph,
+                e.g. from a precompiled font (see ave.fontcache.AvFontCache). Defaults to None.
+        """
         super().__init__(font, character)
+        self._steps = steps
+        self._tolerance = tolerance
+        self._polygonized_path = polygonized_path
 
-    # TODO: create bounding box (property) only if called
-    # TODO: create polygonized_path (property) only if called
-    # TODO: create svg_path (property) only if called
+    def polygonized_path(self) -> shapely.MultiPolygon:
+        """
+        Returns the polygonized glyph.
+        The contours are flattened directly from the glyph (see ave.fonttools.AvContourPen).
+        The orientation of the biggest contour is additive, contours with the opposite orientation are subtracted
+        (processed from the biggest to the smallest contour).
 
-    # create and store a polygonized_path:
-    # pen = RecordingPen()
-    # glyph_name = self._font.font.getBestCmap()[ord(self._character)]
-    # glyph_set = self._font.font.getGlyphSet()
-    # glyph_set[glyph_name].draw(pen)
-    # for command in pen.value:
-    #     print(command)
+        Returns:
+            shapely.MultiPolygon: the polygonized glyph, empty e.g. for a space
+        """
+        if self._polygonized_path is None:
+            glyph_name = self._font.getBestCmap()[ord(self._character)]
+            glyph_set = self._font.getGlyphSet()
+            contour_pen = AvContourPen(glyph_set, self._steps, tolerance=self._tolerance)
+            glyph_set[glyph_name].draw(contour_pen)
+            contours = contour_pen.contours()
+            multipolygon = shapely.MultiPolygon()
+            if contours:
+                polygons = shapely.buffer([shapely.Polygon(contour) for contour in contours], 0)  # self-intersections
+                signed_areas = contour_pen.signed_areas()
+                # from big to small, so that contours inside holes (e.g. of "®") are added again:
+                order = numpy.argsort(-abs(signed_areas), kind="stable")
+                additive_sign = numpy.sign(signed_areas[order[0]])
+                geometry = polygons[order[0]]
+                for index in order[1:].tolist():
+                    if numpy.sign(signed_areas[index]) == additive_sign:
+                        geometry = shapely.union(geometry, polygons[index])
+                    else:
+                        geometry = shapely.difference(geometry, polygons[index])
+                parts = [shapely.geometry.polygon.orient(part) for part in shapely.get_parts(geometry)]
+                parts = sorted(
+                    (part for part in parts if isinstance(part, shapely.Polygon)), key=lambda part: -part.area
+                )
+                multipolygon = shapely.MultiPolygon(parts)
+            self._polygonized_path = multipolygon
+        return self._polygonized_path
+
+    def area(self) -> float:
+        """
+        The area covered by the glyph in unitsPerEm^2.
+        """
+        return self.polygonized_path().area
 
     def bounding_box(self) -> AvBox:
-        return super().bounding_box()  # TODO: calculate bounding box based on polygonized_path
+        if not self._bounding_box:
+            polygonized_path = self.polygonized_path()
+            if polygonized_path.is_empty:
+                glyph_name = self._font.getBestCmap()[ord(self._character)]
+                self._bounding_box = AvBox(0, 0, self._font.getGlyphSet()[glyph_name].width, 0)
+            else:
+                self._bounding_box = AvBox(*polygonized_path.bounds)
+        return self._bounding_box
 
-    def svg_path_string(self) -> str:
-        # if not self._svg_path_string:
-        #     glyph_name = self._font.getBestCmap()[ord(self._character)]
-        #     glyph_set = self._font.getGlyphSet()
-        #     path_pen = SVGPathPen(glyph_set)
-        #     glyph_set[glyph_name].draw(path_pen)
-        #     svg_path_string = path_pen.getCommands()
-        #     self._svg_path_string = AvSvgPath.convert_relative_to_absolute(svg_path_string)
-        # return self._svg_path_string
-        #
-        # steps = 10
-        # path_pen = AvPolylinePen(glyph_set, steps)
-        # glyph_set[glyph_name].draw(path_pen)
-        #
-        # self._svg_path_string = AvSvgPath.convert_relative_to_absolute(svg_path_string)
-        return ""  # TODO
+    def outline(self) -> AvPathData:
+        """
+        Returns the rings (exteriors and interiors) of the polygonized glyph as closed polylines.
+        An empty glyph (e.g. a space) results in "M 0 0".
+
+        Returns:
+            AvPathData: The immutable polygonized outline of the glyph.
+        """
+        if self._outline is None:
+            rings = []
+            for polygon in self.polygonized_path().geoms:
+                rings.append(shapely.get_coordinates(polygon.exterior)[:-1])
+                rings.extend(shapely.get_coordinates(interior)[:-1] for interior in polygon.interiors)
+            self._outline = AvPathData.from_polylines(rings) if rings else AvPathData.from_string("M 0 0")
+        return self._outline
 
 
 # ==============================================================================
@@ -235,19 +410,68 @@ class AvGlyphFactoryABC(ABC):
             character in the given font.
         """
 
+    def create_glyphs(self, font: TTFont, characters: Sequence[str]) -> List[AvGlyph]:
+        """
+        Creates the glyphs of several characters at once, e.g. all new characters of a text.
+        Factories which can prepare the glyphs together (see AvGlyphFactory) override this method.
+
+        Args:
+            font (TTFont): The font object associated with the glyphs.
+            characters (Sequence[str]): The characters to create glyphs for.
+
+        Returns:
+            List[AvGlyph]: one glyph per character
+        """
+        return [self.create_glyph(font, character) for character in characters]
+
 
 class AvGlyphFactory(AvGlyphFactoryABC):
     """Factory class for creating glyph instances."""
 
-    def create_glyph(self, font: TTFont, character: str) -> AvGlyph:
-        return AvGlyph(font, character)
+    def create_glyph(self, font: TTFont, character: str, outline: Optional[AvPathData] = None) -> AvGlyph:
+        return AvGlyph(font, character, outline)
+
+    def create_glyphs(self, font: TTFont, characters: Sequence[str]) -> List[AvGlyph]:
+        """
+        Creates the glyphs of several characters, whose outlines are read together, for TrueType fonts
+        directly from the glyf table by one vectorized operation (see FontHelper.glyf_path_data_batch()).
+        This is faster than recording each outline by a pen, e.g. to prepare all characters of a text.
+
+        Args:
+            font (TTFont): The font object associated with the glyphs.
+            characters (Sequence[str]): The characters to create glyphs for.
+
+        Returns:
+            List[AvGlyph]: one glyph per character
+        """
+        cmap = font.getBestCmap()
+        batch = FontHelper.glyf_path_data_batch(font.getGlyphSet(), [cmap[ord(character)] for character in characters])
+        if batch is None:
+            return super().create_glyphs(font, characters)
+        outlines = [batch.item(index) for index in range(len(characters))]
+        return [
+            self.create_glyph(font, character, outline if len(outline.commands) else AvPathData.from_string("M 0 0"))
+            for character, outline in zip(characters, outlines)
+        ]
 
 
 class AvPolygonizedGlyphFactory(AvGlyphFactoryABC):
     """Factory for creating polygonized glyph instances."""
 
+    def __init__(self, steps: int = 10, tolerance: Optional[float] = None) -> None:
+        """
+        Initializes the factory.
+
+        Args:
+            steps (int, optional): number of line segments per curve. Defaults to 10.
+            tolerance (Optional[float], optional): maximum deviation (in unitsPerEm) of the line segments
+                from the curves, replaces _steps_. Defaults to None.
+        """
+        self.steps = steps
+        self.tolerance = tolerance
+
     def create_glyph(self, font: TTFont, character: str) -> AvPolygonizedGlyph:
-        return AvPolygonizedGlyph(font, character)
+        return AvPolygonizedGlyph(font, character, self.steps, self.tolerance)
 
 
 # ==============================================================================
@@ -308,6 +532,14 @@ class AvLetter:
         """
         return [self.scale, 0, 0, self.scale, self.xpos, self.ypos]
 
+    @property
+    def level_of_detail(self) -> int:
+        """
+        Returns the level of detail of the glyph's flattened outline, so that it deviates at most
+        ave.consts.LOD_TOLERANCE (real dimensions) from the curves at the letter's size, see AvGlyph.level_of_detail().
+        """
+        return AvGlyph.level_of_detail(ave.consts.LOD_TOLERANCE / self.scale)
+
     def width(self, align: Optional[ave.consts.Align] = None) -> float:
         """Returns the width of the letter in real dimensions, considering the alignment."""
         glyph_width = self.glyph.width(align)
@@ -325,16 +557,96 @@ class AvLetter:
         """
         return self._glyph.bounding_box().transform_affine(self.trafo)
 
-    def svg_path_string(self) -> str:
+    def polylines(self, num_points: int = 10) -> List[numpy.ndarray]:
+        """
+        Returns the flattened contours of the letter in real dimensions, see AvGlyph.polylines().
+
+        Args:
+            num_points (int, optional): number of points per curve including its start point. Defaults to 10.
+
+        Returns:
+            List[numpy.ndarray]: one array of shape (number of points, 2) per contour
+        """
+        return self._glyph.polylines(num_points, self.trafo)
+
+    def flattened_outline(self) -> AvPathData:
+        """
+        Returns the glyph's flattened outline at the letter's level of detail in real dimensions,
+        i.e. small letters get coarse outlines with few points and big letters fine outlines.
+
+        Returns:
+            AvPathData: closed polylines of the letter
+        """
+        return self._glyph.flattened_outline(self.level_of_detail).transform(self.trafo)
+
+    def svg_path_string(self, serializer: Optional[AvPathSerializer] = None, flatten: bool = False) -> str:
         """
         Returns the SVG path representation of the letter in real dimensions.
         The SVG path is a string that defines the outline of the letter using
         SVG path commands. This path can be used to render the letter as a
         vector graphic.
+        Args:
+            serializer (AvPathSerializer, optional): serializer to create a compact path string
+                of limited precision, see AvSvgPage.path_serializer(). Defaults to None (full precision).
+            flatten (bool, optional): True to use the flattened outline at the letter's level of detail
+                (see flattened_outline()) instead of the curves. Defaults to False.
         Returns:
             str: The SVG path string representing the letter.
         """
-        return AvSvgPath.transform_path_string(self._glyph.svg_path_string(), self.trafo)
+        path = self.flattened_outline() if flatten else self._glyph.outline().transform(self.trafo)
+        if serializer:
+            return serializer.serialize(path)
+        return path.to_string()
+
+    @staticmethod
+    def svg_path_strings(
+        letters: Sequence[AvLetter], serializer: Optional[AvPathSerializer] = None, flatten: bool = False
+    ) -> List[str]:
+        """
+        Returns the SVG path representations of all given letters in real dimensions.
+        Letters sharing the same glyph are transformed together by one vectorized operation,
+        i.e. the effort is one operation per distinct glyph instead of one per letter.
+        Args:
+            letters (Sequence[AvLetter]): the letters
+            serializer (AvPathSerializer, optional): serializer to create compact path strings
+                of limited precision, see AvSvgPage.path_serializer(). Defaults to None (full precision).
+            flatten (bool, optional): True to use the flattened outlines at the letters' levels of detail
+                instead of the curves, see flattened_outline(). Defaults to False.
+        Returns:
+            List[str]: The SVG path strings in the same order as the given letters.
+        """
+        indices_by_glyph: Dict[Tuple[int, Optional[int]], List[int]] = {}
+        for index, letter in enumerate(letters):
+            lod = letter.level_of_detail if flatten else None
+            indices_by_glyph.setdefault((id(letter.glyph), lod), []).append(index)
+
+        path_strings: List[str] = [""] * len(letters)
+        for (_, lod), indices in indices_by_glyph.items():
+            glyph = letters[indices[0]].glyph
+            trafos = [letters[index].trafo for index in indices]
+            glyph_path_strings = glyph.svg_path_strings(trafos, serializer, lod)
+            for index, path_string in zip(indices, glyph_path_strings):
+                path_strings[index] = path_string
+        return path_strings
+
+    @staticmethod
+    def svg_path_string_joined(letters: Sequence[AvLetter], serializer: Optional[AvPathSerializer] = None) -> str:
+        """
+        Returns one SVG path string containing all given letters in real dimensions,
+        e.g. for one single <path> per text line or page.
+        All letters are transformed by one vectorized operation, see AvPathDataBatch.
+        Args:
+            letters (Sequence[AvLetter]): the letters
+            serializer (AvPathSerializer, optional): serializer to create a compact path string
+                of limited precision, see AvSvgPage.path_serializer(). Defaults to None (full precision).
+        Returns:
+            str: The SVG path string of all letters.
+        """
+        batch = AvPathDataBatch.from_paths([letter.glyph.outline() for letter in letters])
+        batch = batch.transform([letter.trafo for letter in letters])
+        if serializer:
+            return serializer.serialize(batch.path)
+        return batch.to_string()
 
 
 # ==============================================================================
@@ -452,6 +764,24 @@ class AvFont:
             self.glyphs[character] = self.glyph_factory.create_glyph(self.font, character)
         return self.glyphs[character]
 
+    def fetch_glyphs(self, characters: Iterable[str]) -> List[AvGlyph]:
+        """
+        Returns the AvGlyphs for the given characters, see fetch_glyph().
+        The new glyphs are created together by the glyph factory (see AvGlyphFactoryABC.create_glyphs()),
+        e.g. to prepare all characters of a text.
+
+        Args:
+            characters (Iterable[str]): the characters, e.g. a text
+
+        Returns:
+            List[AvGlyph]: one glyph per character
+        """
+        characters = list(characters)
+        new_characters = [character for character in dict.fromkeys(characters) if character not in self.glyphs]
+        if new_characters:
+            self.glyphs.update(zip(new_characters, self.glyph_factory.create_glyphs(self.font, new_characters)))
+        return [self.glyphs[character] for character in characters]
+
     def overall_ascender(self):
         """Returns the overall maximum ascender by iterating over all glyphs in the cache."""
         return self.max_ascender(self.glyphs.values())
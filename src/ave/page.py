@@ -2,11 +2,8 @@
 
 from __future__ import annotations
 
-import copy
-import gzip
-import io
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 import svgwrite
 import svgwrite.base
@@ -14,6 +11,11 @@ import svgwrite.container
 import svgwrite.elementfactory
 from svgwrite.extensions import Inkscape
 
+from ave.consts import Compression
+from ave.glyph import AvGlyph, AvLetter
+from ave.svgpath import AvPathSerializer
+from ave.svgwriter import AvSvgElement, AvSvgWriter, SvgElement
+
 
 @dataclass
 class AvSvgPage:
@@ -24,6 +26,12 @@ class AvSvgPage:
         - root       -- (group) just contains the y-flip and translation to bottom left
             - main   -- editable->locked=False  --  hidden->display="block"
             - debug  -- editable->locked=False  --  hidden->display="none"
+
+    Elements can be created as lightweight AvSvgElements by path() and use() or by the svgwrite drawing.
+    Letters are added by add_letters() either
+        - as <use> elements referencing the glyph outline which is stored once per glyph in <defs>, or
+        - as fully flattened <path> elements (flatten_glyphs=True), e.g. for plotters and cutters
+          which cannot handle <use>.
     """
 
     _inkscape: Inkscape  # extension to support layers
@@ -32,6 +40,9 @@ class AvSvgPage:
     root_group: svgwrite.container.Group
     main_layer: svgwrite.container.Group
     debug_layer: svgwrite.container.Group
+    viewbox_scale: float  # viewbox units per mm
+    flatten_glyphs: bool  # True: add letters as <path> instead of <use>
+    _glyph_defs: Dict[int, Tuple[AvGlyph, str, int, AvSvgElement]]  # id(glyph) -> (glyph, id, decimals, element)
 
     def __init__(
         self,
@@ -42,6 +53,7 @@ class AvSvgPage:
         _viewbox_width_mm: float,  # not used for the moment
         viewbox_height_mm: float,
         viewbox_scale: float = 1.0,
+        flatten_glyphs: bool = False,
     ):
         """
         Initialize the SVG page with specified canvas and viewbox dimensions.
@@ -57,15 +69,23 @@ class AvSvgPage:
             viewbox_width_mm (float): The width of the viewbox in millimeters left-to-right.
             viewbox_height_mm (float): The height of the viewbox in millimeters top-to-bottom.
             viewbox_scale (float, optional): The scale factor for the viewbox. Defaults to 1.0.
+            flatten_glyphs (bool, optional): Add letters as flattened paths instead of
+                references to glyph definitions. Defaults to False.
         """
 
+        self.viewbox_scale = viewbox_scale
+        self.flatten_glyphs = flatten_glyphs
+        self._glyph_defs = {}
+
         # calculate viewbox coordinates, i.e. the canvas coordinates from viewbox perspective
         vb_x: float = -viewbox_x_mm * viewbox_scale
         vb_y: float = -viewbox_y_mm * viewbox_scale
         vb_width: float = viewbox_scale * canvas_width_mm  # canvas width relativ to viewbox
         vb_height: float = viewbox_scale * canvas_height_mm  # canvas height relativ to viewbox
 
-        # Setup canvas and viewbox. profile="full" to support numbers with more than 4 decimal digits
+        # Setup canvas and viewbox. profile="full" to support numbers with more than 4 decimal digits.
+        # Compact path data of AvPathSerializer (e.g. "M.5-.25") is rejected by svgwrite's validator,
+        # so it is only used by the lightweight AvSvgElements (see path() and use()), which are not validated.
         self.drawing = svgwrite.Drawing(
             size=(f"{canvas_width_mm}mm", f"{canvas_height_mm}mm"),
             viewBox=(f"{vb_x} {vb_y} {vb_width} {vb_height}"),
@@ -83,31 +103,132 @@ class AvSvgPage:
         self.main_layer = self._inkscape.layer(label="main", locked=False)
         self.debug_layer = self._inkscape.layer(label="debug", locked=False, display="none")
 
-    def add(
-        self,
-        element: Union[svgwrite.base.BaseElement, svgwrite.elementfactory.ElementBuilder],
-        add_to_debug_layer: bool = False,
-    ) -> Union[svgwrite.base.BaseElement, svgwrite.elementfactory.ElementBuilder]:
+    def add(self, element: SvgElement, add_to_debug_layer: bool = False) -> SvgElement:
         """Add a SVG element as subelement either to main or debug layer.
+        The element is either a lightweight AvSvgElement (see path() and use()) or a svgwrite element.
 
         Args:
-            element (svgwrite.base.BaseElement): append this SVG element
+            element (SvgElement): append this SVG element
             debug (bool, optional): True if element should be added to debug layer. Defaults to False.
 
         Returns:
-            svgwrite.base.BaseElement: the added element
+            SvgElement: the added element
         """
         if add_to_debug_layer:
             return self.debug_layer.add(element)
         return self.main_layer.add(element)
 
+    def path(self, d: str, **svg_properties) -> AvSvgElement:
+        """Create a lightweight <path> element, i.e. without validation and svgwrite object overhead.
+
+        Args:
+            d (str): the path data
+            **svg_properties: further SVG attributes, e.g. fill="black", stroke_width=0.1
+
+        Returns:
+            AvSvgElement: the path element, to be added by add()
+        """
+        return AvSvgElement("path", d=d, **svg_properties)
+
+    def use(self, href: str, **svg_properties) -> AvSvgElement:
+        """Create a lightweight <use> element referencing the element with the given href, e.g. "#glyph0".
+
+        Args:
+            href (str): reference to the used element
+            **svg_properties: further SVG attributes, e.g. transform="matrix(1 0 0 1 0 0)", fill="black"
+
+        Returns:
+            AvSvgElement: the use element, to be added by add()
+        """
+        return AvSvgElement("use", **{"xlink:href": href}, **svg_properties)
+
+    def add_letters(
+        self,
+        letters: Sequence[AvLetter],
+        add_to_debug_layer: bool = False,
+        dpi: float = 300,
+        join_paths: bool = False,
+        **svg_properties,
+    ):
+        """Add letters either as <use> elements referencing their glyph definitions or,
+        if flatten_glyphs is set, as flattened <path> elements.
+
+        Args:
+            letters (Sequence[AvLetter]): the letters to add
+            add_to_debug_layer (bool, optional): True if letters should be added to debug layer. Defaults to False.
+            dpi (float, optional): target resolution in dots per inch for the path precision. Defaults to 300.
+            join_paths (bool, optional): if flatten_glyphs is set, add all letters as one single <path>,
+                e.g. one per text line. Defaults to False.
+            **svg_properties: further SVG attributes of each letter, e.g. fill="black"
+        """
+        if self.flatten_glyphs and join_paths:
+            path_string = AvLetter.svg_path_string_joined(letters, self.path_serializer(dpi))
+            self.add(self.path(path_string, **svg_properties), add_to_debug_layer)
+            return
+        if self.flatten_glyphs:
+            for path_string in AvLetter.svg_path_strings(letters, self.path_serializer(dpi)):
+                self.add(self.path(path_string, **svg_properties), add_to_debug_layer)
+            return
+        for letter in letters:
+            href = "#" + self.glyph_def_id(letter, dpi)
+            transform = "matrix({:.10g} {:.10g} {:.10g} {:.10g} {:.10g} {:.10g})".format(
+                *[letter.trafo[i] for i in (0, 2, 1, 3, 4, 5)]
+            )
+            self.add(self.use(href, transform=transform, **svg_properties), add_to_debug_layer)
+
+    def add_letter(self, letter: AvLetter, add_to_debug_layer: bool = False, dpi: float = 300, **svg_properties):
+        """Add a single letter, see add_letters()."""
+        self.add_letters([letter], add_to_debug_layer, dpi, **svg_properties)
+
+    def glyph_def_id(self, letter: AvLetter, dpi: float = 300) -> str:
+        """Return the id of the <defs> element of the letter's glyph outline.
+        The outline is added to <defs> (in unitsPerEm) when its glyph is referenced for the first time.
+        Its precision is derived from the size of the letter and is increased (i.e. the outline in <defs>
+        is replaced) as soon as a bigger letter references the glyph, so that the biggest letter is resolved.
+
+        Args:
+            letter (AvLetter): letter whose glyph is referenced
+            dpi (float, optional): target resolution in dots per inch for the path precision. Defaults to 300.
+
+        Returns:
+            str: the id of the glyph definition
+        """
+        glyph = letter.glyph
+        glyph_def = self._glyph_defs.get(id(glyph))
+        serializer = AvPathSerializer.from_resolution(dpi, self.viewbox_scale / letter.scale)
+        if glyph_def is None or serializer.decimals > glyph_def[2]:
+            def_id = glyph_def[1] if glyph_def else f"glyph{len(self._glyph_defs)}"
+            element = self.path(serializer.serialize(glyph.outline()), id=def_id)
+            if glyph_def is None:
+                self.drawing.defs.add(element)
+            else:
+                defs = self.drawing.defs.elements
+                defs[next(i for i, defined in enumerate(defs) if defined is glyph_def[3])] = element
+            glyph_def = (glyph, def_id, serializer.decimals, element)
+            self._glyph_defs[id(glyph)] = glyph_def  # keep glyph referenced, so that its id stays unique
+        return glyph_def[1]
+
+    def path_serializer(self, dpi: float = 300, relative: bool = True) -> AvPathSerializer:
+        """Create a serializer for path strings with the precision needed to print this page at _dpi_.
+
+        More decimals than the printer can resolve only increase the file size.
+
+        Args:
+            dpi (float, optional): target resolution in dots per inch. Defaults to 300.
+            relative (bool, optional): use relative commands where they are shorter. Defaults to True.
+
+        Returns:
+            AvPathSerializer: serializer for path strings in viewbox coordinates
+        """
+        return AvPathSerializer.from_resolution(dpi, self.viewbox_scale, relative)
+
     def save_as(
         self,
         filename: str,
         include_debug_layer: bool = False,
         pretty: bool = False,
         indent: int = 2,
-        compressed: bool = False,
+        compressed: Union[bool, Compression] = False,
     ):
         """Save as SVG file
 
@@ -116,26 +237,19 @@ class AvSvgPage:
             include_debug_layer (bool, optional): True if file should contain debug_layer. Defaults to False.
             pretty (bool, optional): True for easy readable output. Defaults to False.
             indent (int, optional): Indention if pretty is enabled. Defaults to 2 spaces.
-            compressed (bool, optional): Save as compressed svgz-file. Defaults to False.
+            compressed (Union[bool, Compression], optional): Save as compressed svgz-file using the given
+                compression strategy (e.g. FAST for previews, ZOPFLI for releases), True means BEST.
+                Defaults to False.
         """
-        drawing_for_save = self.assemble_tree(
-            copy.deepcopy(self.drawing),
-            copy.deepcopy(self.root_group),
-            copy.deepcopy(self.main_layer),
-            copy.deepcopy(self.debug_layer),
-            include_debug_layer,
-        )
-
-        # setup IO:
-        svg_buffer = io.StringIO()
-        drawing_for_save.write(svg_buffer, pretty=pretty, indent=indent)
-        output_data = svg_buffer.getvalue().encode("utf-8")
-        if compressed:
-            output_data = gzip.compress(output_data)
-
-        # save file:
-        with open(filename, "wb") as svg_file:
-            svg_file.write(output_data)
+        # stream the tree into the file, the page itself is neither copied nor modified:
+        with AvSvgWriter.open(filename, compressed, pretty, indent) as writer:
+            writer.start_element(self.drawing)
+            writer.start_element(self.root_group)
+            if include_debug_layer:
+                writer.write_element(self.debug_layer)
+            writer.write_element(self.main_layer)
+            writer.end_element(self.root_group)
+            writer.end_element(self.drawing)
 
     @classmethod
     def assemble_tree(
@@ -170,6 +284,7 @@ class AvSvgPage:
         viewbox_width_mm: float,
         viewbox_height_mm: float,
         viewbox_scale: float = 1.0,
+        flatten_glyphs: bool = False,
     ) -> AvSvgPage:
         """
         Create a new page with A4 dimensions.
@@ -182,6 +297,8 @@ class AvSvgPage:
             viewbox_width_mm (float): The width of the viewbox in mm.
             viewbox_height_mm (float): The height of the viewbox in mm.
             viewbox_scale (float, optional): The scale factor for the viewbox. Defaults to 1.0.
+            flatten_glyphs (bool, optional): Add letters as flattened paths instead of
+                references to glyph definitions. Defaults to False.
 
         Returns:
             AvSvgPage: A new page with A4 dimensions.
@@ -202,6 +319,7 @@ class AvSvgPage:
             viewbox_width_mm,
             viewbox_height_mm,
             viewbox_scale,
+            flatten_glyphs,
         )
 
         return svg_page
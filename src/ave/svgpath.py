@@ -2,8 +2,1053 @@
 
 from __future__ import annotations
 
+import functools
+import math
+import operator
+import os
 import re
-from typing import Callable, ClassVar, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, ClassVar, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy
+
+
+class AvPathData:
+    """
+    Compact numeric representation of a SVG-path.
+    A SVG-path string is tokenized once into
+        - commands: one ASCII code (numpy.uint8) per command.
+            Implicit repetitions of a command are expanded into separate commands,
+            e.g. "M 1 2 3 4" becomes "M 1 2 L 3 4".
+        - coords: one numpy.float64 buffer holding the arguments of all commands in order.
+    All manipulations work on this numeric form.
+    Text is only produced when serializing by to_string().
+    Instances are immutable, i.e. each manipulation returns a new AvPathData.
+    """
+
+    # Command letters:
+    SVG_CMDS: ClassVar[str] = "MmLlHhVvCcSsQqTtAaZz"
+    # Definition of a number:
+    SVG_ARGS: ClassVar[str] = r"[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?"
+    # Number of arguments of each command:
+    NUM_ARGS: ClassVar[Dict[str, int]] = {
+        **dict.fromkeys("MmLlTt", 2),
+        **dict.fromkeys("SsQq", 4),
+        **dict.fromkeys("Cc", 6),
+        **dict.fromkeys("HhVv", 1),
+        **dict.fromkeys("Aa", 7),
+        **dict.fromkeys("Zz", 0),
+    }
+
+    # Roles of the arguments regarding an affine transformation:
+    ROLE_X: ClassVar[int] = 0  # x-coordinate of a point, followed by its y-coordinate
+    ROLE_Y: ClassVar[int] = 1  # y-coordinate of a point
+    ROLE_H: ClassVar[int] = 2  # x-coordinate of a horizontal line
+    ROLE_V: ClassVar[int] = 3  # y-coordinate of a vertical line
+    ROLE_RX: ClassVar[int] = 4  # x-radius of an arc
+    ROLE_RY: ClassVar[int] = 5  # y-radius of an arc
+    ROLE_KEEP: ClassVar[int] = 6  # not transformed, e.g. arc angle and flags
+
+    # Command implied by repeated arguments, if different from the command itself:
+    _REPEAT_LETTER: ClassVar[Dict[str, str]] = {"M": "L", "m": "l"}
+    _CMD_SPLIT: ClassVar[re.Pattern] = re.compile(f"([{SVG_CMDS}])")
+    _ARGS_FINDALL: ClassVar[Callable] = re.compile(SVG_ARGS).findall
+
+    def __init__(self, commands: numpy.ndarray, coords: numpy.ndarray) -> None:
+        """
+        Initializes a new AvPathData instance.
+
+        Args:
+            commands (numpy.ndarray): ASCII codes of the command letters, one per command.
+            coords (numpy.ndarray): the arguments of all commands in one buffer.
+        """
+        self._commands = numpy.asarray(commands, dtype=numpy.uint8)
+        self._coords = numpy.asarray(coords, dtype=numpy.float64)
+        self._commands.flags.writeable = False
+        self._coords.flags.writeable = False
+        self._offsets: Optional[numpy.ndarray] = None
+        self._roles: Optional[numpy.ndarray] = None
+
+    @classmethod
+    def from_string(cls, path_string: str) -> AvPathData:
+        """
+        Parse the given SVG _path_string_ in one single pass.
+
+        Args:
+            path_string (str): a SVG path string
+
+        Returns:
+            AvPathData: the numeric representation of the path
+        """
+        commands: List[int] = []
+        args_all: List[str] = []
+        parts = cls._CMD_SPLIT.split(path_string)
+        for command_letter, arg_string in zip(parts[1::2], parts[2::2]):
+            num_args = cls.NUM_ARGS[command_letter]
+            if not num_args:  # e.g. for command "Z"
+                commands.append(ord(command_letter))
+                continue
+            args = cls._ARGS_FINDALL(arg_string)
+            repeats = len(args) // num_args
+            if not repeats:
+                continue
+            # a moveto followed by further pairs is treated as implicit lineto
+            repeat_letter = cls._REPEAT_LETTER.get(command_letter, command_letter)
+            commands.append(ord(command_letter))
+            commands.extend([ord(repeat_letter)] * (repeats - 1))
+            args_all.extend(args[: repeats * num_args])
+        coords = numpy.fromiter(map(float, args_all), dtype=numpy.float64, count=len(args_all))
+        return cls(numpy.array(commands, dtype=numpy.uint8), coords)
+
+    @property
+    def commands(self) -> numpy.ndarray:
+        """numpy.ndarray: ASCII codes of the command letters, one per command (read-only)."""
+        return self._commands
+
+    @property
+    def coords(self) -> numpy.ndarray:
+        """numpy.ndarray: the arguments of all commands in one float64 buffer (read-only)."""
+        return self._coords
+
+    @property
+    def offsets(self) -> numpy.ndarray:
+        """
+        numpy.ndarray: start index of each command's arguments inside coords.
+        Contains one additional entry (the length of coords), i.e. the arguments of
+        command k are coords[offsets[k]:offsets[k+1]].
+        """
+        if self._offsets is None:
+            offsets = numpy.zeros(len(self._commands) + 1, dtype=numpy.intp)
+            numpy.cumsum(_NUM_ARGS_TABLE[self._commands], out=offsets[1:])
+            offsets.flags.writeable = False
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def roles(self) -> numpy.ndarray:
+        """numpy.ndarray: the role (ROLE_X, ROLE_Y, ...) of each entry of coords."""
+        if self._roles is None:
+            num_args = _NUM_ARGS_TABLE[self._commands]
+            command_of_arg = numpy.repeat(self._commands, num_args)
+            position_in_command = numpy.arange(len(self._coords)) - numpy.repeat(self.offsets[:-1], num_args)
+            roles = _ROLES_TABLE[command_of_arg, position_in_command]
+            roles.flags.writeable = False
+            self._roles = roles
+        return self._roles
+
+    @property
+    def contour_starts(self) -> numpy.ndarray:
+        """numpy.ndarray: indices (inside commands) of the moveto commands, i.e. where the contours start."""
+        return numpy.flatnonzero((self._commands == ord("M")) | (self._commands == ord("m")))
+
+    def is_absolute(self) -> bool:
+        """Returns True if the path only uses absolute (upper case) commands."""
+        return not numpy.any(self._commands >= ord("a"))
+
+    def to_absolute(self) -> AvPathData:
+        """
+        Convert relative commands into absolute ones,
+        i.e. lower case letter commands will be replaced by upper case letter commands.
+        The representation (i.e. geometry) of the path is still the same.
+
+        Returns:
+            AvPathData: the path using absolute coordinates
+        """
+        if self.is_absolute():
+            return self
+
+        values = self._coords.tolist()
+        offsets = self.offsets.tolist()
+        # Keep track of the current point and the start point of the current sub-path:
+        (cur_x, cur_y) = (0.0, 0.0)
+        (start_x, start_y) = (0.0, 0.0)
+        for k, command_letter in enumerate(map(chr, self._commands.tolist())):
+            (first, last) = (offsets[k], offsets[k + 1])
+            if command_letter in "mltsqc":
+                for i in range(first, last, 2):
+                    values[i] += cur_x
+                    values[i + 1] += cur_y
+            elif command_letter == "h":
+                values[first] += cur_x
+            elif command_letter == "v":
+                values[first] += cur_y
+            elif command_letter == "a":
+                values[first + 5] += cur_x
+                values[first + 6] += cur_y
+
+            if command_letter in "MmLlTtSsQqCcAa":
+                (cur_x, cur_y) = (values[last - 2], values[last - 1])
+            elif command_letter in "Hh":
+                cur_x = values[first]
+            elif command_letter in "Vv":
+                cur_y = values[first]
+            elif command_letter in "Zz":
+                (cur_x, cur_y) = (start_x, start_y)
+            if command_letter in "Mm":
+                (start_x, start_y) = (cur_x, cur_y)
+
+        commands = numpy.where(self._commands >= ord("a"), self._commands - 32, self._commands)
+        return AvPathData(commands, numpy.array(values, dtype=numpy.float64))
+
+    def transform(self, affine_trafo: Sequence[Union[int, float]]) -> AvPathData:
+        """
+        Transform the path by using the given _affine_trafo_.
+        Relative commands are converted into absolute ones beforehand.
+
+        The given _affine_trafo_ is a list of 6 floats, performing an affine transformation.
+        The transformation is defined as:
+            | x' | = | a00 a01 b0 |   | x |
+            | y' | = | a10 a11 b1 | * | y |
+            | 1  | = |  0   0  1  |   | 1 |
+        with
+            affine_trafo = [a00, a01, a10, a11, b0, b1]
+        See also shapely - Affine Transformations
+
+        Args:
+            affine_trafo (List[float]): Affine transformation
+
+        Returns:
+            AvPathData: the transformed path
+        """
+        return self.transform_many([affine_trafo])[0]
+
+    def transform_many(self, affine_trafos: Sequence[Sequence[Union[int, float]]]) -> List[AvPathData]:
+        """
+        Transform the path by each of the given N _affine_trafos_ at once,
+        e.g. to place all occurrences of a glyph on a page.
+        All points are transformed by a single (vectorized) matrix multiplication.
+        Relative commands are converted into absolute ones beforehand.
+
+        Args:
+            affine_trafos (Sequence[List[float]]): N affine transformations [a00, a01, a10, a11, b0, b1]
+
+        Returns:
+            List[AvPathData]: the N transformed paths (sharing the same commands array)
+        """
+        path = self.to_absolute()
+        trafos = numpy.asarray(affine_trafos, dtype=numpy.float64).reshape(-1, 6)
+        (a00, a01, a10, a11, b0, b1) = (trafos[:, [i]] for i in range(6))  # each of shape (N, 1)
+        coords = path.coords
+        roles = path.roles
+        ret_coords = numpy.tile(coords, (len(trafos), 1))
+
+        # Points as homogeneous row vectors (P, 3) times the N matrices (N, 3, 2) -> (N, P, 2)
+        x_idx = numpy.flatnonzero(roles == AvPathData.ROLE_X)
+        y_idx = x_idx + 1
+        points = numpy.column_stack((coords[x_idx], coords[y_idx], numpy.ones(len(x_idx))))
+        matrices = trafos[:, [[0, 2], [1, 3], [4, 5]]]
+        transformed = points @ matrices
+        ret_coords[:, x_idx] = transformed[:, :, 0]
+        ret_coords[:, y_idx] = transformed[:, :, 1]
+
+        h_idx = numpy.flatnonzero(roles == AvPathData.ROLE_H)
+        ret_coords[:, h_idx] = a00 * coords[h_idx] + a01 + b0
+        v_idx = numpy.flatnonzero(roles == AvPathData.ROLE_V)
+        ret_coords[:, v_idx] = a10 + a11 * coords[v_idx] + b1
+
+        rx_idx = numpy.flatnonzero(roles == AvPathData.ROLE_RX)
+        ret_coords[:, rx_idx] *= a00
+        ry_idx = numpy.flatnonzero(roles == AvPathData.ROLE_RY)
+        ret_coords[:, ry_idx] *= a11
+
+        return [AvPathData(path.commands, row) for row in ret_coords]
+
+    def end_points(self) -> numpy.ndarray:
+        """
+        Returns the current point after each command, i.e. the point a following relative command refers to.
+        Relative commands are converted into absolute ones beforehand.
+
+        Returns:
+            numpy.ndarray: array of shape (number of commands, 2)
+        """
+        path = self.to_absolute()
+        (commands, coords, offsets) = (path.commands, path.coords, path.offsets)
+        num_args = _NUM_ARGS_TABLE[commands]
+        ends = numpy.full((len(commands), 2), numpy.nan)
+        # commands ending with a point (x, y):
+        is_point = _ENDS_WITH_POINT_TABLE[commands]
+        ends[is_point, 0] = coords[offsets[1:][is_point] - 2]
+        ends[is_point, 1] = coords[offsets[1:][is_point] - 1]
+        # horizontal and vertical lines set only one coordinate:
+        is_h = commands == ord("H")
+        ends[is_h, 0] = coords[offsets[:-1][is_h]]
+        is_v = commands == ord("V")
+        ends[is_v, 1] = coords[offsets[:-1][is_v]]
+        # closepath returns to the start point of the sub-path, i.e. the last moveto:
+        last_move = numpy.maximum.accumulate(numpy.where(commands == ord("M"), numpy.arange(len(commands)), -1))
+        is_z = (num_args == 0) & (last_move >= 0)
+        ends[is_z] = ends[last_move[is_z]]
+        # missing coordinates are kept from the previous command (forward fill):
+        for axis in (0, 1):
+            valid = ~numpy.isnan(ends[:, axis])
+            last_valid = numpy.maximum.accumulate(numpy.where(valid, numpy.arange(len(commands)), -1))
+            ends[:, axis] = numpy.where(last_valid >= 0, ends[numpy.maximum(last_valid, 0), axis], 0.0)
+        return ends
+
+    def flatten(
+        self,
+        num_points: int = 10,
+        affine_trafo: Optional[Sequence[Union[int, float]]] = None,
+        tolerance: Optional[float] = None,
+        max_angle_degree: Optional[float] = None,
+        max_steps: int = 9,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Flatten the path into one contiguous array of points directly from the numeric form,
+        i.e. without intermediate path strings.
+        Each curve (C, Q) is replaced by the _num_points_ - 1 points at the uniformly distributed
+        parameters t = 1/(num_points-1), ..., 1. All curves of the same degree are evaluated
+        by one matrix multiplication with the Bernstein basis.
+        If a _tolerance_ is given, the number of points is calculated for each curve instead,
+        so that the distance between curve and chords is at most _tolerance_ (see flatten_counts()).
+        If a _max_angle_degree_ is given, the curves are refined until the tangents of neighboring points
+        differ at most by this angle (see flatten_parameters_by_angle()).
+        Other commands contribute their end point, a closepath does not add a point,
+        i.e. the contours are implicitly closed.
+        Supported commands are M, L, H, V, C, Q and Z (absolute or relative), e.g. all pen outputs.
+
+        Args:
+            num_points (int, optional): number of points per curve including its start point. Defaults to 10.
+            affine_trafo (Optional[Sequence[float]], optional): affine transformation [a00, a01, a10, a11, b0, b1]
+                applied to the resulting points. Defaults to None.
+            tolerance (Optional[float], optional): maximum deviation of the chords from the curves
+                in units of the resulting points (i.e. after _affine_trafo_). Defaults to None (use _num_points_).
+            max_angle_degree (Optional[float], optional): maximum angle between the tangents of neighboring points.
+                Defaults to None (use _tolerance_ or _num_points_).
+            max_steps (int, optional): maximum number of refinement passes for _max_angle_degree_. Defaults to 9.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: the points (shape (number of points, 2)) and
+                the index of the first point of each contour
+        """
+        path = self.to_absolute()
+        (commands, coords, offsets) = (path.commands, path.coords, path.offsets)
+        if not numpy.all(_POLYGONIZE_TABLE[commands]):
+            raise ValueError("flatten() supports the commands M, L, H, V, C, Q and Z only")
+        num_points = max(2, num_points)
+
+        ends = path.end_points()
+        starts = numpy.vstack(([0.0, 0.0], ends[:-1]))
+        curves = []  # (is_curve, degree, control polygons, number of points, parameters) per degree
+        for degree in (2, 3):
+            is_curve = commands == ord("QC"[degree - 2])
+            # control polygons (k, degree + 1, 2): start point, control points and end point
+            arg_indices = offsets[:-1][is_curve][:, None] + numpy.arange(2 * degree)
+            control_points = coords[arg_indices].reshape(-1, degree, 2)
+            control_polygons = numpy.concatenate((starts[is_curve][:, None, :], control_points), axis=1)
+            segments = numpy.full(len(control_polygons), num_points - 1)
+            parameters = None  # parameters t of the points of all curves (if not uniform), in one array
+            if tolerance is not None and max_angle_degree is None:
+                segments = AvPathData.flatten_counts(control_polygons, tolerance, affine_trafo)
+                # parameters t = 1/n, ..., 1 of each curve:
+                curve_of_point = numpy.repeat(numpy.arange(len(segments)), segments)
+                first_of_curve = numpy.concatenate(([0], numpy.cumsum(segments)[:-1])).astype(numpy.intp)
+                parameters = (numpy.arange(len(curve_of_point)) - first_of_curve[curve_of_point] + 1) / segments[
+                    curve_of_point
+                ]
+            curves.append((is_curve, degree, control_polygons, segments, parameters))
+
+        if max_angle_degree is not None:
+            # quadratic curves are elevated to cubic ones (same points and tangents) to refine all curves together:
+            ((is_quadratic, _, quadratics, _, _), (is_cubic, _, cubics, _, _)) = curves
+            is_curve = is_quadratic | is_cubic
+            curve_index = numpy.cumsum(is_curve) - 1
+            control_polygons = numpy.empty((numpy.count_nonzero(is_curve), 4, 2))
+            control_polygons[curve_index[is_cubic]] = cubics
+            control_polygons[curve_index[is_quadratic]] = _QUADRATIC_TO_CUBIC @ quadratics
+            (parameters, segments) = AvPathData.flatten_parameters_by_angle(
+                control_polygons, max_angle_degree, max_steps
+            )
+            curves = [(is_curve, 3, control_polygons, segments, parameters)]
+
+        is_single = _ADDS_END_POINT_TABLE[commands]
+        counts = is_single.astype(numpy.intp)
+        for is_curve, _, _, segments, _ in curves:
+            counts[is_curve] = segments
+        positions = numpy.concatenate(([0], numpy.cumsum(counts)[:-1])).astype(numpy.intp)
+
+        points = numpy.empty((int(counts.sum()), 2))
+        points[positions[is_single]] = ends[is_single]
+        for is_curve, degree, control_polygons, segments, parameters in curves:
+            if not len(control_polygons):
+                continue
+            if parameters is None:
+                curve_points = _bernstein_basis(degree, num_points) @ control_polygons  # (k, num_points - 1, 2)
+                points[positions[is_curve][:, None] + numpy.arange(num_points - 1)] = curve_points
+            else:
+                curve_of_point = numpy.repeat(numpy.arange(len(segments)), segments)
+                first_of_curve = numpy.concatenate(([0], numpy.cumsum(segments)[:-1])).astype(numpy.intp)
+                basis = _bernstein_polynomials(degree, parameters)
+                curve_points = numpy.einsum("pj,pjc->pc", basis, control_polygons[curve_of_point])
+                points[
+                    positions[is_curve][curve_of_point] + numpy.arange(len(parameters)) - first_of_curve[curve_of_point]
+                ] = curve_points
+
+        if affine_trafo is not None:
+            (a00, a01, a10, a11, b0, b1) = affine_trafo
+            points = points @ numpy.array([[a00, a10], [a01, a11]]) + (b0, b1)
+        return (points, positions[commands == ord("M")])
+
+    @staticmethod
+    def flatten_parameters_by_angle(
+        control_polygons: numpy.ndarray, max_angle_degree: float, max_steps: int = 9
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Parameters of the points of Bezier curves refined by the angle between tangents:
+        starting with t = 0, 0.5, 1 each interval is halved if the unit tangents at its ends differ
+        by more than _max_angle_degree_, in at most _max_steps_ - 1 passes.
+        All curves are refined together, the tangents are calculated in closed form.
+        Same criterion and result as av.path.AvPathPolygon.polygonize_by_angle(), which works on svgpathtools segments.
+
+        Args:
+            control_polygons (numpy.ndarray): control points of k curves of the same degree, shape (k, degree + 1, 2)
+            max_angle_degree (float): maximum angle between the tangents of neighboring points
+            max_steps (int, optional): maximum number of refinement passes (plus one). Defaults to 9.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: the parameters t > 0 of all curves in one array (sorted per curve)
+                and the number of parameters of each curve
+        """
+        angle_limit = math.cos(max_angle_degree * math.pi / 180)
+        num_curves = len(control_polygons)
+        curve_of_param = numpy.repeat(numpy.arange(num_curves), 3)
+        params = numpy.tile([0.0, 0.5, 1.0], num_curves)
+        tangents = _bezier_unit_tangents(control_polygons[curve_of_param], params)
+        for _ in range(1, max_steps):
+            dot_products = numpy.einsum("pc,pc->p", tangents[:-1], tangents[1:])
+            split = (curve_of_param[:-1] == curve_of_param[1:]) & (dot_products < angle_limit)
+            if not numpy.any(split):
+                break
+            left = numpy.flatnonzero(split)
+            # positions in the refined arrays: each split shifts the following entries by one
+            shifted = numpy.arange(len(params)) + numpy.concatenate(([0], numpy.cumsum(split)))
+            inserted = left + 1 + numpy.arange(len(left))
+            refined_curves = numpy.empty(len(params) + len(left), dtype=numpy.intp)
+            (refined_curves[shifted], refined_curves[inserted]) = (curve_of_param, curve_of_param[left])
+            refined_params = numpy.empty(len(refined_curves))
+            refined_params[shifted] = params
+            refined_params[inserted] = (params[left] + params[left + 1]) / 2
+            refined_tangents = numpy.empty((len(refined_curves), 2))
+            refined_tangents[shifted] = tangents
+            refined_tangents[inserted] = _bezier_unit_tangents(
+                control_polygons[curve_of_param[left]], refined_params[inserted]
+            )
+            (curve_of_param, params, tangents) = (refined_curves, refined_params, refined_tangents)
+        keep = params > 0
+        return (params[keep], numpy.bincount(curve_of_param[keep], minlength=num_curves))
+
+    @staticmethod
+    def flatten_counts(
+        control_polygons: numpy.ndarray,
+        tolerance: float,
+        affine_trafo: Optional[Sequence[Union[int, float]]] = None,
+    ) -> numpy.ndarray:
+        """
+        Number of uniform parameter steps for each Bezier curve, so that the distance between
+        the curve and its chords is at most _tolerance_.
+        A chord over a parameter interval of length h deviates at most max|B''| * h^2 / 8 from the curve, with
+            quadratic curves: max|B''| = 2 * |P0 - 2 P1 + P2|
+            cubic curves:     max|B''| = 6 * max(|P0 - 2 P1 + P2|, |P1 - 2 P2 + P3|)
+        i.e. n = ceil(sqrt(max|B''| / (8 * tolerance))). Straight curves result in one step.
+
+        Args:
+            control_polygons (numpy.ndarray): control points of k curves of the same degree, shape (k, degree + 1, 2)
+            tolerance (float): maximum deviation in units of the transformed points
+            affine_trafo (Optional[Sequence[float]], optional): affine transformation [a00, a01, a10, a11, b0, b1]
+                applied to the points afterwards. Defaults to None.
+
+        Returns:
+            numpy.ndarray: number of steps (at least 1) of each curve
+        """
+        if tolerance <= 0:
+            raise ValueError(f"tolerance has to be positive, not {tolerance}")
+        degree = control_polygons.shape[1] - 1
+        second_differences = control_polygons[:, :-2] - 2 * control_polygons[:, 1:-1] + control_polygons[:, 2:]
+        if affine_trafo is not None:
+            (a00, a01, a10, a11) = affine_trafo[:4]  # the translation does not change differences
+            second_differences = second_differences @ numpy.array([[a00, a10], [a01, a11]])
+        max_second_derivative = degree * (degree - 1) * numpy.linalg.norm(second_differences, axis=2).max(axis=1)
+        steps = numpy.ceil(numpy.sqrt(max_second_derivative / (8 * tolerance)))
+        return numpy.maximum(steps, 1).astype(numpy.intp)
+
+    def polygonize(
+        self,
+        num_points: int = 10,
+        affine_trafo: Optional[Sequence[Union[int, float]]] = None,
+        tolerance: Optional[float] = None,
+        max_angle_degree: Optional[float] = None,
+        max_steps: int = 9,
+    ) -> List[numpy.ndarray]:
+        """
+        Flatten the path into polylines, one per contour (sub-path), see flatten().
+        The polylines are views of one contiguous array.
+
+        Args:
+            num_points (int, optional): number of points per curve including its start point. Defaults to 10.
+            affine_trafo (Optional[Sequence[float]], optional): affine transformation [a00, a01, a10, a11, b0, b1]
+                applied to the resulting points. Defaults to None.
+            tolerance (Optional[float], optional): maximum deviation of the chords from the curves
+                in units of the resulting points. Defaults to None (use _num_points_).
+            max_angle_degree (Optional[float], optional): maximum angle between the tangents of neighboring points.
+                Defaults to None.
+            max_steps (int, optional): maximum number of refinement passes for _max_angle_degree_. Defaults to 9.
+
+        Returns:
+            List[numpy.ndarray]: one array of shape (number of points, 2) per contour
+        """
+        (points, contour_starts) = self.flatten(num_points, affine_trafo, tolerance, max_angle_degree, max_steps)
+        return numpy.split(points, contour_starts[1:])
+
+    def draw(self, pen) -> None:
+        """
+        Draw the path into the given (fontTools) _pen_ like a glyph, i.e. by calling
+        moveTo(), lineTo(), qCurveTo(), curveTo(), closePath() and endPath().
+        Supported commands are M, L, H, V, C, Q and Z (absolute or relative).
+
+        Args:
+            pen (AbstractPen): the pen, e.g. ave.fonttools.AvContourPen
+        """
+        path = self.to_absolute()
+        if not numpy.all(_POLYGONIZE_TABLE[path.commands]):
+            raise ValueError("draw() supports the commands M, L, H, V, C, Q and Z only")
+        (coords, offsets, ends) = (path.coords.tolist(), path.offsets.tolist(), path.end_points().tolist())
+        contour_open = False
+        for k, command_letter in enumerate(map(chr, path.commands.tolist())):
+            args = coords[offsets[k] : offsets[k + 1]]
+            if command_letter == "M":
+                if contour_open:
+                    pen.endPath()
+                pen.moveTo(tuple(args))
+                contour_open = True
+            elif command_letter in "LHV":
+                pen.lineTo(tuple(ends[k]))
+            elif command_letter == "Q":
+                pen.qCurveTo(tuple(args[0:2]), tuple(args[2:4]))
+            elif command_letter == "C":
+                pen.curveTo(tuple(args[0:2]), tuple(args[2:4]), tuple(args[4:6]))
+            elif contour_open:  # Z
+                pen.closePath()
+                contour_open = False
+        if contour_open:
+            pen.endPath()
+
+    @classmethod
+    def from_polylines(cls, polylines: Sequence[numpy.ndarray], closed: bool = True) -> AvPathData:
+        """
+        Create a path consisting of the given _polylines_, e.g. the result of polygonize().
+
+        Args:
+            polylines (Sequence[numpy.ndarray]): arrays of shape (number of points, 2)
+            closed (bool, optional): True to close each polyline by a closepath. A last point equal
+                to the first point is omitted then. Defaults to True.
+
+        Returns:
+            AvPathData: the path, "M L ... L Z" for each polyline
+        """
+        (commands, coords) = ([], [])
+        for polyline in polylines:
+            polyline = numpy.asarray(polyline, dtype=numpy.float64).reshape(-1, 2)
+            if closed and len(polyline) > 1 and numpy.array_equal(polyline[0], polyline[-1]):
+                polyline = polyline[:-1]
+            if not len(polyline):
+                continue
+            polyline_commands = numpy.full(len(polyline) + closed, ord("L"), dtype=numpy.uint8)
+            polyline_commands[0] = ord("M")
+            if closed:
+                polyline_commands[-1] = ord("Z")
+            commands.append(polyline_commands)
+            coords.append(polyline.ravel())
+        if not commands:
+            return cls(numpy.zeros(0, dtype=numpy.uint8), numpy.zeros(0))
+        return cls(numpy.concatenate(commands), numpy.concatenate(coords))
+
+    def map_coords(self, func: Callable[[float], float]) -> AvPathData:
+        """
+        Apply the given _func_ on each value of coords.
+
+        Args:
+            func (Callable): a function that takes a float and returns a float.
+
+        Returns:
+            AvPathData: the path with mapped coords
+        """
+        coords = numpy.fromiter(map(func, self._coords.tolist()), dtype=numpy.float64, count=len(self._coords))
+        return AvPathData(self._commands, coords)
+
+    def to_string(self, letter_separator: str = "") -> str:
+        """
+        Serialize the path into a SVG path string, e.g. "M10 20 L30 40 Z".
+
+        Args:
+            letter_separator (str, optional): inserted between command letter and its arguments.
+                Defaults to "".
+
+        Returns:
+            str: the SVG path string
+        """
+        # Build one printf-style template for the whole path and format all coords in one go:
+        templates = _command_templates(letter_separator)
+        template = " ".join(map(templates.__getitem__, self._commands.tolist()))
+        return template % tuple(self._coords.tolist())
+
+
+def _build_num_args_table() -> numpy.ndarray:
+    """Lookup table: ASCII code of a command letter -> number of arguments"""
+    table = numpy.zeros(128, dtype=numpy.intp)
+    for command_letter, num_args in AvPathData.NUM_ARGS.items():
+        table[ord(command_letter)] = num_args
+    return table
+
+
+def _build_roles_table() -> numpy.ndarray:
+    """Lookup table: (ASCII code of a command letter, argument position) -> role of the argument"""
+    (x, y, keep) = (AvPathData.ROLE_X, AvPathData.ROLE_Y, AvPathData.ROLE_KEEP)
+    roles_of_command = {
+        **dict.fromkeys("MmLlTt", [x, y]),
+        **dict.fromkeys("SsQq", [x, y, x, y]),
+        **dict.fromkeys("Cc", [x, y, x, y, x, y]),
+        **dict.fromkeys("Hh", [AvPathData.ROLE_H]),
+        **dict.fromkeys("Vv", [AvPathData.ROLE_V]),
+        **dict.fromkeys("Aa", [AvPathData.ROLE_RX, AvPathData.ROLE_RY, keep, keep, keep, x, y]),
+    }
+    table = numpy.full((128, 7), keep, dtype=numpy.int8)
+    for command_letter, roles in roles_of_command.items():
+        table[ord(command_letter), : len(roles)] = roles
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _command_templates(letter_separator: str) -> Dict[int, str]:
+    """Lookup table: ASCII code of a command letter -> printf-style template, e.g. "C%g %g %g %g %g %g" """
+    templates = {}
+    for command_letter, num_args in AvPathData.NUM_ARGS.items():
+        if num_args:
+            templates[ord(command_letter)] = command_letter + letter_separator + " ".join(["%g"] * num_args)
+        else:
+            templates[ord(command_letter)] = command_letter
+    return templates
+
+
+@functools.lru_cache(maxsize=None)
+def _bernstein_basis(degree: int, num_points: int) -> numpy.ndarray:
+    """
+    Bernstein basis of the given _degree_ at the parameters t = 1/(num_points-1), ..., 1,
+    i.e. (basis @ control_polygon) evaluates a Bezier curve at these parameters.
+
+    Returns:
+        numpy.ndarray: read-only array of shape (num_points - 1, degree + 1)
+    """
+    basis = _bernstein_polynomials(degree, numpy.arange(1, num_points) / (num_points - 1))
+    basis.flags.writeable = False
+    return basis
+
+
+def _build_command_table(command_letters: bytes) -> numpy.ndarray:
+    """Lookup table (indexed by ASCII code) which is True for the given _command_letters_."""
+    table = numpy.zeros(256, dtype=bool)
+    table[numpy.frombuffer(command_letters, dtype=numpy.uint8)] = True
+    return table
+
+
+def _bernstein_polynomials(degree: int, t: numpy.ndarray) -> numpy.ndarray:
+    """
+    Bernstein polynomials of the given _degree_ at the parameters _t_ (one parameter per row).
+
+    Returns:
+        numpy.ndarray: array of shape (len(t), degree + 1)
+    """
+    t = t[:, None]
+    i = numpy.arange(degree + 1)
+    binomials = numpy.array([math.comb(degree, k) for k in range(degree + 1)], dtype=numpy.float64)
+    return binomials * t**i * (1 - t) ** (degree - i)
+
+
+def _bezier_unit_tangents(control_polygons: numpy.ndarray, t: numpy.ndarray) -> numpy.ndarray:
+    """
+    Unit tangents of Bezier curves (one curve per parameter) at the parameters _t_.
+    If the first derivative vanishes (e.g. a control point equals the start point),
+    the limit of the tangent is used, i.e. the direction of the next derivative
+    (i.e. of the hodograph, reversed at the end point).
+
+    Args:
+        control_polygons (numpy.ndarray): shape (len(t), degree + 1, 2)
+        t (numpy.ndarray): parameters
+
+    Returns:
+        numpy.ndarray: array of shape (len(t), 2)
+    """
+    if control_polygons.shape[1] < 2:  # constant, i.e. degenerated to a point
+        return numpy.zeros((len(t), 2))
+    differences = control_polygons[:, 1:] - control_polygons[:, :-1]
+    if differences.shape[1] == 3:  # cubic curves: the derivative in closed form
+        t = t[:, None]
+        derivatives = (1 - t) ** 2 * differences[:, 0] + 2 * t * (1 - t) * differences[:, 1] + t**2 * differences[:, 2]
+    else:
+        derivatives = numpy.einsum("pj,pjc->pc", _bernstein_polynomials(differences.shape[1] - 1, t), differences)
+        t = t[:, None]
+    lengths = numpy.hypot(derivatives[:, 0], derivatives[:, 1])
+    undefined = lengths <= 1e-12
+    if numpy.any(undefined):
+        lengths[undefined] = 1.0
+        derivatives[undefined] = _bezier_unit_tangents(differences[undefined], t[undefined, 0])
+        derivatives[undefined & (t[:, 0] >= 1)] *= -1  # the next derivative has the opposite direction there
+    return derivatives / lengths[:, None]
+
+
+_NUM_ARGS_TABLE: numpy.ndarray = _build_num_args_table()
+# degree elevation, i.e. control points of the cubic curve equal to a quadratic one:
+_QUADRATIC_TO_CUBIC: numpy.ndarray = numpy.array([[1, 0, 0], [1 / 3, 2 / 3, 0], [0, 2 / 3, 1 / 3], [0, 0, 1]])
+_POLYGONIZE_TABLE: numpy.ndarray = _build_command_table(b"MmLlHhVvCcQqZz")  # commands supported by flatten()
+_ENDS_WITH_POINT_TABLE: numpy.ndarray = _build_command_table(b"MLTSQCA")  # ending with the point (x, y)
+_ADDS_END_POINT_TABLE: numpy.ndarray = _build_command_table(b"MLHV")  # flatten() adds just their end point
+_ROLES_TABLE: numpy.ndarray = _build_roles_table()
+
+
+class AvPathSerializer:
+    """
+    Serializer of AvPathData into compact SVG path strings.
+    The precision is given by a fixed number of decimals, which can be derived from the
+    physical resolution of the output (see from_resolution()).
+    To keep the path strings short the serializer
+        - rounds all coordinates to the given number of decimals (no trailing zeros, ".5" instead of "0.5"),
+        - uses relative commands where they are shorter than absolute ones,
+        - omits repeated command letters and separators which are not needed, e.g. "M1 2 3-4".
+    Relative coordinates are calculated from the rounded absolute coordinates, so rounding errors do not add up.
+    All decisions are taken on the rounded integer values and all numbers of a path are formatted
+    in bulk by one printf-style operation, not one by one.
+    """
+
+    def __init__(self, decimals: int = 4, relative: bool = True) -> None:
+        """
+        Initializes a new AvPathSerializer instance.
+
+        Args:
+            decimals (int, optional): number of decimals of each coordinate. Defaults to 4.
+            relative (bool, optional): use relative commands where they are shorter. Defaults to True.
+        """
+        self.decimals = max(0, int(decimals))
+        self.relative = relative
+
+    @classmethod
+    def from_resolution(cls, dpi: float, units_per_mm: float, relative: bool = True) -> AvPathSerializer:
+        """
+        Create a serializer with the minimum number of decimals needed for the given output resolution,
+        i.e. the rounding error stays below half a printer dot.
+        Example: 300 DPI on a 150 mm wide viewbox normalized to width 1.0 (units_per_mm=1/150)
+        results in 4 decimals.
+
+        Args:
+            dpi (float): target physical resolution in dots per inch
+            units_per_mm (float): number of path units per mm, e.g. the viewbox_scale of AvSvgPage
+            relative (bool, optional): use relative commands where they are shorter. Defaults to True.
+
+        Returns:
+            AvPathSerializer: the serializer
+        """
+        dot_size = 25.4 / dpi * units_per_mm  # size of one dot in path units
+        return cls(math.ceil(-math.log10(dot_size)), relative)
+
+    def quantize(self, values: numpy.ndarray) -> numpy.ndarray:
+        """
+        Round the given _values_ to the number of decimals of this serializer.
+
+        Args:
+            values (numpy.ndarray): float values
+
+        Returns:
+            numpy.ndarray: the values as integers in units of 10**-decimals
+        """
+        return numpy.rint(numpy.asarray(values) * 10.0**self.decimals).astype(numpy.int64)
+
+    def format_numbers(self, quantized: numpy.ndarray) -> List[str]:
+        """
+        Format all given _quantized_ values at once, e.g. [10000, -2500, 35000] -> ["1", "-.25", "3.5"]
+
+        Args:
+            quantized (numpy.ndarray): integer values in units of 10**-decimals, see quantize()
+
+        Returns:
+            List[str]: the formatted numbers
+        """
+        if not len(quantized):
+            return []
+        values = (quantized / 10.0**self.decimals).tolist()
+        text = " ".join([f"%.{self.decimals}f"] * len(values)) % tuple(values)
+        if self.decimals:
+            tokens = text.split(" ")
+            tokens = list(map(str.rstrip, map(str.rstrip, tokens, repeat("0")), repeat(".")))
+            text = " " + " ".join(tokens)
+            text = text.replace(" 0.", " .").replace(" -0.", " -.")[1:]
+        return text.split(" ")
+
+    def number_lengths(self, quantized: numpy.ndarray) -> numpy.ndarray:
+        """
+        Calculate the lengths of the numbers format_numbers() would create, without formatting them.
+
+        Args:
+            quantized (numpy.ndarray): integer values in units of 10**-decimals, see quantize()
+
+        Returns:
+            numpy.ndarray: the number of characters of each formatted number
+        """
+        scale = 10**self.decimals
+        (int_part, frac_part) = numpy.divmod(numpy.abs(quantized), scale)
+        frac_digits = numpy.where(frac_part > 0, self.decimals, 0)
+        for i in range(1, self.decimals):
+            frac_digits -= (frac_part > 0) & (frac_part % 10**i == 0)
+        int_digits = numpy.floor(numpy.log10(numpy.maximum(int_part, 1))).astype(numpy.int64) + 1
+        int_digits[(int_part == 0) & (frac_part > 0)] = 0  # ".5" instead of "0.5"
+        return (quantized < 0) + int_digits + numpy.where(frac_part > 0, 1 + frac_digits, 0)
+
+    def serialize(self, path: AvPathData) -> str:
+        """
+        Serialize the given _path_ into a compact SVG path string.
+
+        Args:
+            path (AvPathData): the path to serialize
+
+        Returns:
+            str: the SVG path string
+        """
+        path = path.to_absolute()
+        (commands, offsets, roles) = (path.commands, path.offsets, path.roles)
+        num_args = _NUM_ARGS_TABLE[commands]
+        has_args = num_args > 0
+        arg_offsets = offsets[:-1][has_args]
+
+        # Round first, then derive the relative coordinates from the rounded values:
+        abs_values = self.quantize(path.coords)
+        use_rel = numpy.zeros(len(commands), dtype=bool)
+        values = abs_values
+        if self.relative and len(abs_values):
+            scale = 10.0**self.decimals
+            rounded_ends = self.quantize(AvPathData(commands, abs_values / scale).end_points())
+            start_points = numpy.vstack(([0, 0], rounded_ends[:-1]))  # current point before each command
+            start_of_arg = numpy.repeat(start_points, num_args, axis=0)
+            rel_values = abs_values.copy()
+            is_x = (roles == AvPathData.ROLE_X) | (roles == AvPathData.ROLE_H)
+            is_y = (roles == AvPathData.ROLE_Y) | (roles == AvPathData.ROLE_V)
+            rel_values[is_x] -= start_of_arg[is_x, 0]
+            rel_values[is_y] -= start_of_arg[is_y, 1]
+            # Per command: use the relative form if it is shorter
+            abs_lengths = numpy.add.reduceat(self.number_lengths(abs_values), arg_offsets)
+            rel_lengths = numpy.add.reduceat(self.number_lengths(rel_values), arg_offsets)
+            use_rel[has_args] = rel_lengths < abs_lengths
+            values = numpy.where(numpy.repeat(use_rel, num_args), rel_values, abs_values)
+        letters = numpy.where(use_rel, commands + 32, commands).astype(numpy.uint8)
+        if not len(values):
+            return "".join(map(chr, letters.tolist()))
+
+        # Omit a command letter if it is implied by the previous command (moveto implies lineto)
+        implied = letters.copy()
+        implied[letters == ord("M")] = ord("L")
+        implied[letters == ord("m")] = ord("l")
+        omit = numpy.zeros(len(commands), dtype=bool)
+        omit[1:] = has_args[1:] & (letters[1:] == implied[:-1])
+
+        # Numbers need a separator unless the sign or a second decimal point separates them
+        frac_part = numpy.abs(values) % 10**self.decimals
+        has_point = frac_part > 0
+        starts_with_point = has_point & (numpy.abs(values) < 10**self.decimals) & (values >= 0)
+        prev_has_point = numpy.concatenate(([False], has_point[:-1]))
+        need_space = ~((values < 0) | (starts_with_point & prev_has_point))
+        prefixes = numpy.where(need_space, " ", "").astype(object)
+        prefixes[0] = ""
+
+        # First number of each command is prefixed by preceding closepaths and the command letter (if needed)
+        num_closepaths = numpy.cumsum(~has_args)
+        closepaths_before = numpy.diff(numpy.concatenate(([0], num_closepaths[has_args])))
+        for arg_offset, closepaths, letter, omitted in zip(
+            arg_offsets.tolist(), closepaths_before.tolist(), letters[has_args].tolist(), omit[has_args].tolist()
+        ):
+            if not omitted:
+                prefixes[arg_offset] = "Z" * closepaths + chr(letter)
+            elif closepaths:
+                prefixes[arg_offset] = "Z" * closepaths + prefixes[arg_offset]
+
+        tokens = self.format_numbers(values)
+        trailing_closepaths = "Z" * int(num_closepaths[-1] - num_closepaths[has_args][-1])
+        return "".join(map(operator.add, prefixes.tolist(), tokens)) + trailing_closepaths
+
+
+class AvPathDataBatch:
+    """
+    Many paths (e.g. all letters of a text line or a page) stored in one single AvPathData buffer.
+    Item k consists of the commands path.commands[item_offsets[k]:item_offsets[k+1]].
+    All items are transformed by one vectorized operation (each item by its own trafo)
+    and serialized by one formatting operation, either into one path string for a single <path d=...>
+    or into one path string per item. Large batches are serialized by a pool of worker processes.
+    """
+
+    # Minimum number of commands of a batch to distribute its serialization on several processes:
+    PARALLEL_MIN_COMMANDS: ClassVar[int] = 200000
+
+    def __init__(self, path: AvPathData, item_offsets: numpy.ndarray) -> None:
+        """
+        Initializes a new AvPathDataBatch instance.
+
+        Args:
+            path (AvPathData): the concatenated absolute paths of all items
+            item_offsets (numpy.ndarray): index of the first command of each item plus the number of commands
+        """
+        self.path = path
+        self.item_offsets = numpy.asarray(item_offsets, dtype=numpy.intp)
+
+    @classmethod
+    def from_paths(cls, paths: Sequence[Union[str, AvPathData]]) -> AvPathDataBatch:
+        """
+        Create a batch of the given _paths_ (path strings or parsed paths).
+        Relative commands are converted into absolute ones, so each item keeps its own geometry.
+
+        Args:
+            paths (Sequence[Union[str, AvPathData]]): the items
+
+        Returns:
+            AvPathDataBatch: the batch
+        """
+        parsed: Dict[int, AvPathData] = {}  # items occurring several times are parsed and converted only once
+        items = []
+        for path in paths:
+            item = parsed.get(id(path))
+            if item is None:
+                item = AvPathData.from_string(path) if isinstance(path, str) else path
+                item = parsed[id(path)] = item.to_absolute()
+            items.append(item)
+        item_offsets = numpy.zeros(len(items) + 1, dtype=numpy.intp)
+        numpy.cumsum([len(item.commands) for item in items], out=item_offsets[1:])
+        if not items:
+            return cls(AvPathData(numpy.zeros(0, dtype=numpy.uint8), numpy.zeros(0)), item_offsets)
+        path = AvPathData(
+            numpy.concatenate([item.commands for item in items]), numpy.concatenate([item.coords for item in items])
+        )
+        return cls(path, item_offsets)
+
+    def __len__(self) -> int:
+        return len(self.item_offsets) - 1
+
+    def item(self, index: int) -> AvPathData:
+        """Returns the path of the item with the given _index_."""
+        (first, last) = (self.item_offsets[index], self.item_offsets[index + 1])
+        offsets = self.path.offsets
+        return AvPathData(self.path.commands[first:last], self.path.coords[offsets[first] : offsets[last]])
+
+    def transform(self, affine_trafos: Sequence[Sequence[Union[int, float]]]) -> AvPathDataBatch:
+        """
+        Transform each item by its own affine transformation, all items at once.
+
+        Args:
+            affine_trafos (Sequence[List[float]]): one affine transformation [a00, a01, a10, a11, b0, b1] per item
+
+        Returns:
+            AvPathDataBatch: the transformed batch
+        """
+        trafos = numpy.asarray(affine_trafos, dtype=numpy.float64).reshape(-1, 6)
+        if len(trafos) != len(self):
+            raise ValueError(f"{len(trafos)} trafos given for {len(self)} items")
+        (coords, roles, offsets) = (self.path.coords, self.path.roles, self.path.offsets)
+        # trafo of each coordinate:
+        coords_per_item = offsets[self.item_offsets[1:]] - offsets[self.item_offsets[:-1]]
+        trafo_of_coord = trafos[numpy.repeat(numpy.arange(len(trafos)), coords_per_item)]
+        ret_coords = coords.copy()
+
+        x_idx = numpy.flatnonzero(roles == AvPathData.ROLE_X)
+        y_idx = x_idx + 1
+        (x, y, trafo) = (coords[x_idx], coords[y_idx], trafo_of_coord[x_idx])
+        ret_coords[x_idx] = trafo[:, 0] * x + trafo[:, 1] * y + trafo[:, 4]
+        ret_coords[y_idx] = trafo[:, 2] * x + trafo[:, 3] * y + trafo[:, 5]
+
+        # same handling as AvPathData.transform_many():
+        for role, (factor, offset_terms) in {
+            AvPathData.ROLE_H: (0, (1, 4)),
+            AvPathData.ROLE_V: (3, (2, 5)),
+            AvPathData.ROLE_RX: (0, ()),
+            AvPathData.ROLE_RY: (3, ()),
+        }.items():
+            idx = numpy.flatnonzero(roles == role)
+            ret_coords[idx] = trafo_of_coord[idx, factor] * coords[idx]
+            for term in offset_terms:
+                ret_coords[idx] += trafo_of_coord[idx, term]
+
+        return AvPathDataBatch(AvPathData(self.path.commands, ret_coords), self.item_offsets)
+
+    def to_string(self) -> str:
+        """Serialize all items into one path string, e.g. for one single <path d=...>."""
+        return self.path.to_string()
+
+    def to_strings(self, serializer: Optional[AvPathSerializer] = None, max_workers: Optional[int] = None) -> List[str]:
+        """
+        Serialize the items into one path string per item.
+        Without serializer all items are formatted by one single printf-style operation.
+        Batches with at least PARALLEL_MIN_COMMANDS commands are split into chunks
+        which are serialized in parallel by a pool of worker processes.
+
+        Args:
+            serializer (Optional[AvPathSerializer], optional): serializer for compact path strings.
+                Defaults to None, i.e. full precision absolute path strings (see AvPathData.to_string()).
+            max_workers (Optional[int], optional): number of worker processes, 1 to serialize in this process.
+                Defaults to None, i.e. the number of cores.
+
+        Returns:
+            List[str]: the path strings of all items
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers > 1 and len(self.path.commands) >= self.PARALLEL_MIN_COMMANDS and len(self) > 1:
+            chunk_limits = numpy.linspace(0, len(self), min(max_workers, len(self)) + 1).astype(numpy.intp)
+            chunks = [self.slice(first, last) for first, last in zip(chunk_limits[:-1], chunk_limits[1:])]
+            with ProcessPoolExecutor(max_workers) as executor:
+                chunk_strings = executor.map(_batch_to_strings, chunks, [serializer] * len(chunks))
+                return [path_string for path_strings in chunk_strings for path_string in path_strings]
+        return _batch_to_strings(self, serializer)
+
+    def flatten(
+        self, num_points: int = 10, tolerance: Optional[float] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        Flatten all items at once into one contiguous array of points, see AvPathData.flatten().
+        Each item has to start with a moveto (or has to be empty).
+
+        Args:
+            num_points (int, optional): number of points per curve including its start point. Defaults to 10.
+            tolerance (Optional[float], optional): maximum deviation of the chords from the curves.
+                Defaults to None (use _num_points_).
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: the points (shape (number of points, 2)),
+                the index of the first point of each contour and
+                the index of the first contour of each item plus the number of contours
+        """
+        if not len(self.path.commands):
+            return (numpy.empty((0, 2)), numpy.empty(0, dtype=numpy.intp), numpy.zeros_like(self.item_offsets))
+        (points, contour_starts) = self.path.flatten(num_points, tolerance=tolerance)
+        contours_before = numpy.concatenate(([0], numpy.cumsum(self.path.commands == ord("M"))))
+        return (points, contour_starts, contours_before[self.item_offsets])
+
+    def slice(self, first: int, last: int) -> AvPathDataBatch:
+        """Returns a batch of the items first, ..., last - 1."""
+        (first_command, last_command) = (self.item_offsets[first], self.item_offsets[last])
+        offsets = self.path.offsets
+        path = AvPathData(
+            self.path.commands[first_command:last_command],
+            self.path.coords[offsets[first_command] : offsets[last_command]],
+        )
+        return AvPathDataBatch(path, self.item_offsets[first : last + 1] - first_command)
+
+
+def _batch_to_strings(batch: AvPathDataBatch, serializer: Optional[AvPathSerializer]) -> List[str]:
+    """Serialize the items of the given _batch_ in this process (module level to be usable by worker processes)."""
+    if serializer:
+        return [serializer.serialize(batch.item(index)) for index in range(len(batch))]
+    if not len(batch):
+        return []
+    # one template for all items, separated by newlines, filled by one printf-style operation:
+    templates = _command_templates("")
+    command_templates = list(map(templates.__getitem__, batch.path.commands.tolist()))
+    item_offsets = batch.item_offsets.tolist()
+    template = "\n".join(
+        " ".join(command_templates[first:last]) for first, last in zip(item_offsets[:-1], item_offsets[1:])
+    )
+    return (template % tuple(batch.path.coords.tolist())).split("\n")
 
 
 class AvSvgPath:
@@ -18,12 +1063,13 @@ class AvSvgPath:
         QuadraticBezier:  4: Qq   2: Tt
         ArcCurve:         7: Aa
         ClosePath:        0: Zz
+    The path string is parsed once into an AvPathData, all manipulations are done numerically.
     """
 
     # Command letters:
-    SVG_CMDS: ClassVar[str] = "MmLlHhVvCcSsQqTtAaZz"
+    SVG_CMDS: ClassVar[str] = AvPathData.SVG_CMDS
     # Definition of a number:
-    SVG_ARGS: ClassVar[str] = r"[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?"
+    SVG_ARGS: ClassVar[str] = AvPathData.SVG_ARGS
 
     @staticmethod
     def beautify_commands(path_string: str, round_func: Optional[Callable] = None) -> str:
@@ -40,48 +1086,10 @@ class AvSvgPath:
         Returns:
             str: the beautified path_string
         """
-        # Find all commands (with their arguments) in the given path string
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        # Initialize the list of commands to be returned
-        ret_commands = []
-        # Iterate over all commands
-        for command in org_commands:
-            # Determine the letter of the command
-            command_letter = command[0]
-            # Determine the arguments of the command
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-            # Determine the batch size of the command
-            batch_size = len(args)
-            # Special cases for the commands
-            if command_letter in "MmLlTt":
-                batch_size = 2
-            elif command_letter in "SsQq":
-                batch_size = 4
-            elif command_letter in "Cc":
-                batch_size = 6
-            elif command_letter in "HhVv":
-                batch_size = 1
-            elif command_letter in "Aa":
-                batch_size = 7
-
-            # If the command has no arguments (like "Z"), just append the command letter
-            if batch_size == 0:
-                ret_commands.append(command_letter)
-            else:
-                # Iterate over all arguments in batches of the batch size
-                for i, arg in enumerate(args):
-                    # If it is the first argument of a batch, append the command letter
-                    if not i % batch_size:
-                        ret_commands.append(command_letter)
-                    # Append the argument (rounded by the round_func if given)
-                    if round_func:
-                        ret_commands.append(f"{(round_func(float(arg))):g}")
-                    else:
-                        ret_commands.append(f"{(float(arg)):g}")
-
-        # Join the commands to a string and return
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+        path = AvPathData.from_string(path_string)
+        if round_func:
+            path = path.map_coords(round_func)
+        return path.to_string(letter_separator=" ")
 
     @staticmethod
     def convert_relative_to_absolute(path_string: str) -> str:
@@ -97,75 +1105,12 @@ class AvSvgPath:
         Returns:
             str: path_string using absolute coordinates
         """
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        ret_commands = []
-        # Store the first point of each path (absolute):
-        first_point: list[float] = []  # acts like None
-        # Keep track of the last (iterating) point (absolute):
-        last_point: list[float] = [0.0, 0.0]
-
-        for command in org_commands:
-            command_letter = command[0]
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-
-            if command_letter.isupper():
-                if command_letter in "MLCSQTA":
-                    last_point = [float(args[-2]), float(args[-1])]
-                elif command_letter in "H":
-                    last_point[0] = float(args[-1])
-                elif command_letter in "V":
-                    last_point[1] = float(args[-1])
-            else:
-                if command_letter in "mlt":
-                    for i in range(0, len(args), 2):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        last_point = [float(args[i + 0]), float(args[i + 1])]
-                elif command_letter in "sq":
-                    for i in range(0, len(args), 4):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        args[i + 2] = f"{(float(args[i+2]) + last_point[0]):g}"
-                        args[i + 3] = f"{(float(args[i+3]) + last_point[1]):g}"
-                        last_point = [float(args[i + 2]), float(args[i + 3])]
-                elif command_letter in "c":
-                    for i in range(0, len(args), 6):
-                        args[i + 0] = f"{(float(args[i+0]) + last_point[0]):g}"
-                        args[i + 1] = f"{(float(args[i+1]) + last_point[1]):g}"
-                        args[i + 2] = f"{(float(args[i+2]) + last_point[0]):g}"
-                        args[i + 3] = f"{(float(args[i+3]) + last_point[1]):g}"
-                        args[i + 4] = f"{(float(args[i+4]) + last_point[0]):g}"
-                        args[i + 5] = f"{(float(args[i+5]) + last_point[1]):g}"
-                        last_point = [float(args[i + 4]), float(args[i + 5])]
-                elif command_letter in "h":
-                    for i, arg in enumerate(args):
-                        args[i] = f"{(float(arg) + last_point[0]):g}"
-                        last_point[0] = float(args[i])
-                elif command_letter in "v":
-                    for i, arg in enumerate(args):
-                        args[i] = f"{(float(arg) + last_point[1]):g}"
-                        last_point[1] = float(args[i])
-                elif command_letter in "a":
-                    for i in range(0, len(args), 7):
-                        args[i + 5] = f"{(float(args[i+5]) + last_point[0]):g}"
-                        args[i + 6] = f"{(float(args[i+6]) + last_point[1]):g}"
-                        last_point = [float(args[i + 5]), float(args[i + 6])]
-
-            ret_commands.append(command_letter.upper() + " ".join(args))
-
-            if command_letter in "Mm" and not first_point:
-                first_point = [float(args[0]), float(args[1])]
-            if command_letter in "Zz":
-                last_point = first_point
-                first_point = []  # acts like None
-
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+        return AvPathData.from_string(path_string).to_absolute().to_string()
 
     @staticmethod
     def transform_path_string(path_string: str, affine_trafo: Sequence[Union[int, float]]) -> str:
         """Transform the given SVG-_path_string_ by using the given _affine_trafo_.
-        Make sure the _path_string_ uses absolute coordinates.
+        Relative coordinates are converted into absolute ones beforehand.
 
         The given _affine_trafo_ is a list of 6 floats, performing an affine transformation.
         The transformation is defined as:
@@ -183,61 +1128,60 @@ class AvSvgPath:
         Returns:
             str: the transformed _path_string_
         """
+        return AvPathData.from_string(path_string).transform(affine_trafo).to_string()
 
-        def transform(x_str: str, y_str: str) -> Tuple[str, str]:
-            """Perform an affine transformation on the given (x,y) point.
-
-            Args:
-                x_str (str): x-coordinate of the point
-                y_str (str): y-coordinate of the point
-
-            Returns:
-                Tuple[str, str]: the transformed (x,y) point
-            """
-            # Perform the transformation
-            x_new = affine_trafo[0] * float(x_str) + affine_trafo[1] * float(y_str) + affine_trafo[4]
-            y_new = affine_trafo[2] * float(x_str) + affine_trafo[3] * float(y_str) + affine_trafo[5]
-            # Round the result to the number of decimal places given by the SVG standard
-            return f"{x_new:g}", f"{y_new:g}"
-
-        # Split the path string into commands
-        org_commands = re.findall(f"[{AvSvgPath.SVG_CMDS}][^{AvSvgPath.SVG_CMDS}]*", path_string)
-        ret_commands = []
-
-        # Iterate over the commands
-        for command in org_commands:
-            command_letter = command[0]
-            args = re.findall(AvSvgPath.SVG_ARGS, command[1:])
-
-            # Check the type of command
-            if command_letter in "MLCSQT":  # (x,y) once or several times
-                # Iterate over the arguments
-                for i in range(0, len(args), 2):
-                    # Perform the transformation
-                    (args[i + 0], args[i + 1]) = transform(args[i + 0], args[i + 1])
-            elif command_letter in "H":  # (x) once or several times
-                # Iterate over the arguments
-                for i, _ in enumerate(args):
-                    # Perform the transformation
-                    (args[i], _) = transform(args[i], "1")
-            elif command_letter in "V":  # (y) once or several times
-                # Iterate over the arguments
-                for i, _ in enumerate(args):
-                    # Perform the transformation
-                    (_, args[i]) = transform("1", args[i])
-            elif command_letter in "A":  # (rx ry angle flag flag x y)+
-                # Iterate over the arguments
-                for i in range(0, len(args), 7):
-                    # Perform the transformation
-                    args[i + 0] = f"{float(args[i+0])*affine_trafo[0]:g}"
-                    args[i + 1] = f"{float(args[i+1])*affine_trafo[3]:g}"
-                    (args[i + 5], args[i + 6]) = transform(args[i + 5], args[i + 6])
-            # Append the transformed command to the output
-            ret_commands.append(command_letter.upper() + " ".join(args))
-
-        # Join the commands together
-        ret_path_string = " ".join(ret_commands)
-        return ret_path_string
+    @staticmethod
+    def transform_path_string_many(path_string: str, affine_trafos: Sequence[Sequence[Union[int, float]]]) -> List[str]:
+        """Transform the given SVG-_path_string_ by each of the given N _affine_trafos_.
+        The path string is parsed only once and all N transformations are done
+        by one vectorized operation, see AvPathData.transform_many().
+
+        Args:
+            path_string (str): SVG-path-string input
+            affine_trafos (Sequence[List[float]]): N affine transformations [a00, a01, a10, a11, b0, b1]
+
+        Returns:
+            List[str]: the N transformed path strings
+        """
+        paths = AvPathData.from_string(path_string).transform_many(affine_trafos)
+        return [path.to_string() for path in paths]
+
+    @staticmethod
+    def transform_path_strings(
+        paths: Sequence[Union[str, AvPathData]],
+        affine_trafos: Sequence[Sequence[Union[int, float]]],
+        serializer: Optional[AvPathSerializer] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """Transform each of the given _paths_ by its own affine transformation, e.g. all letters of a page.
+        All paths are transformed at once and serialized together, see AvPathDataBatch.
+
+        Args:
+            paths (Sequence[Union[str, AvPathData]]): SVG-path-strings or parsed paths
+            affine_trafos (Sequence[List[float]]): one affine transformation [a00, a01, a10, a11, b0, b1] per path
+            serializer (Optional[AvPathSerializer], optional): serializer for compact path strings. Defaults to None.
+            max_workers (Optional[int], optional): number of worker processes for large batches. Defaults to None.
+
+        Returns:
+            List[str]: one transformed path string per path
+        """
+        return AvPathDataBatch.from_paths(paths).transform(affine_trafos).to_strings(serializer, max_workers)
+
+    @staticmethod
+    def transform_path_strings_joined(
+        paths: Sequence[Union[str, AvPathData]], affine_trafos: Sequence[Sequence[Union[int, float]]]
+    ) -> str:
+        """Transform each of the given _paths_ by its own affine transformation and
+        concatenate the results to one path string, e.g. one single <path d=...> for a whole text line.
+
+        Args:
+            paths (Sequence[Union[str, AvPathData]]): SVG-path-strings or parsed paths
+            affine_trafos (Sequence[List[float]]): one affine transformation [a00, a01, a10, a11, b0, b1] per path
+
+        Returns:
+            str: the transformed paths as one path string
+        """
+        return AvPathDataBatch.from_paths(paths).transform(affine_trafos).to_string()
 
 
 if __name__ == "__main__":
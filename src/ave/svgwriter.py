@@ -0,0 +1,349 @@
+"""Lightweight SVG elements and streaming output of SVG element trees"""
+
+from __future__ import annotations
+
+import collections
+import gzip
+import io
+import os
+import struct
+import time
+import xml.etree.ElementTree as etree
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Deque, List, Optional, TextIO, Tuple, Union
+from xml.sax.saxutils import escape
+
+import svgwrite
+import svgwrite.base
+import svgwrite.elementfactory
+
+from ave.consts import Compression
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;"}
+
+
+class AvSvgElement:
+    """
+    Lightweight SVG leaf element (e.g. path, use, rect) consisting just of its tag and attributes.
+
+    Compared to svgwrite elements there is no validation and no per-element object overhead
+    (attribute dict, subelement list, validator, ...). The attribute values are converted to strings
+    on creation. svgwrite containers accept these elements as subelements (their validator just checks
+    the elementname), as the element provides elementname, elements and get_xml() like svgwrite elements do.
+    """
+
+    __slots__ = ("elementname", "attribs")
+
+    elements: Tuple = ()  # leaf element without subelements
+
+    def __init__(self, elementname: str, **attribs: Any) -> None:
+        """
+        Initializes a new AvSvgElement instance.
+
+        Args:
+            elementname (str): the tag, e.g. "path"
+            **attribs: the attributes. Like in svgwrite "_" is replaced by "-" and a trailing "_" is removed,
+                e.g. stroke_width -> stroke-width, class_ -> class. Attributes with value None are omitted.
+        """
+        self.elementname = elementname
+        self.attribs = tuple(
+            sorted(
+                [
+                    (name.rstrip("_").replace("_", "-"), str(value))
+                    for name, value in attribs.items()
+                    if value is not None
+                ]
+            )
+        )
+
+    def tostring(self) -> str:
+        """Return the XML representation of the element."""
+        return (
+            "<"
+            + self.elementname
+            + "".join(f' {name}="{escape(value, _ATTRIBUTE_ENTITIES)}"' for name, value in self.attribs)
+            + " />"
+        )
+
+    def get_xml(self) -> etree.Element:
+        """Return the XML representation of the element as ElementTree object (svgwrite compatibility)."""
+        return etree.Element(self.elementname, dict(self.attribs))
+
+
+SvgElement = Union[svgwrite.base.BaseElement, svgwrite.elementfactory.ElementBuilder, AvSvgElement]
+
+
+class AvParallelGzipFile(io.RawIOBase):
+    """
+    Writable binary stream which creates a standard gzip file using several threads (like pigz).
+
+    The data is split into blocks which are deflated independently and in parallel
+    (zlib releases the GIL). Each block uses the last 32 KiB of its predecessor as preset dictionary
+    and ends with a sync flush, so the concatenated blocks form one single deflate stream
+    which any gzip decoder (e.g. Inkscape) can read.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        level: int = 9,
+        block_size: int = 128 * 1024,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes a new AvParallelGzipFile instance and writes the gzip header.
+
+        Args:
+            fileobj (BinaryIO): binary stream to write the gzip file into, closed by close()
+            level (int, optional): zlib compression level. Defaults to 9.
+            block_size (int, optional): number of uncompressed bytes per block. Defaults to 128 KiB.
+            max_workers (Optional[int], optional): number of threads. Defaults to None, i.e. number of cores.
+        """
+        super().__init__()
+        self._fileobj = fileobj
+        self._level = level
+        self._block_size = block_size
+        workers = max_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(workers)
+        self._max_pending = 2 * workers
+        self._pending: Deque[Future] = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = b""
+        self._crc = 0
+        self._size = 0
+        # header: magic, deflate, no flags, mtime, no extra flags, unknown OS
+        self._fileobj.write(struct.pack("<4sIBB", b"\x1f\x8b\x08\x00", int(time.time()), 0, 255))
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[: self._block_size]), False)
+            del self._buffer[: self._block_size]
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._submit(bytes(self._buffer), True)
+        self._buffer = bytearray()
+        while self._pending:
+            self._fileobj.write(self._pending.popleft().result())
+        self._executor.shutdown()
+        self._fileobj.write(struct.pack("<II", self._crc, self._size & 0xFFFFFFFF))
+        self._fileobj.close()
+        super().close()
+
+    def _submit(self, block: bytes, last: bool) -> None:
+        self._pending.append(self._executor.submit(self._deflate, block, self._dictionary, last, self._level))
+        self._dictionary = block[-32768:]
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        while len(self._pending) > self._max_pending or (self._pending and self._pending[0].done()):
+            self._fileobj.write(self._pending.popleft().result())
+
+    @staticmethod
+    def _deflate(block: bytes, dictionary: bytes, last: bool, level: int) -> bytes:
+        if dictionary:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class AvZopfliGzipFile(io.RawIOBase):
+    """
+    Writable binary stream which creates a standard gzip file compressed by zopfli.
+    zopfli needs all data at once, so the data is collected in memory and compressed by close().
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        """
+        Initializes a new AvZopfliGzipFile instance.
+
+        Args:
+            fileobj (BinaryIO): binary stream to write the gzip file into, closed by close()
+        """
+        super().__init__()
+        self._fileobj = fileobj
+        self._buffer = io.BytesIO()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        return self._buffer.write(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        import zopfli.gzip  # pylint: disable=import-outside-toplevel  # optional, only needed for this mode
+
+        self._fileobj.write(zopfli.gzip.compress(self._buffer.getvalue()))
+        self._fileobj.close()
+        super().close()
+
+
+class AvSvgWriter:
+    """
+    Writes a tree of svgwrite elements chunk by chunk into a text stream.
+
+    In contrast to svgwrite.Drawing.write() the complete document is neither copied nor
+    created in memory as one string: containers are opened and closed by start_element() and
+    end_element(), so elements of different containers (e.g. layers) can be assembled while
+    writing without adding them to each other. The written elements are not modified.
+    Only leaf elements (e.g. a path) are converted into an ElementTree one at a time,
+    AvSvgElements are written directly.
+
+    Usage:
+        with AvSvgWriter.open(filename, compressed=True) as writer:
+            writer.start_element(drawing)
+            writer.write_element(layer)
+            writer.end_element(drawing)
+    """
+
+    def __init__(self, stream: TextIO, pretty: bool = False, indent: int = 2) -> None:
+        """
+        Initializes a new AvSvgWriter instance.
+
+        Args:
+            stream (TextIO): text stream to write into, e.g. a file opened in text mode
+            pretty (bool, optional): True for easy readable output. Defaults to False.
+            indent (int, optional): Indention if pretty is enabled. Defaults to 2 spaces.
+        """
+        self.stream = stream
+        self.pretty = pretty
+        self.indent = indent
+        self._open_elements: List[SvgElement] = []
+
+    @classmethod
+    def open(
+        cls,
+        filename: str,
+        compressed: Union[bool, Compression] = False,
+        pretty: bool = False,
+        indent: int = 2,
+    ) -> AvSvgWriter:
+        """
+        Open the file _filename_ for writing. Close it by close() or use the writer as context manager.
+
+        Args:
+            filename (str): path and filename
+            compressed (Union[bool, Compression], optional): write a gzip compressed svgz-file
+                using the given compression strategy, True means Compression.BEST. Defaults to False.
+            pretty (bool, optional): True for easy readable output. Defaults to False.
+            indent (int, optional): Indention if pretty is enabled. Defaults to 2 spaces.
+
+        Returns:
+            AvSvgWriter: the writer
+        """
+        if compressed is True:
+            compressed = Compression.BEST
+        if compressed in (Compression.FAST, Compression.BEST):
+            level = 1 if compressed == Compression.FAST else 9
+            stream = gzip.open(filename, "wt", compresslevel=level, encoding="utf-8")
+        elif compressed in (Compression.ZOPFLI, Compression.PARALLEL):
+            fileobj = open(filename, "wb")  # pylint: disable=consider-using-with
+            if compressed == Compression.ZOPFLI:
+                raw: io.RawIOBase = AvZopfliGzipFile(fileobj)
+            else:
+                raw = AvParallelGzipFile(fileobj)
+            stream = io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8")
+        elif not compressed:
+            stream = open(filename, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        else:
+            raise ValueError(f"unknown compression {compressed}")
+        return cls(stream, pretty, indent)
+
+    def close(self) -> None:
+        """Close the underlying stream."""
+        self.stream.close()
+
+    def __enter__(self) -> AvSvgWriter:
+        return self
+
+    def __exit__(self, *_args) -> None:
+        self.close()
+
+    def start_element(self, element: SvgElement) -> None:
+        """
+        Write the start tag and the current subelements of _element_.
+        Further elements can be written into it until end_element() is called.
+        For a svgwrite.Drawing the XML header is written first.
+
+        Args:
+            element (SvgElement): the container element to open
+        """
+        if isinstance(element, svgwrite.Drawing):
+            self.stream.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+            for stylesheet in element._stylesheets:  # pylint: disable=protected-access
+                self.stream.write(
+                    '<?xml-stylesheet href="%s" type="text/css" title="%s" alternate="%s" media="%s"?>\n' % stylesheet
+                )
+        self._write_line(self._start_tag(element) + ">")
+        self._open_elements.append(element)
+        for subelement in element.elements:
+            self.write_element(subelement)
+
+    def end_element(self, element: SvgElement) -> None:
+        """
+        Write the end tag of _element_ which was opened by start_element().
+
+        Args:
+            element (SvgElement): the container element to close
+        """
+        if not self._open_elements or self._open_elements[-1] is not element:
+            raise ValueError(f"element <{element.elementname}> is not the last opened element")
+        self._open_elements.pop()
+        self._write_line(f"</{element.elementname}>")
+        if not self._open_elements and self.pretty:
+            self.stream.write("\n")
+
+    def write_element(self, element: SvgElement) -> None:
+        """
+        Write _element_ and all its subelements.
+
+        Args:
+            element (SvgElement): the element to write
+        """
+        if isinstance(element, AvSvgElement):
+            self._write_line(element.tostring())
+            return
+        if element.elements and type(element).get_xml is svgwrite.base.BaseElement.get_xml:
+            # plain container: stream its subelements one by one
+            self.start_element(element)
+            self.end_element(element)
+            return
+        xml = element.get_xml()
+        if self.pretty:
+            etree.indent(xml, space=" " * self.indent, level=len(self._open_elements))
+        self._write_line(etree.tostring(xml, encoding="unicode"))
+
+    def _write_line(self, text: str) -> None:
+        if self.pretty and (self._open_elements or text.startswith("</")):
+            level = len(self._open_elements)
+            self.stream.write("\n" + " " * (self.indent * level))
+        self.stream.write(text)
+
+    @staticmethod
+    def _start_tag(element: SvgElement) -> str:
+        """Return the start tag of _element_ without the closing ">", using the same attributes as get_xml()."""
+        attribs = dict(element.attribs)
+        if isinstance(element, svgwrite.Drawing):
+            attribs["xmlns"] = "http://www.w3.org/2000/svg"
+            attribs["xmlns:xlink"] = "http://www.w3.org/1999/xlink"
+            attribs["xmlns:ev"] = "http://www.w3.org/2001/xml-events"
+            attribs["baseProfile"] = element.profile
+            attribs["version"] = element.version
+        if element.debug:
+            element.validator.check_all_svg_attribute_values(element.elementname, attribs)
+        tag = "<" + element.elementname
+        for attribute, value in sorted(attribs.items()):
+            if value is not None:
+                value = element.value_to_string(value)
+                if value:  # just add not empty attributes
+                    tag += f' {attribute}="{escape(value, _ATTRIBUTE_ENTITIES)}"'
+        return tag
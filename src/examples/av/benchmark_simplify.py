@@ -0,0 +1,58 @@
+"""Benchmark of the simplification stage after flattening (see av.consts.POLYGONIZE_SIMPLIFY_TOLERANCE):
+vertex reduction and time of the downstream stages (combining contours by shapely, SVG serialization)"""
+
+import sys
+import time
+from typing import Tuple
+
+from fontTools.ttLib import TTFont
+
+import av.consts
+import av.path
+from av.glyph import AvFont
+
+
+def polygonize_font(
+    avfont: AvFont, characters: str, font_size: float, simplify: float, repeat: int = 3
+) -> Tuple[int, float, float]:
+    """Polygonize all _characters_ at _font_size_ with the simplification tolerance _simplify_ (real units).
+    Returns the number of vertices, the best time of _repeat_ runs to polygonize and to serialize."""
+    real_to_units = avfont.units_per_em / font_size
+    scale = 1 / real_to_units
+    outlines = [avfont.glyph(character).outline for character in characters]
+    (polygonize_time, serialize_time) = (float("inf"), float("inf"))
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paths = [
+            av.path.AvSvgPath.polygonize_path_data(outline, simplify_tolerance=simplify * real_to_units)
+            for outline in outlines
+        ]
+        polygonize_time = min(polygonize_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        for path in paths:
+            path.transform([scale, 0, 0, -scale, 0, 0]).to_string()
+        serialize_time = min(serialize_time, time.perf_counter() - start)
+    return (sum(len(path.coords) // 2 for path in paths), polygonize_time, serialize_time)
+
+
+def main():
+    """Main"""
+    font_filename = sys.argv[1] if len(sys.argv) > 1 else "fonts/Petrona-VariableFont_wght.ttf"
+    vb_scale = 1.0 / 150  # viewbox of 150mm scaled to 1
+    avfont = AvFont(TTFont(font_filename))
+    characters = "".join(chr(code) for code in avfont.ttfont.getBestCmap() if 32 < code < 0x250)
+
+    print(f"POLYGONIZE_TYPE {av.consts.POLYGONIZE_TYPE}, {len(characters)} characters of {font_filename}")
+    print("font size | simplify  | vertices        | polygonize       | serialize")
+    for font_size_mm in (3, 30, 300):
+        (vertices, polygonize_time, serialize_time) = polygonize_font(avfont, characters, font_size_mm * vb_scale, 0)
+        for simplify_mm in (0.001, 0.01, 0.05):
+            result = polygonize_font(avfont, characters, font_size_mm * vb_scale, simplify_mm * vb_scale)
+            print(
+                f"{font_size_mm:6} mm | {simplify_mm:6} mm | {vertices:6} -> {result[0]:6} "
+                f"| {polygonize_time:.3f} -> {result[1]:.3f} s | {serialize_time:.3f} -> {result[2]:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """Module to check how to handle the font Petrona"""
 
-# from typing import Dict
+from typing import List
 
 from fontTools.ttLib import TTFont
 
@@ -56,13 +56,13 @@ def main():
         + ',.;:+-*#_<> !"§$%&/()=?{}[]'
     )
 
+    letters: List[AvLetter] = []
     x_pos = 0
     y_pos = 0.8
     for character in text:
         glyph: AvGlyph = avfont_w100.fetch_glyph(character)
         letter = AvLetter(x_pos, y_pos, font_size, glyph)
-        svg_path = svg_page.drawing.path(letter.svg_path_string(), fill="black", stroke="none")
-        svg_page.add(svg_path)
+        letters.append(letter)
         x_pos += letter.width()
 
     x_pos = 0
@@ -70,10 +70,13 @@ def main():
     for character in text:
         glyph: AvGlyph = avfont_w900.fetch_glyph(character)
         letter = AvLetter(x_pos, y_pos, font_size, glyph)
-        svg_path = svg_page.drawing.path(letter.svg_path_string(), fill="black", stroke="none")
-        svg_page.add(svg_path)
+        letters.append(letter)
         x_pos += letter.width()
 
+    # each glyph is stored once in <defs> and each letter references it by <use>
+    # (create the page with flatten_glyphs=True to get one <path> per letter instead)
+    svg_page.add_letters(letters, dpi=300, fill="black", stroke="none")
+
     # Save the SVG file
     print(f"save file {output_filename} ...")
     svg_page.save_as(output_filename, include_debug_layer=True, pretty=True, indent=2, compressed=True)
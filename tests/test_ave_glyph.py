@@ -0,0 +1,125 @@
+"""Unittests for module ave.glyph"""
+
+import unittest
+from unittest import mock
+
+from test_ave_page import build_test_font
+
+from ave.fonttools import AvPathDataPen
+from ave.glyph import AvFont, AvGlyph, AvGlyphFactory, AvLetter, AvPolygonizedGlyph, AvPolygonizedGlyphFactory
+from ave.svgpath import AvPathData
+
+
+class TestAvPolygonizedGlyph(unittest.TestCase):
+    """Test class for class AvPolygonizedGlyph"""
+
+    def setUp(self):
+        self.font = AvFont(build_test_font(), AvPolygonizedGlyphFactory())
+
+    def test_polygonized_path(self):
+        """Test that the polygon with its hole, bounding box, area and outline are derived from the glyph"""
+        glyph = self.font.fetch_glyph("A")
+        self.assertIsInstance(glyph, AvPolygonizedGlyph)
+        polygon = glyph.polygonized_path()
+        self.assertEqual(len(polygon.geoms), 1)
+        self.assertEqual(len(polygon.geoms[0].interiors), 1)
+        self.assertTrue(polygon.geoms[0].exterior.is_ccw)
+        self.assertAlmostEqual(glyph.area(), 800 * 800 - 400 * 400)
+        box = glyph.bounding_box()
+        self.assertEqual((box.xmin, box.ymin, box.xmax, box.ymax), (100, 0, 900, 800))
+        self.assertEqual(glyph.svg_path_string().count("M"), 2)
+        self.assertEqual(glyph.width(), 1000)
+
+    def test_cached_per_font(self):
+        """Test that a glyph is polygonized once per font, independent of the number of letters"""
+        glyph = self.font.fetch_glyph("A")
+        polygon = glyph.polygonized_path()
+        letters = [AvLetter(index, 0, 10, self.font.fetch_glyph("A")) for index in range(3)]
+        self.assertTrue(all(letter.glyph is glyph for letter in letters))
+        self.assertIs(glyph.polygonized_path(), polygon)
+        self.assertEqual(len(AvLetter.svg_path_strings(letters)), 3)
+
+    def test_empty_glyph(self):
+        """Test that an empty glyph (space) results in an empty polygon and "M0 0" """
+        glyph = self.font.fetch_glyph(" ")
+        self.assertTrue(glyph.polygonized_path().is_empty)
+        self.assertEqual(glyph.svg_path_string(), "M0 0")
+        self.assertEqual(glyph.bounding_box().xmax, 300)
+
+
+class TestAvFont(unittest.TestCase):
+    """Test class for class AvFont"""
+
+    def test_fetch_glyphs(self):
+        """Test that outlines read together from the glyf table equal the ones recorded by a pen"""
+        font = AvFont(build_test_font(), AvGlyphFactory())
+        glyphs = font.fetch_glyphs("AxA ")
+        self.assertIs(glyphs[0], glyphs[2])
+        self.assertIs(glyphs[1], font.fetch_glyph("x"))
+        expected = AvFont(build_test_font(), AvGlyphFactory())
+        for glyph in glyphs:
+            self.assertEqual(glyph.svg_path_string(), expected.fetch_glyph(glyph.character).svg_path_string())
+        self.assertEqual(glyphs[3].svg_path_string(), "M0 0")
+
+    def test_fetch_glyphs_by_factory(self):
+        """Test that the glyphs are created by the factory, i.e. with the outline read by AvGlyphFactory
+        or with the outline of other glyph classes"""
+        with mock.patch.object(AvPathDataPen, "path_data") as path_data:
+            glyph = AvFont(build_test_font(), AvGlyphFactory()).fetch_glyphs("A")[0]
+            self.assertEqual(
+                glyph.outline().to_string(), "M100 0 L900 0 L900 800 L100 800 Z M300 200 L300 600 L700 600 L700 200 Z"
+            )
+            path_data.assert_not_called()
+
+        class SquareGlyph(AvGlyph):
+            """Glyph with its own outline"""
+
+            def outline(self) -> AvPathData:
+                return AvPathData.from_string("M 0 0 L 1 0 L 1 1 Z")
+
+        class SquareGlyphFactory(AvGlyphFactory):
+            """Factory of SquareGlyphs"""
+
+            def create_glyph(self, font, character, outline=None):
+                return SquareGlyph(font, character)
+
+        glyph = AvFont(build_test_font(), SquareGlyphFactory()).fetch_glyphs("A")[0]
+        self.assertIsInstance(glyph, SquareGlyph)
+        self.assertEqual(glyph.svg_path_string(), "M0 0 L1 0 L1 1 Z")
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    """Test class for the flattened outlines at several levels of detail"""
+
+    def setUp(self):
+        self.font = AvFont(build_test_font(), AvGlyphFactory())
+        self.glyph = self.font.fetch_glyph("A")
+        self.glyph._outline = AvPathData.from_string("M 0 0 Q 500 1000 1000 0 Z")  # curved outline
+
+    def test_level_by_letter_size(self):
+        """Test that small letters get coarser outlines with less points than big letters"""
+        small = AvLetter(0, 0, 3 / 150, self.glyph)
+        big = AvLetter(0, 0, 100 / 150, self.glyph)
+        self.assertEqual(AvLetter(0, 0, 3.5 / 150, self.glyph).level_of_detail, small.level_of_detail)
+        self.assertGreater(small.level_of_detail, big.level_of_detail)
+        self.assertLessEqual(2.0**small.level_of_detail, 0.01 / 3 * 1000)
+        self.assertLess(len(small.flattened_outline().coords), len(big.flattened_outline().coords))
+        self.assertEqual(big.svg_path_string(flatten=True), big.flattened_outline().to_string())
+        (small_string, big_string) = (small.flattened_outline().to_string(), big.flattened_outline().to_string())
+        self.assertEqual(
+            AvLetter.svg_path_strings([small, big, small], flatten=True), [small_string, big_string, small_string]
+        )
+
+    def test_cache_eviction(self):
+        """Test that the outlines of the least recently used levels are dropped"""
+        with mock.patch("ave.consts.LOD_CACHE_SIZE", 2):
+            outline = self.glyph.flattened_outline(3)
+            self.glyph.flattened_outline(4)
+            self.assertIs(self.glyph.flattened_outline(3), outline)
+            self.glyph.flattened_outline(5)
+            self.assertEqual(list(self.glyph._flattened_outlines), [3, 5])
+            self.assertIs(self.glyph.flattened_outline(3), outline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Unittests for module ave.page"""
+
+import gzip
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as etree
+from unittest import mock
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import TTFont
+
+from ave.glyph import AvFont, AvGlyphFactory, AvLetter
+from ave.page import AvSvgPage
+from ave.svgpath import AvPathSerializer
+
+
+def build_test_font() -> TTFont:
+    """Build a small TrueType font with the glyph "A" (square with a hole, also mapped to "H" and "x")
+    and " " (empty)"""
+    pen = TTGlyphPen(None)
+    for contour in (((100, 0), (900, 0), (900, 800), (100, 800)), ((300, 200), (300, 600), (700, 600), (700, 200))):
+        pen.moveTo(contour[0])
+        for point in contour[1:]:
+            pen.lineTo(point)
+        pen.closePath()
+    glyph_a = pen.glyph()
+    empty = TTGlyphPen(None).glyph()
+
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder([".notdef", "A", "space"])
+    builder.setupCharacterMap({ord("A"): "A", ord("H"): "A", ord("x"): "A", ord(" "): "space"})
+    builder.setupGlyf({".notdef": empty, "A": glyph_a, "space": empty})
+    builder.setupHorizontalMetrics({".notdef": (500, 0), "A": (1000, 100), "space": (300, 0)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupOS2(sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupPost()
+    return builder.font
+
+
+class TestAvSvgPage(unittest.TestCase):
+    """Test class for class AvSvgPage"""
+
+    def setUp(self):
+        self.font = AvFont(build_test_font(), AvGlyphFactory())
+        glyph = self.font.fetch_glyph("A")
+        self.letters = [AvLetter(0.1 * index, 0.5, 0.01, glyph) for index in range(3)]
+
+    def test_letters_reference_glyph_defs(self):
+        """Test that a glyph used by several letters is defined once and referenced by <use>"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150)
+        page.add_letters(self.letters, fill="black")
+        defs = page.drawing.defs.tostring()
+        svg = page.main_layer.tostring()
+        self.assertEqual(defs.count("<path "), 1)
+        self.assertIn('id="glyph0"', defs)
+        self.assertEqual(svg.count('xlink:href="#glyph0"'), 3)
+        self.assertIn('transform="matrix(1e-05 0 0 1e-05 0.2 0.5)"', svg)
+
+    def test_glyph_defs_precision_of_biggest_letter(self):
+        """Test that the glyph definition is replaced with more decimals if a bigger letter references it"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150)
+        glyph = self.font.fetch_glyph("A")
+        with mock.patch.object(
+            AvPathSerializer,
+            "serialize",
+            autospec=True,
+            side_effect=lambda serializer, path: f"M0 {serializer.decimals}",
+        ):
+            page.add_letters([AvLetter(0, 0, 0.01, glyph), AvLetter(0, 0, 10, glyph)], fill="black")  # 0, 2 decimals
+            page.add_letters([AvLetter(0, 0, 1, glyph)], fill="black")  # 1 decimal
+        defs = page.drawing.defs.tostring()
+        self.assertEqual(defs.count("<path "), 1)
+        self.assertIn('d="M0 2"', defs)
+        self.assertEqual(page.main_layer.tostring().count('xlink:href="#glyph0"'), 3)
+
+    def test_drawing_is_validated(self):
+        """Test that svgwrite elements created by the drawing are still validated"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150)
+        with self.assertRaises(TypeError):
+            page.drawing.rect(insert=(0, 0), size=(1, 1), fill_opacity="opaque")
+
+    def test_flatten_glyphs(self):
+        """Test that letters are added as separate paths if flatten_glyphs is set"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150, flatten_glyphs=True)
+        page.add_letters(self.letters, fill="black")
+        svg = page.main_layer.tostring()
+        self.assertNotIn("<path ", page.drawing.defs.tostring())
+        self.assertNotIn("<use ", svg)
+        self.assertEqual(svg.count("<path "), 3)
+
+        page.add_letters(self.letters, join_paths=True, fill="black")
+        self.assertEqual(page.main_layer.tostring().count("<path "), 4)
+        self.assertEqual(page.main_layer.elements[-1].attribs[0][1].count("M"), 6)  # 3 letters with 2 contours
+
+    def test_save_as_keeps_page_unchanged(self):
+        """Test that a page can be saved several times, with and without debug layer"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150)
+        page.add_letters(self.letters, fill="black")
+        page.add(page.drawing.path("M0 0 1 1", stroke="red"), True)
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ("a.svg", "b.svgz", "c.svg")]
+            page.save_as(filenames[0], include_debug_layer=True, pretty=True)
+            page.save_as(filenames[1], include_debug_layer=False, compressed=True)
+            page.save_as(filenames[2], include_debug_layer=True)
+            trees = [etree.parse(filename) for filename in filenames[::2]]
+            with gzip.open(filenames[1]) as svgz_file:
+                without_debug = etree.parse(svgz_file)
+
+        self.assertEqual(*[etree.canonicalize(etree.tostring(tree.getroot()), strip_text=True) for tree in trees])
+        namespaces = {"svg": "http://www.w3.org/2000/svg"}
+        self.assertEqual(len(trees[0].findall("svg:g/svg:g", namespaces)), 2)  # root group with debug and main
+        self.assertEqual(len(without_debug.findall("svg:g/svg:g", namespaces)), 1)
+        self.assertEqual(len(trees[0].findall(".//svg:use", namespaces)), 3)
+        self.assertEqual(len(page.root_group.elements), 0)
+        self.assertEqual(len(page.drawing.elements), 1)  # just <defs>
+
+    def test_lightweight_and_svgwrite_elements(self):
+        """Test that lightweight elements and svgwrite elements can be mixed"""
+        page = AvSvgPage.create_page_a4(150, 150, 1.0 / 150)
+        page.add(page.path("M0 0 1 1", fill="black", stroke_width=0.5, class_=None))
+        page.add(page.drawing.path("M1 1 2 2", fill="red"))
+        self.assertEqual(
+            page.main_layer.elements[0].tostring(), '<path d="M0 0 1 1" fill="black" stroke-width="0.5" />'
+        )
+        self.assertEqual(page.main_layer.tostring().count("<path "), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Unittests for module av.coverage"""
+
+import unittest
+
+import numpy
+
+from av.coverage import HelperCoverage
+
+
+class TestHelperCoverage(unittest.TestCase):
+    """Test class for class HelperCoverage"""
+
+    SQUARE_WITH_HOLE = [numpy.array([[0, 0], [0, 8], [8, 8], [8, 0]]), numpy.array([[2, 2], [6, 2], [6, 6], [2, 6]])]
+    TRIANGLE = [numpy.array([[0, 0], [10, 0], [0, 10]])]
+
+    def test_scanline_coverages(self):
+        """Test that all glyphs are filled at once by the nonzero winding rule and clipped by their boxes"""
+        coverages = HelperCoverage.scanline_coverages(
+            [self.SQUARE_WITH_HOLE, self.SQUARE_WITH_HOLE, [], self.TRIANGLE],
+            [[0, 0, 8, 8], [4, -8, 12, 8], [0, 0, 1, 1], [0, 0, 10, 0]],
+            rows=16,
+        )
+        numpy.testing.assert_allclose(coverages, [48 / 64, 24 / 128, 0, 0])
+
+    def test_error_decreases_with_rows(self):
+        """Test that the estimation converges to the exact coverage with the number of scanlines"""
+        angles = numpy.linspace(0, 2 * numpy.pi, 100, endpoint=False)
+        circle = numpy.column_stack((numpy.cos(angles), numpy.sin(angles)))
+        area = 0.5 * numpy.sum(
+            circle[:, 0] * numpy.roll(circle[:, 1], -1) - numpy.roll(circle[:, 0], -1) * circle[:, 1]
+        )
+        errors = [
+            abs(HelperCoverage.scanline_coverages([[circle]], [[-1, -1, 1, 1]], rows)[0] - area / 4)
+            for rows in (4, 16, 64)
+        ]
+        self.assertLess(errors[1], errors[0])
+        self.assertLess(errors[2], errors[1])
+        self.assertLess(errors[2], 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Unittests for module ave.fontcache"""
+
+import os
+import tempfile
+import unittest
+
+import numpy
+from test_ave_page import build_test_font
+
+from ave.fontcache import AvFontCache, AvFontCacheGlyphFactory
+from ave.glyph import AvFont, AvPolygonizedGlyph
+
+
+class TestAvFontCache(unittest.TestCase):
+    """Test class for class AvFontCache"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.font_filename = os.path.join(self.directory.name, "test.ttf")
+        build_test_font().save(self.font_filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_precompile_and_load(self):
+        """Test that the glyphs polygonized by worker processes are written and memory-mapped again"""
+        cache_filename = os.path.join(self.directory.name, "test.avfc")
+        for max_workers in (1, 2):
+            AvFontCache.precompile(self.font_filename, cache_filename, steps=4, max_workers=max_workers)
+            font_cache = AvFontCache.load(cache_filename)
+            self.assertEqual(font_cache.characters, [" ", "A", "H", "x"])
+            self.assertIsInstance(font_cache.arrays["points"], numpy.memmap)
+            self.assertEqual(font_cache.steps, 4)
+            self.assertEqual([len(ring) for ring in font_cache.rings("A")], [4, 4])
+            self.assertEqual(font_cache.rings(" "), [])
+            self.assertEqual(font_cache.advance_width(" "), 300)
+            box = font_cache.bounding_box("H")
+            self.assertEqual((box.xmin, box.ymin, box.xmax, box.ymax), (100, 0, 900, 800))
+            expected = AvPolygonizedGlyph(build_test_font(), "A", steps=4).polygonized_path()
+            self.assertTrue(font_cache.polygonized_path("A").equals(expected))
+
+    def test_glyph_factory(self):
+        """Test that the glyphs of a font cache are used without polygonizing them again"""
+        cache_filename = os.path.join(self.directory.name, "test.avfc")
+        font_cache = AvFontCache.precompile(self.font_filename, cache_filename, max_workers=1)
+        font = AvFont(build_test_font(), AvFontCacheGlyphFactory(font_cache))
+        glyph = font.fetch_glyph("x")
+        self.assertIsNotNone(glyph._polygonized_path)  # pylint: disable=protected-access
+        self.assertAlmostEqual(glyph.area(), 800 * 800 - 400 * 400)
+        self.assertEqual(font.fetch_glyph(" ").svg_path_string(), "M0 0")
+
+    def test_invalid_file(self):
+        """Test that other files are rejected"""
+        with self.assertRaises(ValueError):
+            AvFontCache.load(self.font_filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
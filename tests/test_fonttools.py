@@ -0,0 +1,158 @@
+"""Unittests for the pens of module ave.fonttools"""
+
+import unittest
+from types import SimpleNamespace
+
+import numpy
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from ave.fonttools import AvContourPen, AvPathDataPen, AvPolylinePen, FontHelper
+
+
+class TestFontHelper(unittest.TestCase):
+    """Test class for class FontHelper"""
+
+    def test_glyf_path_data(self):
+        """Test that outlines read from the glyf table equal the outlines recorded by a pen"""
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.qCurveTo((100, 0), (100, 100), (0, 101))  # implied on-curve point (100, 50)
+        pen.lineTo((0, 50))
+        pen.closePath()
+        pen.moveTo((20, 20))
+        pen.lineTo((30, 20))
+        pen.qCurveTo((30, 30), (21, 30))
+        pen.closePath()
+        curves = pen.glyph()
+        curves.coordinates.array[:10] = curves.coordinates.array[2:10] + curves.coordinates.array[:2]
+        curves.flags[:5] = curves.flags[1:5] + curves.flags[:1]  # first contour starts with an off-curve point
+        pen = TTGlyphPen({"curves": curves})
+        pen.addComponent("curves", (1, 0, 0, 1, 7, 3))
+        pen.addComponent("curves", (-1, 0, 0, 1, 0, 0))
+        composite = pen.glyph()
+
+        builder = FontBuilder(1000, isTTF=True)
+        builder.setupGlyphOrder([".notdef", "curves", "composite"])
+        builder.setupGlyf({".notdef": TTGlyphPen(None).glyph(), "curves": curves, "composite": composite})
+        builder.setupHorizontalMetrics({".notdef": (500, 0), "curves": (500, 0), "composite": (500, -100)})
+        glyph_set = builder.font.getGlyphSet()
+
+        batch = FontHelper.glyf_path_data_batch(glyph_set, [".notdef", "curves", "composite"])
+        self.assertEqual(len(batch.item(0).commands), 0)
+        for index, glyph_name in ((1, "curves"), (2, "composite")):
+            pen = AvPathDataPen(glyph_set)
+            glyph_set[glyph_name].draw(pen)
+            self.assertEqual(batch.item(index).to_string(), pen.path_data().to_string())
+            self.assertEqual(FontHelper.glyf_path_data(glyph_set, glyph_name).to_string(), pen.path_data().to_string())
+        self.assertTrue(batch.item(1).to_string().startswith("M0 101 L0 50 L0 0 Q100 0 100 50 Q100 100 0 101 Z M20 20"))
+        self.assertIsNone(FontHelper.glyf_path_data({}, "curves"))
+
+
+class TestAvPathDataPen(unittest.TestCase):
+    """Test class for class AvPathDataPen"""
+
+    def test_record_outline(self):
+        """Test that lines, curves and implied on-curve points are recorded as absolute commands"""
+        pen = AvPathDataPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((10, 0))
+        pen.qCurveTo((20, 0), (20, 20), (10, 20))  # implied on-curve point (20, 10)
+        pen.curveTo((5, 20), (0, 15), (0, 10))
+        pen.closePath()
+        path = pen.path_data()
+        self.assertEqual(path.to_string(), "M0 0 L10 0 Q20 0 20 10 Q20 20 10 20 C5 20 0 15 0 10 Z")
+        self.assertEqual(list(path.contour_starts), [0])
+
+    def test_empty_outline(self):
+        """Test that an empty outline (e.g. of a space) results in "M0 0" """
+        self.assertEqual(AvPathDataPen(None).path_data().to_string(), "M0 0")
+
+
+class TestAvPolylinePen(unittest.TestCase):
+    """Test class for class AvPolylinePen"""
+
+    def test_flatten_outline(self):
+        """Test that curves are replaced by _steps_ points evaluated at t = 1/steps, ..., 1"""
+        pen = AvPolylinePen(None, steps=4)
+        pen.moveTo((0, 0))
+        pen.qCurveTo((20, 0), (20, 20))
+        pen.curveTo((10, 20), (0, 10), (0, 0))
+        pen.closePath()
+        pen.moveTo((5, 5))
+        pen.lineTo((6, 6))
+        pen.endPath()
+
+        expected = [(0, 0)]
+        for t in (0.25, 0.5, 0.75, 1.0):  # quadratic (0, 0), (20, 0), (20, 20)
+            expected.append((2 * (1 - t) * t * 20 + t**2 * 20, t**2 * 20))
+        for t in (0.25, 0.5, 0.75, 1.0):  # cubic (20, 20), (10, 20), (0, 10), (0, 0)
+            x = (1 - t) ** 3 * 20 + 3 * (1 - t) ** 2 * t * 10
+            y = (1 - t) ** 3 * 20 + 3 * (1 - t) ** 2 * t * 20 + 3 * (1 - t) * t**2 * 10
+            expected.append((x, y))
+        numpy.testing.assert_allclose(pen.points, expected + [(5, 5), (6, 6)])
+        self.assertEqual(list(pen.contour_starts), [0, 9])
+        self.assertEqual([len(polyline) for polyline in pen.polylines()], [9, 2])
+
+        recording = pen.recording_pen.value
+        self.assertEqual([command for (command, _) in recording].count("lineTo"), 9)
+        self.assertEqual(recording[9], ("closePath", ()))
+        self.assertEqual(recording[-1], ("endPath", ()))
+
+    def test_flatten_glyphs(self):
+        """Test that flattening many glyphs at once equals flattening each glyph by its own pen"""
+
+        def draw_square(pen):
+            pen.moveTo((0, 0))
+            pen.lineTo((10, 0))
+            pen.qCurveTo((10, 10), (0, 10))
+            pen.closePath()
+
+        glyph_set = {
+            "square": SimpleNamespace(draw=draw_square),
+            "space": SimpleNamespace(draw=lambda pen: None),
+            "two": SimpleNamespace(draw=lambda pen: (draw_square(pen), draw_square(pen))),
+        }
+        flattened = AvPolylinePen.flatten_glyphs(glyph_set, steps=3)
+        self.assertEqual([len(polylines) for polylines in flattened.values()], [1, 0, 2])
+        pen = AvPolylinePen(glyph_set, steps=3)
+        draw_square(pen)
+        for polyline in flattened["square"] + flattened["two"]:
+            numpy.testing.assert_array_equal(polyline, pen.points)
+
+    def test_empty_outline(self):
+        """Test that an empty outline results in no points"""
+        pen = AvPolylinePen(None)
+        self.assertEqual(pen.points.shape, (0, 2))
+        self.assertEqual(pen.polylines(), [])
+        self.assertEqual(pen.recording_pen.value, [])
+
+
+class TestAvContourPen(unittest.TestCase):
+    """Test class for class AvContourPen"""
+
+    def test_contours_and_orientation(self):
+        """Test that closed contours with their orientation are created and degenerated ones are skipped"""
+        pen = AvContourPen(None, affine_trafo=[2, 0, 0, 2, 1, 0])
+        for contour in (((0, 0), (10, 0), (10, 10), (0, 10)), ((2, 2), (2, 8), (8, 8), (8, 2)), ((20, 20), (30, 30))):
+            pen.moveTo(contour[0])
+            for point in contour[1:]:
+                pen.lineTo(point)
+            pen.closePath()
+        contours = pen.contours()
+        self.assertEqual(len(contours), 2)
+        numpy.testing.assert_allclose(contours[0], [[1, 0], [21, 0], [21, 20], [1, 20]])
+        numpy.testing.assert_allclose(pen.signed_areas(), [400, -144])
+
+    def test_tolerance(self):
+        """Test that curves are flattened according to the given tolerance"""
+        pen = AvContourPen(None, tolerance=0.5)
+        pen.moveTo((0, 0))
+        pen.qCurveTo((10, 10), (20, 0))
+        pen.closePath()
+        self.assertEqual(len(pen.contours()[0]), 1 + 4)  # ceil(sqrt(40 / 4)) steps
+        self.assertLess(pen.signed_areas()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Unittests for module av.glyph"""
+
+import unittest
+from unittest import mock
+
+import numpy
+
+from test_ave_page import build_test_font
+
+import av.consts
+from av.glyph import AvFont
+
+
+class TestAvGlyph(unittest.TestCase):
+    """Test class for class AvGlyph"""
+
+    def test_curves_output(self):
+        """Test that the output keeps the native outline and polygons are only created when needed"""
+        glyph = AvFont(build_test_font()).glyph("A")
+        with mock.patch("av.consts.OUTPUT_TYPE", av.consts.Output.CURVES):
+            self.assertEqual(
+                glyph.real_path_string(1, 2, 1000), glyph.outline.transform([1, 0, 0, -1, 1, 2]).to_string()
+            )
+            self.assertIsNone(glyph._polygonized_path)  # pylint: disable=protected-access
+            self.assertAlmostEqual(glyph.area_coverage(800, -200, 1000), (640000 - 160000) / 1000000)
+            self.assertIsNotNone(glyph._polygonized_path)  # pylint: disable=protected-access
+
+    def test_polygonized_output(self):
+        """Test that the default output is polygonized"""
+        glyph = AvFont(build_test_font()).glyph("A")
+        self.assertEqual(glyph.real_path_string(0, 0, 1000), glyph.real_polygonized_path_string(0, 0, 1000))
+        self.assertEqual(AvFont(build_test_font()).glyph(" ").polygonized_path_string, "M0 0")
+
+    def test_simplify_per_font_size(self):
+        """Test that the simplification tolerance is applied in real units, i.e. per font size"""
+        glyph = AvFont(build_test_font()).glyph("A")
+        with mock.patch("av.consts.POLYGONIZE_SIMPLIFY_TOLERANCE", 0.001):
+            self.assertIsNot(glyph.polygonized_path_at(1), glyph.polygonized_path)
+            self.assertIs(glyph.polygonized_path_at(1), glyph.polygonized_path_at(1))
+        self.assertIs(glyph.polygonized_path_at(1), glyph.polygonized_path)
+
+    def test_polygonize_per_level_of_detail(self):
+        """Test that similar font sizes share the polygonized outline and only a few levels are kept"""
+        font = AvFont(build_test_font())
+        glyph = font.glyph("A")
+        with mock.patch("av.consts.POLYGONIZE_TYPE", av.consts.Polygonize.BY_TOLERANCE), mock.patch(
+            "av.consts.POLYGONIZE_LOD_CACHE_SIZE", 2
+        ):
+            self.assertIs(glyph.polygonized_path_at(0.1), glyph.polygonized_path_at(0.1001))
+            for font_size in (0.2, 0.4, 0.8):
+                glyph.polygonized_path_at(font_size)
+            lods = list(glyph._polygonized_paths_by_lod)  # pylint: disable=protected-access
+            self.assertEqual(lods, [font.level_of_detail(0.4), font.level_of_detail(0.8)])
+
+    def test_polygonize_glyphs(self):
+        """Test that the glyphs of a text are polygonized in one batch like one after the other"""
+        font = AvFont(build_test_font())
+        font.polygonize_glyphs("A x")
+        glyph = font.glyph("x")
+        self.assertIsNotNone(glyph._polygonized_path)  # pylint: disable=protected-access
+        self.assertEqual(glyph.polygonized_path_string, AvFont(build_test_font()).glyph("x").polygonized_path_string)
+        self.assertEqual(font.glyph(" ").polygonized_path_string, "M0 0")
+        with mock.patch("av.consts.POLYGONIZE_SIMPLIFY_TOLERANCE", 0.001):
+            font.polygonize_glyphs("Ax", 1)
+            lod = font.level_of_detail(1)
+            self.assertIn(lod, glyph._polygonized_paths_by_lod)  # pylint: disable=protected-access
+            self.assertIs(
+                glyph.polygonized_path_at(1), glyph._polygonized_paths_by_lod[lod]
+            )  # pylint: disable=protected-access
+
+    def test_area_coverages(self):
+        """Test that the area coverage is independent of the font size and calculated once per glyph"""
+        font = AvFont(build_test_font())
+        coverage = (640000 - 160000) / 1000000
+        numpy.testing.assert_allclose(font.area_coverages("A x", 800, -200), [coverage, 0, coverage])
+        with mock.patch("av.path.AvPathPolygon.add_polygon_arrays_batch") as add_polygon_arrays_batch:
+            self.assertAlmostEqual(font.glyph("x").area_coverage(800, -200, 0.01), coverage)
+            self.assertAlmostEqual(font.glyph("A").area_coverage(800, -200, 1000), coverage)
+            add_polygon_arrays_batch.assert_not_called()
+        self.assertAlmostEqual(font.glyph("A").area_coverage(400, -400, 1000), (400000 - 120000) / 1000000)
+
+    def test_raster_area_coverages(self):
+        """Test that the estimated area coverages of several fonts are calculated at once with their errors"""
+        fonts = [AvFont(build_test_font()), AvFont(build_test_font())]
+        coverages = AvFont.area_coverages_of(fonts, "A ", [(800, -200), (400, -400)], av.consts.Coverage.RASTER)
+        numpy.testing.assert_allclose(coverages, [[0.48, 0], [0.28, 0]], atol=0.01)
+        self.assertEqual(fonts[1].glyph("A").area_coverage(400, -400, 1, av.consts.Coverage.RASTER), coverages[1, 0])
+        with mock.patch("av.consts.COVERAGE_TYPE", av.consts.Coverage.RASTER):
+            self.assertEqual(fonts[0].glyph("A").area_coverage(800, -200, 1), coverages[0, 0])
+        errors = AvFont.area_coverage_errors(fonts, "A ", [(800, -200), (400, -400)])
+        numpy.testing.assert_allclose(errors, coverages - [[0.48, 0], [0.28, 0]], atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Unittests for module av.path"""
+
+import math
+import re
+import unittest
+from unittest import mock
+
+import numpy
+import shapely
+import svgpathtools
+
+import av.consts
+from av.path import AvPathPolygon, AvSvgPath
+from ave.fonttools import AvContourPen
+from ave.svgpath import AvPathData, AvPathSerializer
+
+
+class TestPolygonizeByAngle(unittest.TestCase):
+    """Test class for the polygonization by the angle between tangents"""
+
+    PATH_STRING = "M 0 0 Q 50 100 100 0 C 100 -50 50 -50 50 0 C 50 0 60 10 70 0 L 80 0 Q 80 0 90 10 Z"
+
+    def test_same_points_as_svgpathtools(self):
+        """Test that the vectorized refinement returns the same points as the one using svgpathtools segments"""
+        for max_angle_degree, max_steps in ((5, 9), (2, 4), (30, 9)):
+            expected = [[0.0, 0.0]]
+            for segment in svgpathtools.parse_path(self.PATH_STRING):
+                if isinstance(segment, svgpathtools.Line):
+                    expected.append([segment.end.real, segment.end.imag])
+                else:
+                    points = AvPathPolygon.polygonize_by_angle(segment, max_angle_degree, max_steps)
+                    expected.extend(numpy.array(re.findall(r"L([^,]+),([^L]+)", points), dtype=float).tolist())
+            expected = expected[:-1]  # closing line back to the start point
+            polylines = AvPathData.from_string(self.PATH_STRING).polygonize(
+                max_angle_degree=max_angle_degree, max_steps=max_steps
+            )
+            self.assertEqual(len(polylines), 1)
+            numpy.testing.assert_allclose(polylines[0], expected, atol=1e-3)
+
+    def test_straight_curve(self):
+        """Test that a straight curve is not refined"""
+        polyline = AvPathData.from_string("M 0 0 C 1 1 2 2 3 3").polygonize(max_angle_degree=5)[0]
+        numpy.testing.assert_allclose(polyline, [[0, 0], [1.5, 1.5], [3, 3]])
+
+
+class TestAvPathPolygon(unittest.TestCase):
+    """Test class for class AvPathPolygon"""
+
+    def test_add_path_string(self):
+        """Test that inner contours with opposite orientation are subtracted"""
+        polygon = AvPathPolygon()
+        polygon.add_path_string("M 0 0 L 10 0 L 10 10 L 0 10 Z M 2 2 L 2 8 L 8 8 L 8 2 Z M 20 0 h 1 v 1 h -1 z")
+        self.assertAlmostEqual(polygon.multipolygon.area, 100 - 36 + 1)
+        self.assertEqual(len(AvSvgPath.polygonize_svg_path_string("M 0 0 L 10 0 L 10 10 Z").split("M")), 2)
+
+    def test_add_path_string_with_smooth_curves_and_arcs(self):
+        """Test that smooth curves and arcs are flattened before the contours are added"""
+        for path_string, expected_area in (
+            ("M 0 0 C 1 1 2 1 3 0 S 5 -1 6 0 Z", 1.5),  # two loops of opposite orientation
+            ("M 0 0 Q 1 2 2 0 T 4 0 L 4 -2 L 0 -2 Z", 8),
+            ("M 0 0 L 10 0 A 5 5 0 0 1 0 0 Z", math.pi * 25 / 2),
+        ):
+            polygon = AvPathPolygon()
+            polygon.add_path_string(path_string)
+            self.assertAlmostEqual(polygon.multipolygon.area, expected_area, delta=0.02 * expected_area)
+
+    def test_smooth_curves_by_tolerance(self):
+        """Test that smooth curves are polygonized by segments also if the type of polygonization is BY_TOLERANCE"""
+        path_string = "M 0 0 C 1 1 2 1 3 0 S 5 -1 6 0 Z M 0 5 Q 1 6 2 5 T 4 5 Z"
+        expected = AvSvgPath.polygonize_svg_path_string(path_string)
+        with mock.patch("av.consts.POLYGONIZE_TYPE", av.consts.Polygonize.BY_TOLERANCE):
+            self.assertEqual(AvSvgPath.polygonize_svg_path_string(path_string), expected)
+
+    def test_simplify(self):
+        """Test that nearly collinear points are removed and holes are kept"""
+        path = AvPathData.from_string("M 0 0 L 5 0.01 L 10 0 L 10 10 L 0 10 Z M 2 2 L 2 5 L 2.01 8 L 8 8 L 8 2 Z")
+        polygonized = AvSvgPath.polygonize_path_data(path, simplify_tolerance=0.1)
+        self.assertEqual(len(polygonized.coords) // 2, 2 * 4)  # two rings with 4 corners
+        polygon = AvPathPolygon()
+        polygon.add_path_string(polygonized.to_string())
+        self.assertAlmostEqual(polygon.multipolygon.area, 100 - 36, places=1)
+        self.assertEqual(len(AvSvgPath.polygonize_path_data(path).coords) // 2, 2 * 5)
+
+    def test_simplify_collapsed_contour(self):
+        """Test that contours collapsing by the simplification are dropped instead of kept as empty parts"""
+        pen = AvContourPen(None, 1)
+        AvPathData.from_string(
+            "M 0 0 L 10 0 L 10 10 L 0 10 Z M 2 2 L 2 8 L 8 8 L 8 2 Z M 20 0 h 0.2 v 0.2 h -0.2 z"
+        ).draw(pen)
+        for signed_areas in (pen.signed_areas(), None):
+            polygon = AvPathPolygon()
+            polygon.add_polygon_arrays(pen.contours(), signed_areas, simplify_tolerance=0.5)
+            parts = shapely.get_parts(polygon.multipolygon)
+            self.assertEqual(len(parts), 1)
+            self.assertFalse(any(shapely.is_empty(parts)))
+            self.assertAlmostEqual(polygon.multipolygon.area, 100 - 36)
+        dot = AvPathPolygon()
+        dot.add_polygon_arrays(pen.contours()[2:], simplify_tolerance=0.5)
+        self.assertTrue(dot.multipolygon.is_empty)
+
+    def test_assemble_nested_polygons(self):
+        """Test that nested contours are assembled in one pass like by union and difference"""
+        nested = (
+            "M 0 0 L 10 0 L 10 10 L 0 10 Z M 1 1 L 1 9 L 9 9 L 9 1 Z M 2 2 L 4 2 L 4 4 L 2 4 Z M 20 0 h 1 v 1 h -1 z"
+        )
+        overlapping = "M 0 0 L 10 0 L 10 10 L 0 10 Z M -5 4 L 15 4 L 15 6 L -5 6 Z"
+        pens = [AvContourPen(None, 1) for _ in range(2)]
+        AvPathData.from_string(nested).draw(pens[0])
+        AvPathData.from_string(overlapping).draw(pens[1])
+        polygons = [AvPathPolygon() for _ in pens]
+        with mock.patch.object(
+            AvPathPolygon, "add_polygons", autospec=True, side_effect=AvPathPolygon.add_polygons
+        ) as combine:
+            AvPathPolygon.add_polygon_arrays_batch(polygons, [pen.contours() for pen in pens])
+            self.assertEqual([call.args[0] for call in combine.call_args_list], [polygons[1]])
+        for polygon, path_string, expected_area in zip(polygons, (nested, overlapping), (100 - 64 + 4 + 1, 120)):
+            self.assertAlmostEqual(polygon.multipolygon.area, expected_area)
+            self.assertFalse(any(part.exterior.is_ccw for part in shapely.get_parts(polygon.multipolygon)))
+            incremental = AvPathPolygon()
+            with mock.patch.object(AvPathPolygon, "assemble_nested_polygons", return_value={}):
+                incremental.add_path_string(path_string)
+            self.assertTrue(polygon.multipolygon.equals(incremental.multipolygon))
+        paths = AvPathPolygon.path_data_batch(polygons + [AvPathPolygon()])
+        self.assertEqual(
+            [path.to_string() for path in paths], [polygon.path_data().to_string() for polygon in polygons] + [""]
+        )
+
+    def test_multipolygons_to_path_strings(self):
+        """Test that each polygon is serialized into one path string of its exterior and interiors"""
+        polygon = AvPathPolygon()
+        polygon.add_path_string("M 0 0 L 10 0 L 10 10 L 0 10 Z M 2 2 L 2 8 L 8 8 L 8 2 Z M 20 0 h 1 v 1 h -1 z")
+        expected = ["M0 0 L0 10 L10 10 L10 0 Z M2 2 L8 2 L8 8 L2 8 Z", "M20 0 L20 1 L21 1 L21 0 Z"]
+        self.assertEqual(polygon.path_strings(), expected)
+        multipolygons = [
+            polygon.multipolygon,
+            shapely.MultiPolygon(),
+            shapely.Point(0, 0),
+            polygon.multipolygon.geoms[1],
+        ]
+        self.assertEqual(
+            AvPathPolygon.multipolygons_to_path_strings(multipolygons, max_workers=1), [expected, [], [], expected[1:]]
+        )
+        self.assertEqual(
+            AvPathPolygon.multipolygon_to_path_string(polygon.multipolygon, AvPathSerializer(2)),
+            ["M0 0 0 10l10 0L10 0ZM2 2 8 2 8 8 2 8Z", "M20 0l0 1 1 0L21 0Z"],
+        )
+        self.assertEqual(AvPathPolygon.multipolygons_to_path_strings([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,7 +12,10 @@ The tests are run using the unittest.main() function.
 
 import unittest
 
-from ave.svgpath import AvSvgPath  # replace with the actual module name
+import numpy
+
+from ave.fonttools import AvPathDataPen
+from ave.svgpath import AvPathData, AvPathDataBatch, AvPathSerializer, AvSvgPath  # replace with the actual module name
 
 
 class TestTransformPathString(unittest.TestCase):
@@ -79,5 +82,154 @@ class TestTransformPathString(unittest.TestCase):
         )
 
 
+class TestAvPathData(unittest.TestCase):
+    """
+    Test case class for the numeric path representation AvPathData.
+    """
+
+    def test_parse_expands_implicit_commands(self):
+        """Test that repeated arguments are expanded into separate commands."""
+        path = AvPathData.from_string("M 1 2 3 4 L5,6 7,8 Z")
+        self.assertEqual(bytes(path.commands).decode(), "MLLLZ")
+        numpy.testing.assert_array_equal(path.coords, [1, 2, 3, 4, 5, 6, 7, 8])
+        numpy.testing.assert_array_equal(path.offsets, [0, 2, 4, 6, 8, 8])
+
+    def test_parse_numbers_without_separators(self):
+        """Test that numbers are also recognized without whitespace in between."""
+        path = AvPathData.from_string("M-1.5-2e1L.5.25")
+        numpy.testing.assert_array_equal(path.coords, [-1.5, -20, 0.5, 0.25])
+
+    def test_to_absolute(self):
+        """Test the conversion of relative commands into absolute ones."""
+        path = AvPathData.from_string("m 1 2 3 4 h 2 v 1 c 1 1 2 2 3 3 z l 1 1")
+        self.assertEqual(path.to_absolute().to_string(), "M1 2 L4 6 H6 V7 C7 8 8 9 9 10 Z L2 3")
+
+    def test_transform_relative_path(self):
+        """Test that relative commands are converted before transforming."""
+        path = AvPathData.from_string("M 10 20 l 10 10")
+        self.assertEqual(path.transform([2, 0, 0, 2, 1, 1]).to_string(), "M21 41 L41 61")
+
+    def test_transform_many(self):
+        """Test that transforming by several trafos equals transforming one by one."""
+        path = AvPathData.from_string("M 1 2 H 5 V 7 Q 1 1 2 2 A 2 3 0 0 1 4 4 Z")
+        affine_trafos = [[1, 0, 0, 1, 0, 0], [2, 0, 0, 3, 10, 20], [0.5, 0, 0, -0.5, 1, 1]]
+        transformed_paths = path.transform_many(affine_trafos)
+        self.assertEqual(len(transformed_paths), 3)
+        for affine_trafo, transformed_path in zip(affine_trafos, transformed_paths):
+            self.assertEqual(
+                transformed_path.to_string(),
+                AvSvgPath.transform_path_string("M 1 2 H 5 V 7 Q 1 1 2 2 A 2 3 0 0 1 4 4 Z", affine_trafo),
+            )
+        self.assertEqual(transformed_paths[1].to_string(), "M12 26 H20 V41 Q12 23 14 26 A4 9 0 0 1 18 32 Z")
+
+    def test_immutable(self):
+        """Test that the arrays of a path can not be modified."""
+        path = AvPathData.from_string("M 10 20 L 30 40")
+        with self.assertRaises(ValueError):
+            path.coords[0] = 0
+
+    def test_beautify_commands(self):
+        """Test that beautify uses the given round function."""
+        self.assertEqual(AvSvgPath.beautify_commands("M 1.2 2.7 L 3.0 4.0", round), "M 1 3 L 3 4")
+
+    def test_polygonize(self):
+        """Test the flattening of curves into one polyline per contour."""
+        path = AvPathData.from_string("M 0 0 Q 10 10 20 0 C 20 -10 10 -10 5 -5 Z m 30 30 h 5 v 5 z")
+        polylines = path.polygonize(3)
+        self.assertEqual(len(polylines), 2)
+        numpy.testing.assert_allclose(polylines[0], [[0, 0], [10, 5], [20, 0], [14.375, -8.125], [5, -5]])
+        numpy.testing.assert_allclose(polylines[1], [[30, 30], [35, 30], [35, 35]])
+        transformed = path.polygonize(3, [2, 0, 0, -1, 1, 0])
+        numpy.testing.assert_allclose(transformed[1], [[61, -30], [71, -30], [71, -35]])
+
+    def test_polygonize_by_tolerance(self):
+        """Test that the number of points per curve follows from the tolerance, also after a trafo."""
+        path = AvPathData.from_string("M 0 0 Q 10 10 20 0 C 20 -10 10 -10 5 -5 Z")
+        polyline = path.polygonize(tolerance=0.5)[0]
+        self.assertEqual(len(polyline), 1 + 4 + 5)  # moveto, quadratic: ceil(sqrt(40/4)), cubic: ceil(sqrt(84.9/4))
+        self.assertEqual(len(path.polygonize(affine_trafo=[2, 0, 0, 2, 0, 0], tolerance=0.5)[0]), 1 + 5 + 7)
+        # the chords deviate at most tolerance from the quadratic curve:
+        t = numpy.linspace(0, 1, 1001)[:, None]
+        curve = 2 * (1 - t) * t * numpy.array([10, 10]) + t**2 * numpy.array([20, 0])
+        chords = numpy.interp(curve[:, 0], polyline[:5, 0], polyline[:5, 1])
+        self.assertLessEqual(numpy.max(numpy.abs(curve[:, 1] - chords)), 0.5)
+        with self.assertRaises(ValueError):
+            path.polygonize(tolerance=0)
+
+    def test_draw(self):
+        """Test that a path drawn into a pen records the same absolute outline."""
+        pen = AvPathDataPen(None)
+        AvPathData.from_string("m 0 0 q 10 10 20 0 h 5 v 5 c 1 1 2 2 3 3 z M 7 7 L 8 8").draw(pen)
+        self.assertEqual(pen.path_data().to_string(), "M0 0 Q10 10 20 0 L25 0 L25 5 C26 6 27 7 28 8 Z M7 7 L8 8")
+
+    def test_from_polylines(self):
+        """Test the creation of a path from closed polylines."""
+        polylines = [numpy.array([[0, 0], [1, 0], [1, 1], [0, 0]]), numpy.array([[5, 5], [6, 6]])]
+        self.assertEqual(AvPathData.from_polylines(polylines).to_string(), "M0 0 L1 0 L1 1 Z M5 5 L6 6 Z")
+
+
+class TestAvPathDataBatch(unittest.TestCase):
+    """
+    Test case class for transforming and serializing many paths at once.
+    """
+
+    PATHS = ["M 1 2 L 3 4 Z", "m 1 1 l 1 0 h 2 v 3 z", "M 0 0 C 1 1 2 2 3 3"]
+    TRAFOS = [[1, 0, 0, 1, 10, 20], [2, 0, 0, 2, 0, 0], [0, -1, 1, 0, 5, 5]]
+
+    def test_transform_items(self):
+        """Test that each item is transformed by its own trafo like a single transformation."""
+        expected = [AvSvgPath.transform_path_string(path, trafo) for path, trafo in zip(self.PATHS, self.TRAFOS)]
+        self.assertEqual(AvSvgPath.transform_path_strings(self.PATHS, self.TRAFOS), expected)
+        self.assertEqual(AvSvgPath.transform_path_strings_joined(self.PATHS, self.TRAFOS), " ".join(expected))
+
+    def test_empty_batch(self):
+        """Test that an empty batch is serialized into no path strings."""
+        self.assertEqual(AvSvgPath.transform_path_strings([], []), [])
+        batch = AvPathDataBatch.from_paths([])
+        self.assertEqual(batch.to_strings(max_workers=1), [])
+        self.assertEqual(batch.to_strings(AvPathSerializer(), max_workers=1), [])
+
+    def test_parallel_serialization(self):
+        """Test that the serialization by worker processes keeps the order of the items."""
+        batch = AvPathDataBatch.from_paths(self.PATHS * 20).transform(self.TRAFOS * 20)
+        serial = batch.to_strings(max_workers=1)
+        original_min_commands = AvPathDataBatch.PARALLEL_MIN_COMMANDS
+        AvPathDataBatch.PARALLEL_MIN_COMMANDS = 1
+        try:
+            self.assertEqual(batch.to_strings(max_workers=2), serial)
+        finally:
+            AvPathDataBatch.PARALLEL_MIN_COMMANDS = original_min_commands
+        self.assertEqual(serial[3:6], AvSvgPath.transform_path_strings(self.PATHS, self.TRAFOS))
+
+
+class TestAvPathSerializer(unittest.TestCase):
+    """
+    Test case class for the compact, precision controlled serialization of paths.
+    """
+
+    def test_omit_letters_and_use_relative(self):
+        """Test that repeated letters are omitted and shorter relative commands are used."""
+        path = AvPathData.from_string("M 10 20 L 30 40 L 30 50 Z")
+        self.assertEqual(AvPathSerializer(0).serialize(path), "M10 20 30 40l0 10Z")
+        self.assertEqual(AvPathSerializer(0, relative=False).serialize(path), "M10 20 30 40 30 50Z")
+
+    def test_compact_numbers(self):
+        """Test that leading zeros, trailing zeros and unneeded separators are dropped."""
+        path = AvPathData.from_string("M0.5 -0.25 L 0.5 0.5 L -10.101 0.5 H 3 V 4 Z")
+        self.assertEqual(AvPathSerializer(2).serialize(path), "M.5-.25.5.5l-10.6 0H3V4Z")
+
+    def test_round_trip(self):
+        """Test that the serialized path deviates by at most half a unit of the last decimal."""
+        path = AvPathData.from_string("M 0.123456 0.654321 c 0.1 0.2 0.3 0.4 0.5 0.6 q 1 1 2 0 l -0.33333 0 z")
+        serialized = AvPathSerializer(4).serialize(path)
+        parsed = AvPathData.from_string(serialized).to_absolute()
+        numpy.testing.assert_allclose(parsed.coords, path.to_absolute().coords, rtol=0, atol=0.5e-4 + 1e-12)
+
+    def test_from_resolution(self):
+        """Test the number of decimals derived from the output resolution."""
+        self.assertEqual(AvPathSerializer.from_resolution(300, 1.0 / 150).decimals, 4)
+        self.assertEqual(AvPathSerializer.from_resolution(300, 1.0).decimals, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
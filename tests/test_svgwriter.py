@@ -0,0 +1,41 @@
+"""Unittests for module ave.svgwriter"""
+
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from ave.consts import Compression
+from ave.svgwriter import AvParallelGzipFile, AvSvgWriter
+
+
+class TestCompression(unittest.TestCase):
+    """Test class for the compression strategies of AvSvgWriter"""
+
+    TEXT = "".join(f'<path d="M{index} {index * 7 % 13}l1 2-3 4Z" fill="black" />\n' for index in range(3000))
+
+    def test_compression_strategies(self):
+        """Test that all strategies create standard gzip streams with the written content"""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.svgz")
+            for compression in (True, Compression.FAST, Compression.BEST, Compression.PARALLEL, Compression.ZOPFLI):
+                with AvSvgWriter.open(filename, compression) as writer:
+                    writer.stream.write(self.TEXT)
+                with gzip.open(filename, "rt", encoding="utf-8") as svgz_file:
+                    self.assertEqual(svgz_file.read(), self.TEXT, compression)
+
+    def test_parallel_blocks(self):
+        """Test that independently compressed blocks form one single gzip stream"""
+        data = self.TEXT.encode("utf-8")
+        output = io.BytesIO()
+        output.close = lambda: None  # keep the buffer readable after closing the gzip stream
+        gzip_file = AvParallelGzipFile(output, block_size=1000, max_workers=3)
+        for start in range(0, len(data), 777):
+            gzip_file.write(data[start : start + 777])
+        gzip_file.close()
+        self.assertEqual(gzip.decompress(output.getvalue()), data)
+
+
+if __name__ == "__main__":
+    unittest.main()